@@ -11,6 +11,7 @@ from app.utils.session_stats import session_tracker
 from app.storage.storage import Storage
 from .prompt_builder import PromptBuilder
 from app.core.runtime_config import DEFAULT_AGENT_NAME
+from app.utils.stream_json import ArgumentsError, StreamingJSONParser
 
 
 class RateLimitError(Exception):
@@ -198,59 +199,76 @@ class HttpService:
                         )
             else:
                 tool_calls_acc = {}
-                async for chunk in response:
-                    if not chunk.choices:
-                        usage = getattr(chunk, "usage", None)
-                        if usage:
-                            input_tokens = getattr(usage, "prompt_tokens", 0)
-                            output_tokens = getattr(
-                                usage, "completion_tokens", 0)
-                        continue
-
-                    choice = chunk.choices[0]
-                    delta = choice.delta
-
-                    reasoning = getattr(delta, "reasoning", None) or getattr(
-                        delta, "reasoning_details", None
-                    )
-                    if reasoning:
-                        yield "reasoning", reasoning
-                    if delta.content:
-                        yield "content", delta.content
-                    if delta.tool_calls:
-                        for tc in delta.tool_calls:
-                            idx = getattr(tc, "index", 0)
-                            if idx not in tool_calls_acc:
-                                tool_calls_acc[idx] = {
-                                    "id": tc.id,
-                                    "name": "",
-                                    "arguments": "",
-                                }
-                            if tc.id:
-                                tool_calls_acc[idx]["id"] = tc.id
-                            if tc.function:
-                                if tc.function.name:
-                                    tool_calls_acc[idx]["name"] += tc.function.name
-                                if tc.function.arguments:
-                                    tool_calls_acc[idx]["arguments"] += (
-                                        tc.function.arguments
-                                    )
-
-                for tc in tool_calls_acc.values():
-                    try:
-                        args = json.loads(
-                            tc["arguments"]) if tc["arguments"] else {}
-                        yield (
-                            "tool_call",
-                            {"id": tc["id"], "name": tc["name"],
-                                "arguments": args},
-                        )
-                    except json.JSONDecodeError:
-                        yield (
-                            "tool_call",
-                            {"id": tc["id"], "name": tc["name"],
-                                "arguments": {}},
+                emitted: set[int] = set()
+                schemas = {
+                    t.get("name", ""): t.get("input_schema", t.get("parameters", {}))
+                    for t in tools or []
+                }
+                try:
+                    async for chunk in response:
+                        if not chunk.choices:
+                            usage = getattr(chunk, "usage", None)
+                            if usage:
+                                input_tokens = getattr(usage, "prompt_tokens", 0)
+                                output_tokens = getattr(
+                                    usage, "completion_tokens", 0)
+                            continue
+
+                        choice = chunk.choices[0]
+                        delta = choice.delta
+
+                        reasoning = getattr(delta, "reasoning", None) or getattr(
+                            delta, "reasoning_details", None
                         )
+                        if reasoning:
+                            yield "reasoning", reasoning
+                        if delta.content:
+                            yield "content", delta.content
+                        if delta.tool_calls:
+                            for tc in delta.tool_calls:
+                                idx = getattr(tc, "index", 0)
+                                if idx in emitted:
+                                    continue
+                                if idx not in tool_calls_acc:
+                                    # A new index means every earlier call's arguments are complete.
+                                    for ready in self._drain_tool_calls(
+                                        tool_calls_acc, emitted, below=idx
+                                    ):
+                                        yield "tool_call", ready
+                                    tool_calls_acc[idx] = {
+                                        "id": tc.id,
+                                        "name": "",
+                                        "parser": None,
+                                    }
+                                acc = tool_calls_acc[idx]
+                                if tc.id:
+                                    acc["id"] = tc.id
+                                if tc.function:
+                                    if tc.function.name:
+                                        acc["name"] += tc.function.name
+                                    if tc.function.arguments:
+                                        if acc["parser"] is None:
+                                            acc["parser"] = StreamingJSONParser(
+                                                schemas.get(acc["name"])
+                                            )
+                                        acc["parser"].feed(tc.function.arguments)
+                                        yield "tool_progress", self._tool_progress(acc)
+                                # Yield as soon as the argument object closes so the
+                                # caller can start read-only tools mid-stream.
+                                if acc["name"] and acc["parser"] and acc["parser"].complete:
+                                    for ready in self._drain_tool_calls(
+                                        tool_calls_acc, emitted, below=idx + 1
+                                    ):
+                                        yield "tool_call", ready
+                finally:
+                    # Also runs when the consumer abandons the stream (cancel):
+                    # release the HTTP connection now instead of at GC time.
+                    close = getattr(response, "close", None)
+                    if close is not None:
+                        await close()
+
+                for ready in self._drain_tool_calls(tool_calls_acc, emitted):
+                    yield "tool_call", ready
 
         except Exception as e:
             if "429" in str(e):
@@ -265,6 +283,45 @@ class HttpService:
                 duration,
             )
 
+    @staticmethod
+    def _tool_progress(acc: dict) -> dict:
+        parser: StreamingJSONParser = acc["parser"]
+        return {
+            "id": acc["id"],
+            "name": acc["name"],
+            "fields": parser.fields,
+            "streaming_key": parser.streaming_key,
+            "streaming_chars": parser.streaming_chars,
+            "error": parser.error or parser.schema_error,
+        }
+
+    def _drain_tool_calls(
+        self,
+        tool_calls_acc: dict[int, dict],
+        emitted: set[int],
+        below: Optional[int] = None,
+    ) -> list[dict]:
+        """Finalize accumulated calls not yet yielded (those before ``below``), in order.
+
+        Arguments that are malformed or cut off inside a value are not guessed
+        at: the call carries ``arguments_error`` and is answered with an error
+        so the model re-issues just that call.
+        """
+        ready = []
+        for idx in sorted(tool_calls_acc):
+            if idx in emitted or (below is not None and idx >= below):
+                continue
+            emitted.add(idx)
+            tc = tool_calls_acc[idx]
+            call = {"id": tc["id"], "name": tc["name"], "arguments": {}}
+            if tc["parser"] is not None:
+                try:
+                    call["arguments"] = tc["parser"].result()
+                except ArgumentsError as e:
+                    call["arguments_error"] = str(e)
+            ready.append(call)
+        return ready
+
     async def summarize_conversation(self, messages: list[dict]) -> str:
         """Generate a concise summary of the conversation to serve as context."""
         if not messages:
@@ -1,7 +1,10 @@
 from typing import Optional
 from app.prompts import SYSTEM_PROMPT, get_agent_prompt
 from app.utils import get_project_instructions
+from app.utils.file_watcher import change_bus
+from app.utils.project_context import AI_RULES_FILES
 import json
+import os
 from app.core.runtime_config import DEFAULT_AGENT_NAME, DEFAULT_MODE
 
 class PromptBuilder:
@@ -10,6 +13,15 @@ class PromptBuilder:
         self.agent_name = agent_name
         self.current_mode = DEFAULT_MODE
         self._project_instructions = None
+        change_bus.subscribe(self._on_files_changed)
+
+    def _on_files_changed(self, paths) -> None:
+        # Rules files and *agent*.md files feed the instructions block.
+        if paths is None or any(
+            os.path.basename(p) in AI_RULES_FILES or p.lower().endswith(".md")
+            for p in paths
+        ):
+            self._project_instructions = None
 
     def get_system_prompt(self, model: str) -> str:
         parts = [SYSTEM_PROMPT]
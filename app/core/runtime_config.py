@@ -6,6 +6,8 @@ COMMANDS: tuple[str, ...] = (
     "/settings",
     "/compact",
     "/clean history",
+    "/undo",
+    "/checkpoint",
     "/update",
     "/help",
 )
@@ -37,5 +39,67 @@ AI_DEFAULT_TOP_P = 1.0
 TOOL_MAX_ROUNDS = 24
 TOOL_MAX_PER_ROUND = 6
 TOOL_MAX_TOTAL = 24
-TOOL_MAX_PARALLEL = 3
+TOOL_MAX_PARALLEL_READS = 16
+TOOL_MAX_PARALLEL_WRITES = 4
+TOOL_MAX_PARALLEL_EXECS = 2
+# How long a killed command's process group gets to be reaped.
+PROCESS_KILL_WAIT_SECONDS = 1.0
+# After a cancel, how long a tool may take to stop itself and report partial
+# output; long enough for a cancelled command to reap its process group.
+TOOL_CANCEL_GRACE_SECONDS = PROCESS_KILL_WAIT_SECONDS + 0.5
 TOOL_MAX_HANDOFFS = 3
+
+FILE_READ_MAX_TOKENS = 12_000
+CHARS_PER_TOKEN = 4
+FILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FILE_CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+FILE_BATCH_MAX_TOTAL_CHARS = 120_000
+FILE_BATCH_MIN_FILE_CHARS = 500
+FILE_BATCH_MAX_WORKERS = 16
+
+CODEMOD_MAX_FILES = 20_000
+CODEMOD_MAX_FILE_BYTES = 2 * 1024 * 1024
+CODEMOD_PARALLEL_THRESHOLD = 64
+CODEMOD_MAX_WORKERS = 8
+
+GREP_MAX_MATCHES = 100
+
+WATCHER_DEBOUNCE_SECONDS = 0.2
+WATCHER_POLL_INTERVAL = 2.0
+WATCHER_MAX_WATCHES = 8192
+# Watcher-validated command results (find, grep, tree, ls -l) also expire, since
+# skipped dirs and trees past WATCHER_MAX_WATCHES never produce events.
+COMMAND_CACHE_TREE_TTL_SECONDS = 10.0
+
+CHECKPOINT_MAX_KEEP = 50
+CHECKPOINT_MAX_FILE_BYTES = 16 * 1024 * 1024
+# Deleting or moving a bigger directory is allowed but can't be undone.
+CHECKPOINT_MAX_DIR_FILES = 2_000
+CHECKPOINT_MAX_DIR_BYTES = 64 * 1024 * 1024
+
+EXEC_OUTPUT_HEAD_CHARS = 2_000
+EXEC_OUTPUT_TAIL_CHARS = 3_000
+EXEC_PROGRESS_INTERVAL = 0.1
+
+JOB_MAX_RUNNING = 8
+JOB_LOG_MAX_BYTES = 8 * 1024 * 1024
+JOB_LOG_BACKUPS = 1
+
+TEST_RUN_TIMEOUT = 300
+
+# Tools that never change files; anything else clears the command result cache.
+READ_ONLY_TOOLS = frozenset({
+    "read_file", "read_files_batch", "list_directory", "find_files", "get_file_tree",
+    "search_codebase", "multi_search", "grep_search", "get_code_structure",
+    "git_status", "git_diff", "git_log", "job_status", "job_tail", "job_wait",
+    "get_working_dir", "get_env_variables", "read_webpage", "fetch_result",
+})
+
+OUTPUT_COMPRESS_MIN_CHARS = 2_000
+OUTPUT_FAILURE_CONTEXT_LINES = 3
+OUTPUT_MAX_TRACEBACK_LINES = 40
+
+RESULT_OFFLOAD_MIN_CHARS = 50_000
+RESULT_PREVIEW_HEAD_CHARS = 1_500
+RESULT_PREVIEW_TAIL_CHARS = 1_000
+RESULT_FETCH_MAX_CHARS = 40_000
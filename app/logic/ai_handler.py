@@ -1,8 +1,13 @@
+import asyncio
 import json
 import time
-from typing import Any
+from typing import Any, Optional
 from app.utils.session_stats import session_tracker
-from app.utils.logger import log_error
+from app.utils.checkpoints import checkpoint_journal
+from app.utils.cancellation import CancelToken, cancel_token, iterate_cancellable
+from app.utils.logger import log_debug, log_error
+from app.logic.context_optimizer import optimize_messages
+from app.logic.tool_memo import call_signature
 from app.logic.tool_orchestrator import ToolOrchestrator
 from app.core.runtime_config import (
     PLAN_PROMPT_TEMPLATE,
@@ -10,22 +15,27 @@ from app.core.runtime_config import (
     AI_DEFAULT_MAX_TOKENS,
     AI_DEFAULT_TEMPERATURE,
     AI_DEFAULT_TOP_P,
-    TOOL_MAX_PARALLEL,
 )
 
 
 class AIHandler:
     def __init__(self, app):
         self.app = app
-        self.max_parallel_tools = TOOL_MAX_PARALLEL
-        self.tool_orchestrator = ToolOrchestrator(app, self.max_parallel_tools)
+        self.tool_orchestrator = ToolOrchestrator(app)
+        self._cancel_token: Optional[CancelToken] = None
+
+    def cancel(self) -> None:
+        """Abort the running request: the HTTP stream and any running tools."""
+        self.app.is_streaming = False
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
 
     async def generate_plan(self, user_input: str) -> str:
         if not self.app.http_service:
             return ""
         self._show_loading("AI is planning...")
         planning_prompt = PLAN_PROMPT_TEMPLATE.format(user_input=user_input)
-        planning_messages = list(self.app.messages) + [
+        planning_messages = optimize_messages(self.app.messages)[0] + [
             {"role": "user", "content": planning_prompt}
         ]
         chunks: list[str] = []
@@ -80,6 +90,8 @@ class AIHandler:
         if not self.app.http_service:
             return
         self.app.is_streaming = True
+        self._cancel_token = CancelToken()
+        token_reset = cancel_token.set(self._cancel_token)
         pending_writes = []
         response_text, reasoning_text = "", ""
         accumulated_response_text = ""
@@ -102,47 +114,66 @@ class AIHandler:
                     area.mount(LoadingMessage("AI is thinking..."))
                     area.scroll_end()
 
-                async for chunk_type, data in self.app.http_service.chat(
-                    self.app.messages,
-                    tools,
-                    stream=True,
-                    max_tokens=int(
-                        self.app.ai_settings.get("max_tokens", AI_DEFAULT_MAX_TOKENS)
-                    ),
-                    temperature=float(
-                        self.app.ai_settings.get("temperature", AI_DEFAULT_TEMPERATURE)
-                    ),
-                    top_p=float(self.app.ai_settings.get("top_p", AI_DEFAULT_TOP_P)),
-                ):
-                    if not self.app.is_streaming:
-                        break
-                    now = time.time()
-
-                    if chunk_type == "reasoning":
-                        reasoning_text += data
-                        if now - last_update > ui_update_interval:
-                            self._update_ui_status(
-                                f"Thinking: {reasoning_text[:60]}..."
-                            )
-                            last_update = now
-                    elif chunk_type == "content":
-                        if not response_text:
-                            self._update_ui_status("AI is responding...")
-                        response_text += data
-                        accumulated_response_text += data
-                        is_first = not assistant_stream_started
-                        if is_first or (now - last_update > ui_update_interval):
-                            self._update_ui_content(accumulated_response_text, is_first)
-                            if is_first:
-                                assistant_stream_started = True
-                            streamed_assistant_preview = True
-                            last_update = now
-                    elif chunk_type == "tool_call":
-                        self._update_ui_status(f"Running tool: {data['name']}...")
-                        tool_calls.append(data)
+                request_messages, deduped_tokens = optimize_messages(self.app.messages)
+                if deduped_tokens:
+                    session_tracker.record_context_dedup(deduped_tokens)
+                    log_debug(f"Context dedup saved ~{deduped_tokens} tokens")
+
+                tool_round = self.tool_orchestrator.start_round()
+                try:
+                    # Cancelling abandons the pending chunk at once instead of
+                    # waiting for the provider to send another one.
+                    async for chunk_type, data in iterate_cancellable(
+                        self.app.http_service.chat(
+                            request_messages,
+                            tools,
+                            stream=True,
+                            max_tokens=int(
+                                self.app.ai_settings.get("max_tokens", AI_DEFAULT_MAX_TOKENS)
+                            ),
+                            temperature=float(
+                                self.app.ai_settings.get("temperature", AI_DEFAULT_TEMPERATURE)
+                            ),
+                            top_p=float(self.app.ai_settings.get("top_p", AI_DEFAULT_TOP_P)),
+                        )
+                    ):
+                        if not self.app.is_streaming:
+                            break
+                        now = time.time()
+
+                        if chunk_type == "reasoning":
+                            reasoning_text += data
+                            if now - last_update > ui_update_interval:
+                                self._update_ui_status(
+                                    f"Thinking: {reasoning_text[:60]}..."
+                                )
+                                last_update = now
+                        elif chunk_type == "content":
+                            if not response_text:
+                                self._update_ui_status("AI is responding...")
+                            response_text += data
+                            accumulated_response_text += data
+                            is_first = not assistant_stream_started
+                            if is_first or (now - last_update > ui_update_interval):
+                                self._update_ui_content(accumulated_response_text, is_first)
+                                if is_first:
+                                    assistant_stream_started = True
+                                streamed_assistant_preview = True
+                                last_update = now
+                        elif chunk_type == "tool_progress":
+                            if now - last_update > ui_update_interval:
+                                self._update_ui_status(self._describe_tool_progress(data))
+                                last_update = now
+                        elif chunk_type == "tool_call":
+                            self._update_ui_status(f"Running tool: {data['name']}...")
+                            tool_calls.append(data)
+                            self._process_tool_calls([data])
+                            # Read-only calls start now, overlapping the rest of the stream.
+                            tool_round.submit(data, eager=True)
+                except BaseException:
+                    tool_round.cancel()
+                    raise
 
-                if tool_calls:
-                    self._process_tool_calls(tool_calls)
                 last_tool_calls = tool_calls
 
                 # Message building and saving
@@ -179,7 +210,7 @@ class AIHandler:
                     _round_handoffs,
                     round_success_count,
                 ) = await self._execute_tools(
-                    tool_calls, pending_writes
+                    tool_calls, pending_writes, tool_round
                 )
                 if round_success_count > 0:
                     self.app.advance_plan_progress(1)
@@ -202,7 +233,11 @@ class AIHandler:
             self.app.notify(f"Error: {str(e)}", severity="error")
         finally:
             self.app.is_streaming = False
+            cancel_token.reset(token_reset)
+            self._cancel_token = None
             self._clear_loading()
+            # What the turn left behind; /undo refuses to clobber later user edits.
+            await asyncio.to_thread(checkpoint_journal.seal)
             if not getattr(self.app, "is_shutting_down", False):
                 for w in pending_writes:
                     try:
@@ -218,17 +253,26 @@ class AIHandler:
                             break
                         raise
 
+    @staticmethod
+    def _describe_tool_progress(progress: dict[str, Any]) -> str:
+        fields = progress.get("fields") or {}
+        target = next(
+            (str(fields[key]) for key in ("filepath", "path", "command", "pattern") if key in fields),
+            "",
+        )
+        text = f"Preparing {progress.get('name') or 'tool'}"
+        if target:
+            text += f" {target[:60]}"
+        if progress.get("streaming_key"):
+            text += f" ({progress['streaming_key']}: {progress.get('streaming_chars', 0):,} chars)"
+        if progress.get("error"):
+            text += f" - invalid arguments: {progress['error']}"
+        return text + "..."
+
     def _tool_signatures(self, tool_calls: list[dict[str, Any]]) -> list[str]:
-        signatures: list[str] = []
-        for tc in tool_calls:
-            name = tc.get("name", "")
-            args = tc.get("arguments", {})
-            try:
-                args_str = json.dumps(args, sort_keys=True, ensure_ascii=True)
-            except Exception:
-                args_str = str(args)
-            signatures.append(f"{name}:{args_str}")
-        return signatures
+        return [
+            call_signature(tc.get("name", ""), tc.get("arguments", {})) for tc in tool_calls
+        ]
 
     def _finalize_message(
         self, response_text: str, reasoning_text: str, tool_calls: list
@@ -316,12 +360,13 @@ class AIHandler:
             pass
 
     async def _execute_tools(
-        self, tool_calls, pending_writes
+        self, tool_calls, pending_writes, tool_round=None
     ) -> tuple[bool, int, set[str], int, int]:
         return await self.tool_orchestrator.execute_tools(
             tool_calls=tool_calls,
             pending_writes=pending_writes,
             signature_fn=self._tool_signatures,
+            tool_round=tool_round,
         )
 
     async def _finalize_stats(self):
@@ -1,4 +1,6 @@
+import asyncio
 import uuid
+from pathlib import Path
 from app.ui.widgets import SelectionModal, ApiKeyModal
 from app.core.runtime_config import COMMANDS_HELP_TEXT
 from app.utils import (
@@ -8,6 +10,9 @@ from app.utils import (
     set_default_model,
 )
 from app.prompts import get_agent_names, get_agent_description
+from app.utils.checkpoints import checkpoint_journal
+from app.utils.file_cache import file_cache
+from app.utils.shell_session import shell_session
 
 
 class CommandHandler:
@@ -50,6 +55,14 @@ class CommandHandler:
         elif cmd.startswith("/clean history"):
             await self.app.clean_history()
 
+        elif cmd.startswith("/undo"):
+            await self._undo_last_checkpoint(force=cmd.split()[1:] == ["force"])
+
+        elif cmd.startswith("/checkpoint"):
+            label = command.strip()[len("/checkpoint"):].strip() or "(manual)"
+            checkpoint = await asyncio.to_thread(checkpoint_journal.begin, label)
+            self.app.notify(f"Checkpoint #{checkpoint.id} created: {label}")
+
         elif cmd.startswith("/update"):
             self.app.run_update()
 
@@ -215,10 +228,37 @@ class CommandHandler:
         self.app.conversation_id = str(uuid.uuid4())
         self.app.is_new_conversation = True
         self.app.messages = []
+        file_cache.reset_delivered()
+        await shell_session.close()
         self.app.conversation_title = "New Chat"
         self.app.plan_tracker = None
         self.app.notify("New conversation started")
 
+    async def _undo_last_checkpoint(self, force: bool = False) -> None:
+        if self.app.is_streaming:
+            self.app.notify("Wait for the current response before undoing.", severity="warning")
+            return
+        result = await asyncio.to_thread(checkpoint_journal.undo, force)
+        if result is None:
+            self.app.notify("Nothing to undo.", severity="information")
+            return
+        if result.conflicts and not force:
+            shown = ", ".join(Path(p).name for p in result.conflicts[:5])
+            more = f" (+{len(result.conflicts) - 5} more)" if len(result.conflicts) > 5 else ""
+            self.app.notify(
+                f"Not undone: {len(result.conflicts)} file(s) changed since checkpoint "
+                f"#{result.checkpoint.id}: {shown}{more}. Use /undo force to overwrite them.",
+                severity="warning",
+            )
+            return
+        summary = (
+            f"Reverted #{result.checkpoint.id} ({result.checkpoint.label}): "
+            f"{len(result.restored)} restored, {len(result.removed)} removed"
+        )
+        if result.skipped:
+            summary += f", {len(result.skipped)} too large to restore"
+        self.app.notify(summary)
+
     async def _start_agent_selection(self) -> None:
         agent_names = get_agent_names()
         if not agent_names:
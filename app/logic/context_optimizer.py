@@ -0,0 +1,161 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from app.logic.tool_memo import MEMO_PREFIX
+from app.tools.file_tools import UNCHANGED_PREFIX
+from app.utils.output_compression import estimate_tokens
+from app.utils.result_store import STUB_PREFIX
+
+_TRUNCATED_MARKER = "\n... (truncated: showing lines "
+
+
+@dataclass
+class _FileRead:
+    msg_index: int
+    # Character span of the file text inside the tool message content.
+    start: int
+    end: int
+    path: str
+    display: str
+    start_line: Optional[int]
+    end_line: Optional[int]
+    digest: str
+
+    @property
+    def complete(self) -> bool:
+        return self.start_line is None and self.end_line is None
+
+
+def _tool_arguments(messages: list[dict[str, Any]]) -> dict[str, tuple[str, dict]]:
+    calls: dict[str, tuple[str, dict]] = {}
+    for msg in messages:
+        for tc in msg.get("tool_calls") or []:
+            function = tc.get("function", {})
+            args = function.get("arguments", {})
+            if isinstance(args, str):
+                try:
+                    args = json.loads(args)
+                except ValueError:
+                    continue
+            if isinstance(args, dict) and tc.get("id"):
+                calls[tc["id"]] = (function.get("name", ""), args)
+    return calls
+
+
+def _resolve(display: str) -> str:
+    try:
+        return str(Path(display).expanduser().resolve())
+    except (OSError, RuntimeError):
+        return display
+
+
+def _batch_sections(content: str, filepaths: list[str]) -> list[tuple[str, int, int]]:
+    # read_files_batch joins "## <path>\n<text>" sections with blank lines, in request order.
+    found: list[tuple[str, int]] = []
+    pos = 0
+    for fp in filepaths:
+        header = f"## {fp}\n"
+        if content.startswith(header, pos):
+            idx = pos
+        else:
+            idx = content.find("\n\n" + header, pos)
+            if idx < 0:
+                continue
+            idx += 2
+        found.append((fp, idx + len(header)))
+        pos = idx + len(header)
+    sections = []
+    for i, (fp, start) in enumerate(found):
+        if i + 1 < len(found):
+            end = found[i + 1][1] - len(f"## {found[i + 1][0]}\n") - 2
+        else:
+            skipped = content.find("\n\n## Skipped\n", start)
+            end = skipped if skipped >= 0 else len(content)
+        sections.append((fp, start, end))
+    return sections
+
+
+def _collect_reads(messages: list[dict[str, Any]]) -> list[_FileRead]:
+    calls = _tool_arguments(messages)
+    reads: list[_FileRead] = []
+    for idx, msg in enumerate(messages):
+        if msg.get("role") != "tool":
+            continue
+        content = msg.get("content") or ""
+        call = calls.get(msg.get("tool_call_id", ""))
+        if call is None or content.startswith(("Error:", UNCHANGED_PREFIX, STUB_PREFIX, MEMO_PREFIX)):
+            continue
+        name, args = call
+        if name == "read_file":
+            spans = [(str(args.get("filepath", "")), 0, len(content))]
+        elif name == "read_files_batch":
+            spans = _batch_sections(content, [str(p) for p in args.get("filepaths", [])])
+        else:
+            continue
+        start_line, end_line = args.get("start_line"), args.get("end_line")
+        for display, start, end in spans:
+            text = content[start:end]
+            if not display or not text or text.startswith("Error:"):
+                continue
+            partial = _TRUNCATED_MARKER in text
+            reads.append(
+                _FileRead(
+                    idx,
+                    start,
+                    end,
+                    _resolve(display),
+                    display,
+                    start_line,
+                    # A truncated page is a range even if none was asked for.
+                    end_line if not partial else -1,
+                    hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest(),
+                )
+            )
+    return reads
+
+
+def optimize_messages(messages: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], int]:
+    """Copy of ``messages`` with redundant file reads replaced by short stubs.
+
+    Only the newest copy of each file range survives: older identical reads
+    become back-references and older differing reads are marked outdated, as
+    are partial reads covered by a later complete one. The stored conversation
+    is left untouched. Returns the messages and the estimated tokens saved.
+    """
+    reads = _collect_reads(messages)
+    latest: dict[tuple, _FileRead] = {}
+    latest_complete: dict[str, _FileRead] = {}
+    for read in reads:
+        latest[(read.path, read.start_line, read.end_line)] = read
+        if read.complete:
+            latest_complete[read.path] = read
+
+    replacements: dict[int, list[tuple[int, int, str]]] = {}
+    for read in reads:
+        newest = latest[(read.path, read.start_line, read.end_line)]
+        if newest is read:
+            covering = latest_complete.get(read.path)
+            if read.complete or covering is None or covering.msg_index <= read.msg_index:
+                continue
+            stub = f"[Range of {read.display} omitted: a later complete read covers it]"
+        elif newest.digest == read.digest:
+            stub = f"[Duplicate read of {read.display}: identical content appears in a later result]"
+        else:
+            stub = f"[Outdated read of {read.display}: superseded by a later read; see the latest result]"
+        if len(stub) < read.end - read.start:
+            replacements.setdefault(read.msg_index, []).append((read.start, read.end, stub))
+
+    if not replacements:
+        return messages, 0
+    optimized = list(messages)
+    saved = 0
+    for idx, spans in replacements.items():
+        content = messages[idx]["content"]
+        for start, end, stub in sorted(spans, reverse=True):
+            saved += estimate_tokens(content[start:end]) - estimate_tokens(stub)
+            content = content[:start] + stub + content[end:]
+        optimized[idx] = {**messages[idx], "content": content}
+    return optimized, max(0, saved)
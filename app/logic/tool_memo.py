@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.runtime_config import READ_ONLY_TOOLS
+from app.logic.tool_scheduler import EXEC, WRITE, ToolAccess, classify_call
+from app.utils.cancellation import is_cancelled
+from app.utils.file_watcher import change_bus
+from app.utils.job_manager import job_manager
+from app.utils.session_stats import session_tracker
+
+MEMO_PREFIX = "Same result as the identical"
+
+# Read-only, but their answer changes over time (jobs progress, pages change).
+_VOLATILE_TOOLS = frozenset({"job_status", "job_tail", "job_wait", "read_webpage"})
+_SHELL_TOOLS = frozenset({"execute_command", "run_tests", "git_action"})
+
+
+def call_signature(name: str, arguments: Any) -> str:
+    try:
+        args_str = json.dumps(arguments, sort_keys=True, ensure_ascii=True)
+    except Exception:
+        args_str = str(arguments)
+    return f"{name}:{args_str}"
+
+
+@dataclass
+class _MemoEntry:
+    access: ToolAccess
+    call_id: str
+    result: asyncio.Future
+
+
+class ToolMemo:
+    """Turn-scoped answers for repeated identical tool calls.
+
+    Successful read-only calls and failed file-tool calls are remembered by
+    signature until a mutating call (or a file-watcher event) touches their
+    paths; exec calls, finished background jobs and new turns clear
+    everything. Shell-backed calls are never memoized, even read-only ones.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _MemoEntry] = {}
+        self._lock = threading.Lock()
+        change_bus.subscribe(self._on_files_changed)
+        # A finished job may have written anywhere, including directories the
+        # watcher skips (dist/, build/, node_modules/).
+        job_manager.add_exit_listener(self._on_job_exit)
+
+    def _on_job_exit(self, job) -> None:
+        self.invalidate()
+
+    def begin_turn(self) -> None:
+        self.invalidate()
+
+    def _on_files_changed(self, paths) -> None:
+        if paths is None:
+            self.invalidate()
+        else:
+            self.invalidate(ToolAccess(WRITE, writes=tuple(paths)))
+
+    def invalidate(self, access: Optional[ToolAccess] = None, keep: Optional[str] = None) -> None:
+        """Forget entries ``access`` may have changed (everything if None)."""
+        with self._lock:
+            if access is None or access.kind == EXEC:
+                stale = [sig for sig in self._entries if sig != keep]
+            else:
+                stale = [
+                    sig
+                    for sig, entry in self._entries.items()
+                    if sig != keep and access.conflicts_with(entry.access)
+                ]
+            for sig in stale:
+                del self._entries[sig]
+
+    def _claim(self, sig: str, access: ToolAccess, call_id: str) -> tuple[_MemoEntry, bool]:
+        with self._lock:
+            entry = self._entries.get(sig)
+            if entry is not None:
+                return entry, False
+            entry = _MemoEntry(access, call_id, asyncio.get_running_loop().create_future())
+            self._entries[sig] = entry
+            return entry, True
+
+    def _drop(self, sig: str, entry: _MemoEntry) -> None:
+        with self._lock:
+            if self._entries.get(sig) is entry:
+                del self._entries[sig]
+
+    async def _execute(
+        self,
+        execute: Callable[[], Awaitable[str]],
+        access: ToolAccess,
+        keep: Optional[str] = None,
+    ) -> str:
+        try:
+            return await execute()
+        finally:
+            if access.writes:
+                self.invalidate(access, keep=keep)
+
+    async def call(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        call_id: str,
+        execute: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Result of ``execute()``, or a short answer if this exact call already ran."""
+        access = classify_call(name, arguments)
+        reusable = name in READ_ONLY_TOOLS
+        # Read-classified shell commands (cat, grep -r) may time out or race a
+        # build; their repeats always run (the command cache covers hits).
+        if access.kind == EXEC or name in _VOLATILE_TOOLS or name in _SHELL_TOOLS:
+            return await self._execute(execute, access)
+        sig = call_signature(name, arguments)
+        entry, owner = self._claim(sig, access, call_id)
+        if not owner:
+            try:
+                # Identical calls in one round share the first one's run.
+                earlier = await asyncio.shield(entry.result)
+            except asyncio.CancelledError:
+                if not entry.result.cancelled():
+                    raise
+                earlier = None
+            if earlier is not None and earlier.startswith("Error:"):
+                session_tracker.record_tool_memo_hit()
+                return (
+                    f"Error: This exact {name} call already failed this turn and nothing it "
+                    f"depends on has changed since: {earlier[len('Error:'):].strip()[:300]} "
+                    "Change the arguments or fix the cause instead of retrying."
+                )
+            if earlier is not None and reusable:
+                session_tracker.record_tool_memo_hit()
+                return (
+                    f"{MEMO_PREFIX} {name} call earlier this turn (call {entry.call_id}); "
+                    "nothing it depends on has changed since, so it was not run again."
+                )
+            return await self._execute(execute, access)
+
+        try:
+            result = await self._execute(execute, access, keep=sig)
+        except BaseException:
+            self._drop(sig, entry)
+            entry.result.cancel()
+            raise
+        if is_cancelled() or not (reusable or result.startswith("Error:")):
+            self._drop(sig, entry)
+        entry.result.set_result(result)
+        return result
+
+
+tool_memo = ToolMemo()
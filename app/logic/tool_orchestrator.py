@@ -3,56 +3,114 @@ import json
 import time
 from typing import TYPE_CHECKING, Any
 
+from app.core.runtime_config import (
+    EXEC_PROGRESS_INTERVAL,
+    TOOL_CANCEL_GRACE_SECONDS,
+    TOOL_MAX_PARALLEL_EXECS,
+    TOOL_MAX_PARALLEL_READS,
+    TOOL_MAX_PARALLEL_WRITES,
+)
+from app.logic.tool_memo import tool_memo
+from app.logic.tool_scheduler import EXEC, READ, WRITE, ToolRound, ToolScheduler
 from app.tools.agent_tools import HANDOFF_PREFIX
+from app.utils.cancellation import OperationCancelled, cancellable, is_cancelled
+from app.utils.logger import log_debug
+from app.utils.output_capture import progress_listener
+from app.utils.output_compression import compress_tool_output
+from app.utils.result_store import offload_result
+from app.utils.session_stats import session_tracker
 
 if TYPE_CHECKING:
     from app.ui.app import OpenDevApp
 
 
 class ToolOrchestrator:
-    def __init__(self, app: "OpenDevApp", max_parallel_tools: int):
+    def __init__(self, app: "OpenDevApp"):
         self.app = app
-        self.max_parallel_tools = max(1, int(max_parallel_tools))
+        self.scheduler = ToolScheduler(
+            {
+                READ: TOOL_MAX_PARALLEL_READS,
+                WRITE: TOOL_MAX_PARALLEL_WRITES,
+                EXEC: TOOL_MAX_PARALLEL_EXECS,
+            }
+        )
+
+    def start_round(self) -> ToolRound:
+        """A round that AIHandler fills while the response streams in."""
+        return self.scheduler.start_round(self._run_one)
+
+    async def _run_one(
+        self, idx: int, tool_call: dict[str, Any]
+    ) -> tuple[int, dict[str, Any], str, int]:
+        if tool_call.get("arguments_error"):
+            return idx, tool_call, (
+                f"Error: Arguments for '{tool_call['name']}' were not valid JSON "
+                f"({tool_call['arguments_error']}). Nothing was executed; re-issue this "
+                "tool call with complete arguments."
+            ), 0
+        if is_cancelled():
+            return idx, tool_call, "Error: Request cancelled by user before this tool ran.", 0
+        start = time.perf_counter()
+        token = progress_listener.set(self._progress_sink(tool_call.get("id", "")))
+        try:
+            # Cooperative tools (subprocesses) stop within the grace period and
+            # return their partial output; anything slower is abandoned.
+            result = await cancellable(
+                tool_memo.call(
+                    tool_call["name"],
+                    tool_call["arguments"],
+                    tool_call.get("id", ""),
+                    lambda: self._execute(tool_call),
+                ),
+                grace=TOOL_CANCEL_GRACE_SECONDS,
+            )
+        except OperationCancelled:
+            result = f"Error: Request cancelled by user; {tool_call['name']} was stopped before it finished."
+        finally:
+            progress_listener.reset(token)
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        return idx, tool_call, result, duration_ms
+
+    async def _execute(self, tool_call: dict[str, Any]) -> str:
+        result = await self.app.tool_manager.execute(
+            tool_call["name"], tool_call["arguments"]
+        )
+        return str(result)
 
     async def execute_tools(
         self,
         tool_calls: list[dict[str, Any]],
         pending_writes: list[dict[str, Any]],
         signature_fn,
+        tool_round: ToolRound | None = None,
     ) -> tuple[bool, int, set[str], int, int]:
         failed_in_round: set[str] = set()
         handoff_in_round = 0
         success_in_round = 0
 
-        runnable: list[tuple[int, dict[str, Any], str]] = []
-        for tc in tool_calls:
-            sig = signature_fn([tc])[0]
-            runnable.append((len(runnable), tc, sig))
-
-        semaphore = asyncio.Semaphore(self.max_parallel_tools)
-
-        async def run_one(
-            idx: int, tool_call: dict[str, Any], sig: str
-        ) -> tuple[int, dict[str, Any], str, str, int]:
-            async with semaphore:
-                start = time.perf_counter()
-                result = await self.app.tool_manager.execute(
-                    tool_call["name"], tool_call["arguments"]
-                )
-                duration_ms = int((time.perf_counter() - start) * 1000)
-                return idx, tool_call, sig, str(result), duration_ms
-
-        tasks = [run_one(idx, tc, sig) for idx, tc, sig in runnable]
-        raw_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        ordered_results: list[tuple[int, dict[str, Any], str, str, int]] = []
-        for item in raw_results:
-            if isinstance(item, Exception):
-                continue
+        if tool_round is None:
+            tool_round = self.start_round()
+            for tc in tool_calls:
+                tool_round.submit(tc)
+        # Calls may have finished in any order (eager reads ran during streaming);
+        # history gets them in the order the model issued them.
+        raw_results = await tool_round.finish()
+        signatures = signature_fn(tool_calls)
+
+        ordered_results: list[tuple[int, dict[str, Any], str, int]] = []
+        for idx, item in enumerate(raw_results):
+            if isinstance(item, BaseException):
+                # Every call needs an answer in history; raw_results follow tool_calls.
+                if isinstance(item, asyncio.CancelledError):
+                    error = f"Error: {tool_calls[idx]['name']} was cancelled before it finished."
+                else:
+                    error = f"Error: {type(item).__name__}: {str(item)}"
+                item = (idx, tool_calls[idx], error, 0)
             ordered_results.append(item)
         ordered_results.sort(key=lambda x: x[0])
 
-        for _, tc, sig, result, duration_ms in ordered_results:
+        for idx, tc, result, duration_ms in ordered_results:
+            sig = signatures[idx]
             self._push_tool_result_ui(
                 tool_call_id=tc.get("id", ""),
                 tool_name=tc.get("name", "tool"),
@@ -79,7 +137,9 @@ class ToolOrchestrator:
                 "role": "tool",
                 "tool_call_id": tc["id"],
                 "name": tc["name"],
-                "content": result,
+                "content": offload_result(
+                    tc["name"], self._compress(tc["name"], result, tc.get("arguments"))
+                ),
             }
             self.app.messages.append(tool_msg)
             pending_writes.append(
@@ -96,6 +156,39 @@ class ToolOrchestrator:
             success_in_round,
         )
 
+    def _compress(self, tool_name: str, result: str, arguments: Any = None) -> str:
+        # The UI already showed the raw output; only the model's copy is compressed.
+        compressed = compress_tool_output(tool_name, result, arguments)
+        session_tracker.record_output_compression(
+            compressed.original_tokens, compressed.savings
+        )
+        if compressed.savings:
+            stages = ", ".join(f"{name} -{saved}" for name, saved in compressed.savings)
+            log_debug(
+                f"Compressed {tool_name} output: {compressed.original_tokens} -> "
+                f"{compressed.original_tokens - compressed.tokens_saved} tokens ({stages})"
+            )
+        return compressed.text
+
+    def _progress_sink(self, tool_call_id: str):
+        last_emit = 0.0
+
+        def sink(line: str) -> None:
+            nonlocal last_emit
+            now = time.monotonic()
+            if now - last_emit < EXEC_PROGRESS_INTERVAL:
+                return
+            last_emit = now
+            try:
+                from app.ui.screens import ChatScreen
+
+                if isinstance(self.app.screen, ChatScreen):
+                    self.app.screen.update_tool_progress(tool_call_id, line)
+            except Exception:
+                pass
+
+        return sink
+
     def _push_tool_result_ui(
         self,
         tool_call_id: str,
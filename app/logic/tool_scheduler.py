@@ -0,0 +1,181 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.runtime_config import READ_ONLY_TOOLS
+from app.utils.command_cache import is_read_only
+
+READ, WRITE, EXEC = "read", "write", "exec"
+
+# Scope of a call whose effects can't be bounded: it conflicts with anything touching a path.
+_EVERYTHING = os.sep
+
+# Tool name -> argument names holding the paths it reads or writes ("." if absent).
+_READ_PATH_ARGS: dict[str, tuple[str, ...]] = {
+    "read_file": ("filepath",),
+    "read_files_batch": ("filepaths",),
+    "list_directory": ("path",),
+    "get_file_tree": ("path",),
+    "find_files": ("directory",),
+    "grep_search": ("directory",),
+    "search_codebase": ("directory",),
+    "multi_search": ("directory",),
+    "get_code_structure": ("filepath",),
+    "git_status": ("working_dir",),
+    "git_diff": ("working_dir",),
+    "git_log": ("working_dir",),
+}
+_WRITE_PATH_ARGS: dict[str, tuple[str, ...]] = {
+    "write_file": ("filepath",),
+    "edit_file": ("filepath",),
+    "delete_file": ("filepath",),
+    "create_directory": ("path",),
+    "replace_regex": ("filepath",),
+    "format_code": ("path",),
+    "move_file": ("source", "destination"),
+}
+
+
+@dataclass
+class ToolAccess:
+    kind: str
+    reads: tuple[str, ...] = ()
+    writes: tuple[str, ...] = ()
+
+    def conflicts_with(self, other: "ToolAccess") -> bool:
+        # Exec calls may touch anything, including state outside the file tree
+        # (jobs, processes), so they are ordered against every other call.
+        if EXEC in (self.kind, other.kind):
+            return True
+        return any(
+            _overlaps(written, path)
+            for written in self.writes
+            for path in (*other.reads, *other.writes)
+        ) or any(_overlaps(written, path) for written in other.writes for path in self.reads)
+
+
+def _overlaps(a: str, b: str) -> bool:
+    if a == b or _EVERYTHING in (a, b):
+        return True
+    return b.startswith(a.rstrip(os.sep) + os.sep) or a.startswith(b.rstrip(os.sep) + os.sep)
+
+
+def _paths(arguments: dict[str, Any], names: tuple[str, ...]) -> tuple[str, ...]:
+    found: list[str] = []
+    for name in names:
+        value = arguments.get(name) or "."
+        for item in value if isinstance(value, list) else [value]:
+            found.append(os.path.abspath(os.path.expanduser(str(item))))
+    return tuple(found)
+
+
+def classify_call(name: str, arguments: dict[str, Any]) -> ToolAccess:
+    """Side-effect class and path footprint of one tool call."""
+    if name in _READ_PATH_ARGS:
+        return ToolAccess(READ, reads=_paths(arguments, _READ_PATH_ARGS[name]))
+    if name in _WRITE_PATH_ARGS:
+        return ToolAccess(WRITE, writes=_paths(arguments, _WRITE_PATH_ARGS[name]))
+    if name == "copy_file":
+        return ToolAccess(
+            WRITE,
+            reads=_paths(arguments, ("source",)),
+            writes=_paths(arguments, ("destination",)),
+        )
+    if name == "apply_edits":
+        edits = arguments.get("edits") or []
+        targets = [e.get("filepath") for e in edits if isinstance(e, dict) and e.get("filepath")]
+        if targets:
+            return ToolAccess(WRITE, writes=_paths({"filepath": targets}, ("filepath",)))
+    if name == "codemod_regex":
+        scope = _paths(arguments, ("directory",))
+        if arguments.get("apply"):
+            return ToolAccess(WRITE, writes=scope)
+        return ToolAccess(READ, reads=scope)
+    if name in ("execute_command", "run_tests") and not arguments.get("background"):
+        # Path operands aren't parsed (cat ../x, grep -r y /src), so a
+        # read-only command may read anywhere.
+        if is_read_only(str(arguments.get("command", ""))):
+            return ToolAccess(READ, reads=(_EVERYTHING,))
+    if name == "git_action" and is_read_only(f"git {arguments.get('action', '')}"):
+        return ToolAccess(READ, reads=(_EVERYTHING,))
+    if name in READ_ONLY_TOOLS or name == "handoff_agent":
+        # Touches no project files (job_tail, read_webpage, ...).
+        return ToolAccess(READ)
+    return ToolAccess(EXEC, reads=(_EVERYTHING,), writes=(_EVERYTHING,))
+
+
+class ToolRound:
+    """One round of tool calls, submitted in model order as they stream in.
+
+    A call waits for every earlier call it conflicts with (overlapping write
+    scopes, or any exec call), so conflicting calls keep the model's order
+    while independent ones run concurrently, bounded per side-effect class.
+    Eager reads start on submit; everything else starts in ``finish``.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, int],
+        runner: Callable[[int, dict[str, Any]], Awaitable[Any]],
+    ):
+        self._runner = runner
+        self._slots = {kind: asyncio.Semaphore(limit) for kind, limit in limits.items()}
+        self._calls: list[dict[str, Any]] = []
+        self._accesses: list[ToolAccess] = []
+        self._finished: list[asyncio.Event] = []
+        self._tasks: list[Optional[asyncio.Task]] = []
+
+    def submit(self, call: dict[str, Any], eager: bool = False) -> bool:
+        """Queue ``call``; returns True if it was started right away."""
+        idx = len(self._calls)
+        if call.get("arguments_error"):
+            # Answered with an error without running anything.
+            access = ToolAccess(READ)
+        else:
+            access = classify_call(call.get("name", ""), call.get("arguments") or {})
+        self._calls.append(call)
+        self._accesses.append(access)
+        self._finished.append(asyncio.Event())
+        self._tasks.append(None)
+        if eager and access.kind == READ:
+            self._tasks[idx] = asyncio.create_task(self._run_at(idx))
+            return True
+        return False
+
+    async def _run_at(self, idx: int) -> Any:
+        access = self._accesses[idx]
+        try:
+            for earlier in range(idx):
+                if access.conflicts_with(self._accesses[earlier]):
+                    await self._finished[earlier].wait()
+            async with self._slots[access.kind]:
+                return await self._runner(idx, self._calls[idx])
+        finally:
+            self._finished[idx].set()
+
+    async def finish(self) -> list[Any]:
+        """Start the remaining calls; results (or exceptions) in call order."""
+        for idx, task in enumerate(self._tasks):
+            if task is None:
+                self._tasks[idx] = asyncio.create_task(self._run_at(idx))
+        try:
+            return await asyncio.gather(*self._tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            if task is not None and not task.done():
+                task.cancel()
+
+
+class ToolScheduler:
+    def __init__(self, limits: dict[str, int]):
+        self.limits = {kind: max(1, int(limit)) for kind, limit in limits.items()}
+
+    def start_round(
+        self, runner: Callable[[int, dict[str, Any]], Awaitable[Any]]
+    ) -> ToolRound:
+        return ToolRound(self.limits, runner)
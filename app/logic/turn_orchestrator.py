@@ -3,7 +3,10 @@ import re
 from typing import TYPE_CHECKING, Any
 
 from app.core.runtime_config import PLAN_MODE, PLAN_MESSAGE_PREFIX, PLAN_SKIP_TOKEN
+from app.logic.tool_memo import tool_memo
 from app.ui.screens import ChatScreen, PlanConfirmModal
+from app.utils.checkpoints import checkpoint_journal
+from app.utils.file_cache import file_cache
 
 if TYPE_CHECKING:
     from app.ui.app import OpenDevApp
@@ -14,6 +17,10 @@ class TurnOrchestrator:
         self.app = app
 
     async def handle_user_turn(self, user_input: str) -> None:
+        # Writes the journal and may prune old blobs: keep it off the event loop.
+        await asyncio.to_thread(checkpoint_journal.begin, " ".join(user_input.split())[:60])
+        file_cache.begin_turn()
+        tool_memo.begin_turn()
         if self.app.get_current_mode() == PLAN_MODE:
             await self._run_plan_turn(user_input)
             return
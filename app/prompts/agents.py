@@ -30,10 +30,11 @@ Write and modify code.
 WORKFLOW:
 1. search_codebase/grep_search - Find affected paths and patterns
 2. read_file/read_files_batch - Study existing code and call chains
-3. edit_file/replace_regex/write_file - Implement surgical changes
-4. run_tests - Verify
+3. edit_file/replace_regex/write_file - Implement surgical changes (apply_edits for multi-file changes)
+4. run_impacted_tests (run_tests for non-Python suites) - Verify
 
 RULES:
+- Start dev servers/watchers with job_start and check them with job_tail; never block on them
 - Minimal changes, no rewrites
 - Match existing style
 - Avoid speculative refactors unless requested"""
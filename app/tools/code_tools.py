@@ -1,9 +1,31 @@
 import re
 import ast
+import json
+import shutil
 import asyncio
+import functools
+import subprocess
 from pathlib import Path
 from typing import Optional
 
+from app.core.runtime_config import (
+    CODEMOD_MAX_FILE_BYTES,
+    CODEMOD_MAX_FILES,
+    CODEMOD_MAX_WORKERS,
+    CODEMOD_PARALLEL_THRESHOLD,
+    GREP_MAX_MATCHES,
+)
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.atomic_io import atomic_write_text
+from app.utils.checkpoints import checkpoint_journal, store_blob
+from app.utils.file_cache import file_cache
+from app.utils.file_search import walk_files
+from app.utils.session_stats import session_tracker
+
+
+# search_codebase has always looked inside dist/ and build/, unlike walk_files' default.
+_SEARCH_SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
 
 async def search_codebase(
     regex_pattern: str, directory: str = ".", include_exts: list = None
@@ -21,16 +43,9 @@ def _search_codebase_sync(regex_pattern: str, directory: str, include_exts: list
         pattern = re.compile(regex_pattern, re.MULTILINE)
         include_exts = include_exts or []
 
-        for f in path.rglob("*"):
-            if not f.is_file():
-                continue
+        for f in walk_files(path, skip_dirs=_SEARCH_SKIP_DIRS):
             if include_exts and f.suffix not in include_exts:
                 continue
-            if any(
-                skip in f.parts
-                for skip in [".git", "node_modules", "__pycache__", ".venv", "venv"]
-            ):
-                continue
             try:
                 with open(f, "r", encoding="utf-8", errors="ignore") as file:
                     for i, line in enumerate(file, 1):
@@ -45,14 +60,135 @@ def _search_codebase_sync(regex_pattern: str, directory: str, include_exts: list
         return f"Error: {type(e).__name__}: {str(e)}"
 
 
+async def multi_search(
+    patterns: list = None,
+    regex_patterns: list = None,
+    directory: str = ".",
+    path_glob: str = None,
+    case_sensitive: bool = False,
+    max_per_pattern: int = 20,
+) -> str:
+    try:
+        return await asyncio.to_thread(
+            _multi_search_sync,
+            patterns or [],
+            regex_patterns or [],
+            directory,
+            path_glob,
+            case_sensitive,
+            max_per_pattern,
+        )
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+def _multi_search_sync(
+    patterns: list,
+    regex_patterns: list,
+    directory: str,
+    path_glob: str,
+    case_sensitive: bool,
+    max_per_pattern: int,
+) -> str:
+    literals = [str(p) for p in patterns if str(p)]
+    regex_sources = [str(p) for p in regex_patterns if str(p)]
+    if not literals and not regex_sources:
+        return "Error: patterns or regex_patterns is required"
+
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    # Each regex is compiled on its own: joined into one alternation, group
+    # numbers shift (breaking backreferences), inline flags become errors and
+    # one bad pattern would sink the rest.
+    regexes: list[Optional[re.Pattern]] = []
+    regex_errors: dict[int, str] = {}
+    for offset, source in enumerate(regex_sources):
+        try:
+            regexes.append(re.compile(source, flags))
+        except re.error as e:
+            regexes.append(None)
+            regex_errors[len(literals) + offset] = str(e)
+    if not literals and len(regex_errors) == len(regex_sources):
+        source = regex_sources[0]
+        return f"Error: Invalid regex pattern '{source}': {regex_errors[len(literals)]}"
+
+    labels = literals + regex_sources
+    fold = (lambda text: text) if case_sensitive else str.lower
+    automaton = AhoCorasick([fold(lit) for lit in literals])
+    limit = max(1, min(int(max_per_pattern), 200))
+    hits: list[list[str]] = [[] for _ in labels]
+    open_ids = set(range(len(labels))) - set(regex_errors)
+
+    def build_literal_prefilter() -> Optional[re.Pattern]:
+        # One C-level alternation finds lines with any open literal.
+        alternatives = [re.escape(literals[i]) for i in open_ids if i < len(literals)]
+        return re.compile("|".join(alternatives), flags) if alternatives else None
+
+    def candidate_lines(text: str) -> list[int]:
+        scanners = [build_literal_prefilter()]
+        scanners += [regexes[i - len(literals)] for i in open_ids if i >= len(literals)]
+        starts: set[int] = set()
+        for scanner in scanners:
+            if scanner is None:
+                continue
+            pos = 0
+            while pos <= len(text):
+                match = scanner.search(text, pos)
+                if match is None:
+                    break
+                starts.add(text.rfind("\n", 0, match.start()) + 1)
+                line_end = text.find("\n", match.end())
+                if line_end < 0:
+                    break
+                pos = line_end + 1
+        return sorted(starts)
+
+    root = Path(directory).expanduser()
+    for f in walk_files(root, path_glob or None):
+        try:
+            with open(f, "r", encoding="utf-8", errors="ignore") as file:
+                text = file.read()
+        except OSError:
+            continue
+        # Per-line attribution reports every pattern on a candidate line, overlaps included.
+        for line_start in candidate_lines(text):
+            if not open_ids:
+                break
+            line_end = text.find("\n", line_start)
+            line_end = len(text) if line_end < 0 else line_end
+            line = text[line_start:line_end]
+            line_no = text.count("\n", 0, line_start) + 1
+
+            found = {idx for idx in automaton.matched_words(fold(line)) if idx in open_ids}
+            for offset, regex in enumerate(regexes):
+                idx = len(literals) + offset
+                if idx in open_ids and regex.search(line):
+                    found.add(idx)
+            for idx in found:
+                hits[idx].append(f"{f}:{line_no}: {line.strip()[:200]}")
+                if len(hits[idx]) >= limit:
+                    open_ids.discard(idx)
+        if not open_ids:
+            break
+
+    sections = []
+    for idx, label in enumerate(labels):
+        kind = "literal" if idx < len(literals) else "regex"
+        if idx in regex_errors:
+            sections.append(f"## {kind}: {label}\nError: Invalid regex pattern: {regex_errors[idx]}")
+            continue
+        count = f"{len(hits[idx])}+" if len(hits[idx]) >= limit else str(len(hits[idx]))
+        body = "\n".join(hits[idx]) if hits[idx] else "No matches found"
+        sections.append(f"## {kind}: {label} ({count} matches)\n{body}")
+    return "\n\n".join(sections)
+
+
 def get_code_structure(filepath: str) -> str:
     try:
         path = Path(filepath).expanduser()
         if not path.exists():
             return f"Error: File not found: {filepath}"
 
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = file_cache.read_text(path)
 
         ext = path.suffix.lower()
 
@@ -132,53 +268,336 @@ async def grep_search(
     include: str = None,
     exclude: str = None,
     case_sensitive: bool = False,
+    context_lines: int = 0,
 ) -> str:
     try:
-        return await asyncio.to_thread(_grep_search_sync, pattern, directory, include, exclude, case_sensitive)
+        return await _grep_search(
+            pattern, directory, include, exclude, case_sensitive, context_lines
+        )
     except Exception as e:
         return f"Error: {type(e).__name__}: {str(e)}"
 
 
-def _grep_search_sync(pattern: str, directory: str, include: str, exclude: str, case_sensitive: bool) -> str:
-    import subprocess
-    cmd = ["grep", "-rn" + ("" if case_sensitive else "i")]
+_GREP_SKIP_DIRS = [".git", "node_modules", "__pycache__", ".venv", "venv"]
+
+
+def _rg_command(
+    pattern: str, directory: str, include: str, exclude: str, case_sensitive: bool, context: int
+) -> list[str]:
+    cmd = ["rg", "--json", "--hidden", "--no-messages", "--max-columns", "500"]
+    if not case_sensitive:
+        cmd.append("-i")
+    if context:
+        cmd.extend(["-C", str(context)])
+    if include:
+        cmd.extend(["--glob", include])
+    if exclude:
+        cmd.extend(["--glob", f"!{exclude}"])
+    for skip in _GREP_SKIP_DIRS:
+        cmd.extend(["--glob", f"!{skip}/"])
+    cmd.extend(["-e", pattern, directory])
+    return cmd
+
+
+@functools.lru_cache(maxsize=1)
+def _grep_dialect_flag() -> str:
+    # Patterns are written for rg's Rust regex (\d, \s, (?i), +, |); PCRE is
+    # the closest grep dialect, ERE the fallback where -P isn't built in.
+    try:
+        probe = subprocess.run(
+            ["grep", "-P", "x"], input=b"x\n", capture_output=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "-E"
+    return "-P" if probe.returncode == 0 else "-E"
+
+
+def _grep_command(
+    pattern: str, directory: str, include: str, exclude: str, case_sensitive: bool, context: int
+) -> list[str]:
+    # -Z terminates file names with NUL so "-" / ":" in paths parse unambiguously.
+    cmd = ["grep", _grep_dialect_flag(), "-rnsZ" + ("" if case_sensitive else "i")]
+    if context:
+        cmd.extend(["-C", str(context)])
     if include:
         cmd.extend(["--include", include])
     if exclude:
         cmd.extend(["--exclude", exclude])
-    
-    # Exclude common directories
-    for skip in [".git", "node_modules", "__pycache__", ".venv", "venv"]:
+    for skip in _GREP_SKIP_DIRS:
         cmd.extend(["--exclude-dir", skip])
-        
-    cmd.extend([pattern, directory])
-    
+    cmd.extend(["-e", pattern, directory])
+    return cmd
+
+
+def _parse_rg_line(raw: bytes) -> tuple[str, str, str] | None:
+    """Return (kind, path, formatted line) for rg --json match/context events."""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        output = result.stdout
-        if not output and result.stderr:
-            return f"Error: {result.stderr}"
-        
-        lines = output.splitlines()
-        if len(lines) > 100:
-            return "\n".join(lines[:100]) + f"\n... (truncated, {len(lines)} total matches)"
-        return output or "No matches found"
+        event = json.loads(raw)
+    except ValueError:
+        return None
+    kind = event.get("type")
+    if kind not in ("match", "context"):
+        return None
+    data = event.get("data", {})
+    path = data.get("path", {}).get("text", "<binary path>")
+    text = data.get("lines", {}).get("text", "").rstrip("\n")
+    sep = ":" if kind == "match" else "-"
+    return kind, path, f"{path}{sep}{data.get('line_number')}{sep} {text}"
+
+
+def _parse_grep_line(raw: bytes) -> tuple[str, str, str] | None:
+    line = raw.decode("utf-8", errors="replace").rstrip("\n")
+    if line == "--":
+        return "separator", "", line
+    path, nul, rest = line.partition("\0")
+    if not nul:
+        return None
+    number, sep, text = rest.partition(":")
+    if sep and number.isdigit():
+        return "match", path, f"{path}:{number}: {text}"
+    number, sep, text = rest.partition("-")
+    if sep and number.isdigit():
+        return "context", path, f"{path}-{number}- {text}"
+    return None
+
+
+async def _grep_search(
+    pattern: str,
+    directory: str,
+    include: str,
+    exclude: str,
+    case_sensitive: bool,
+    context_lines: int,
+) -> str:
+    if not Path(directory).expanduser().exists():
+        return f"Error: Directory not found: {directory}"
+    directory = str(Path(directory).expanduser())
+    context = max(0, min(int(context_lines or 0), 10))
+    use_rg = shutil.which("rg") is not None
+    build = _rg_command if use_rg else _grep_command
+    parse = _parse_rg_line if use_rg else _parse_grep_line
+    if not use_rg:
+        await asyncio.to_thread(_grep_dialect_flag)
+    process = await asyncio.create_subprocess_exec(
+        *build(pattern, directory, include, exclude, case_sensitive, context),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=8 * 1024 * 1024,
+    )
+
+    lines: list[str] = []
+    matches = 0
+    truncated = False
+    finished = False
+    last_path = None
+    try:
+        while True:
+            raw = await process.stdout.readline()
+            if not raw:
+                finished = True
+                break
+            parsed = parse(raw)
+            if parsed is None:
+                continue
+            kind, path, formatted = parsed
+            if kind == "separator":
+                lines.append("--")
+                continue
+            if use_rg and context:
+                # rg --json has no separators; emit one between files.
+                if last_path is not None and path != last_path:
+                    lines.append("--")
+                last_path = path
+            if kind == "match":
+                if matches >= GREP_MAX_MATCHES:
+                    truncated = True
+                    break
+                matches += 1
+            lines.append(formatted)
+    finally:
+        # Only a search stopped early (hit budget, cancellation) is killed; a
+        # finished one is reaped so its exit status reports bad patterns.
+        if not finished and process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+        stderr = await process.stderr.read()
+
+    if not matches:
+        if process.returncode == 2 and stderr:
+            return f"Error: {stderr.decode(errors='replace').strip()}"
+        return "No matches found"
+    while lines and lines[-1] == "--":
+        lines.pop()
+    result = "\n".join(lines)
+    if truncated:
+        result += f"\n... (stopped after {GREP_MAX_MATCHES} matches; narrow the pattern or directory)"
+    return result
+
+
+async def codemod_regex(
+    pattern: str,
+    replacement: str,
+    path_glob: str = "**/*",
+    directory: str = ".",
+    apply: bool = False,
+) -> str:
+    try:
+        return await asyncio.to_thread(
+            _codemod_regex_sync, pattern, replacement, path_glob, directory, apply
+        )
     except Exception as e:
-        return f"Error: {str(e)}"
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+def _codemod_file(
+    filepath: str, pattern: str, replacement: str, apply: bool, max_samples: int
+) -> tuple[str, int, int, list[tuple[int, str, str]], str | None, str | None]:
+    """Pool worker: (path, matches, changed lines, samples, error, pre-image digest)."""
+    try:
+        with open(filepath, "rb") as f:
+            data = f.read(CODEMOD_MAX_FILE_BYTES + 1)
+        if len(data) > CODEMOD_MAX_FILE_BYTES or b"\0" in data[:8192]:
+            return filepath, 0, 0, [], None, None
+        content = data.decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return filepath, 0, 0, [], None, None
+
+    regex = re.compile(pattern, re.MULTILINE)
+    samples: list[tuple[int, str, str]] = []
+    count = 0
+    changed_lines: set[int] = set()
+    for match in regex.finditer(content):
+        count += 1
+        line_no = content.count("\n", 0, match.start()) + 1
+        changed_lines.update(
+            range(line_no, line_no + content.count("\n", match.start(), match.end()) + 1)
+        )
+        if len(samples) < max_samples:
+            line_start = content.rfind("\n", 0, match.start()) + 1
+            line_end = content.find("\n", match.end())
+            line_end = len(content) if line_end < 0 else line_end
+            old = content[line_start:line_end]
+            new = (
+                content[line_start : match.start()]
+                + match.expand(replacement)
+                + content[match.end() : line_end]
+            )
+            samples.append((line_no, old, new))
+    if not count:
+        return filepath, 0, 0, [], None, None
+
+    digest = None
+    if apply:
+        try:
+            digest = store_blob(data)
+            atomic_write_text(Path(filepath), regex.sub(replacement, content))
+        except Exception as e:
+            return filepath, count, 0, samples, f"{type(e).__name__}: {e}", None
+    return filepath, count, len(changed_lines), samples, None, digest
+
+
+def _codemod_regex_sync(
+    pattern: str,
+    replacement: str,
+    path_glob: str,
+    directory: str,
+    apply: bool,
+) -> str:
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        re.compile(pattern, re.MULTILINE).sub(replacement, "")
+    except (re.error, IndexError) as e:
+        return f"Error: Invalid regex pattern or replacement: {str(e)}"
+
+    root = Path(directory).expanduser()
+    if not root.exists():
+        return f"Error: Directory not found: {directory}"
+
+    files = []
+    for f in walk_files(root, path_glob or None):
+        files.append(str(f))
+        if len(files) > CODEMOD_MAX_FILES:
+            return (
+                f"Error: More than {CODEMOD_MAX_FILES} files match '{path_glob}'. "
+                "Narrow path_glob or directory."
+            )
+
+    max_samples = 3
+    args = (
+        files,
+        [pattern] * len(files),
+        [replacement] * len(files),
+        [apply] * len(files),
+        [max_samples] * len(files),
+    )
+    if len(files) >= CODEMOD_PARALLEL_THRESHOLD:
+        # Threads, not processes: forking the threaded app is unsafe and the
+        # frozen build can't re-launch itself for spawn workers. Reads, writes
+        # and the regex engine's large-buffer work overlap well enough.
+        with ThreadPoolExecutor(max_workers=CODEMOD_MAX_WORKERS) as pool:
+            results = list(pool.map(_codemod_file, *args))
+    else:
+        results = list(map(_codemod_file, *args))
+
+    hits = [r for r in results if r[1]]
+    if not hits:
+        return f"No regex matches found in {len(files)} file(s)"
+
+    total = sum(r[1] for r in hits)
+    errors = [f"- {path}: {error}" for path, _, _, _, error, _ in hits if error]
+    if apply:
+        with checkpoint_journal.batch():
+            for path, *_, digest in hits:
+                if digest is not None:
+                    checkpoint_journal.record_digest(Path(path), digest)
+                file_cache.invalidate(Path(path))
+        changed = sum(r[2] for r in hits if not r[4])
+        session_tracker.record_code_changes(changed, changed)
+        header = (
+            f"Success: Replaced {total} occurrence(s) in "
+            f"{len(hits) - len(errors)} file(s) (scanned {len(files)})"
+        )
+    else:
+        header = (
+            f"Dry run: {total} match(es) in {len(hits)} file(s) (scanned {len(files)}). "
+            "Re-run with apply=true to write."
+        )
+
+    lines = [header]
+    if errors:
+        lines.append("Failed to write:\n" + "\n".join(errors))
+    for path, count, _, samples, *_ in hits[:50]:
+        lines.append(f"\n## {path} ({count})")
+        for line_no, old, new in samples:
+            lines.append(f"{line_no}: - {old.strip()[:160]}")
+            lines.append(f"{line_no}: + {new.strip()[:160]}")
+    if len(hits) > 50:
+        lines.append(f"\n... ({len(hits) - 50} more file(s))")
+    return "\n".join(lines)
 
 
 CODE_TOOLS = [
     {
         "name": "grep_search",
-        "description": "Search for text within files using grep-like functionality.",
+        "description": "Regex search within files (ripgrep's Rust regex syntax; the grep fallback uses PCRE or ERE and does not read .gitignore). Stops after 100 matches.",
         "parameters": {
             "type": "object",
             "properties": {
-                "pattern": {"type": "string", "description": "Text pattern to search for"},
+                "pattern": {"type": "string", "description": "Regex pattern to search for (escape literal . ( [ etc.)"},
                 "directory": {"type": "string", "description": "Directory to search (default: current)"},
                 "include": {"type": "string", "description": "File pattern to include (e.g., '*.py')"},
                 "exclude": {"type": "string", "description": "File pattern to exclude"},
                 "case_sensitive": {"type": "boolean", "description": "Perform case-sensitive search"},
+                "context_lines": {
+                    "type": "integer",
+                    "description": "Lines of context around each match",
+                    "minimum": 0,
+                    "maximum": 10,
+                },
             },
             "required": ["pattern"],
         },
@@ -220,4 +639,61 @@ CODE_TOOLS = [
         },
         "handler": get_code_structure,
     },
+    {
+        "name": "codemod_regex",
+        "description": (
+            "Regex search/replace across all files matching a glob, in parallel. "
+            "Dry run by default (per-file counts and sample hunks); set apply=true to write."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string", "description": "Regex pattern (multiline mode)"},
+                "replacement": {
+                    "type": "string",
+                    "description": "Replacement text (supports \\1 / \\g<name> backreferences)",
+                },
+                "path_glob": {
+                    "type": "string",
+                    "description": "File glob relative to directory (e.g., '**/*.py', 'src/**/*.ts')",
+                },
+                "directory": {"type": "string", "description": "Root directory (default: current)"},
+                "apply": {"type": "boolean", "description": "Write changes (default: false, dry run)"},
+            },
+            "required": ["pattern", "replacement"],
+        },
+        "handler": codemod_regex,
+    },
+    {
+        "name": "multi_search",
+        "description": (
+            "Search for several literal and/or regex patterns in one pass over the tree. "
+            "Results are grouped per pattern. Prefer over repeated grep_search calls for related identifiers."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "patterns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Literal strings to search for",
+                },
+                "regex_patterns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Regex patterns to search for",
+                },
+                "directory": {"type": "string", "description": "Directory to search (default: current)"},
+                "path_glob": {"type": "string", "description": "File glob filter (e.g., '**/*.py')"},
+                "case_sensitive": {"type": "boolean", "description": "Case-sensitive matching (default: false)"},
+                "max_per_pattern": {
+                    "type": "integer",
+                    "description": "Maximum matching lines reported per pattern",
+                    "minimum": 1,
+                    "maximum": 200,
+                },
+            },
+        },
+        "handler": multi_search,
+    },
 ]
@@ -1,9 +1,27 @@
 import asyncio
 import json
 import os
+import signal
+import tempfile
+import time
 from pathlib import Path
 from typing import Optional
 
+from app.core.runtime_config import PROCESS_KILL_WAIT_SECONDS, TEST_RUN_TIMEOUT
+from app.utils.cancellation import OperationCancelled, cancellable
+from app.utils.command_cache import command_cache
+from app.utils.git_service import get_git_service, parse_status_v2
+from app.utils.job_manager import job_manager
+from app.utils.output_capture import OutputCapture
+from app.utils.shell_session import ShellTimeout, shell_session
+from app.utils.impact import (
+    TestReport,
+    format_report,
+    get_import_graph,
+    parse_junit,
+    shard_files,
+)
+
 
 def _find_test_root(file_path: Path) -> str:
     current = file_path.parent
@@ -65,36 +83,125 @@ def _truncate_output(output: str, max_len: int = 5000) -> str:
     )
 
 
+async def _pump(stream: asyncio.StreamReader, capture: OutputCapture) -> None:
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return
+        capture.feed(chunk)
+
+
+def _format_output(
+    stdout: OutputCapture, stderr: OutputCapture, returncode: Optional[int]
+) -> str:
+    output = []
+    out = stdout.render().strip()
+    err = stderr.render().strip()
+    if out:
+        output.append(out)
+    if err:
+        output.append(f"stderr: {err}")
+    if returncode:
+        output.append(f"Exit code: {returncode}")
+    return "\n".join(output) if output else "Command completed with no output"
+
+
+def _timeout_error(timeout: int, stdout: OutputCapture, stderr: OutputCapture) -> str:
+    return _interrupted_error(f"Command timed out after {timeout} seconds", stdout, stderr)
+
+
+def _cancelled_error(stdout: OutputCapture, stderr: OutputCapture) -> str:
+    return _interrupted_error("Command cancelled by user", stdout, stderr)
+
+
+def _interrupted_error(reason: str, stdout: OutputCapture, stderr: OutputCapture) -> str:
+    message = f"Error: {reason}"
+    partial = _format_output(stdout, stderr, None)
+    if stdout.total_chars or stderr.total_chars:
+        message += f"\nPartial output:\n{partial}"
+    return message
+
+
+async def _collect_process_output(
+    process: asyncio.subprocess.Process, timeout: int
+) -> str:
+    # Stream both pipes into bounded captures instead of communicate(), so memory
+    # stays flat and the UI sees progress while the command runs.
+    stdout = OutputCapture("stdout")
+    stderr = OutputCapture("stderr")
+    try:
+        await cancellable(
+            asyncio.gather(
+                _pump(process.stdout, stdout),
+                _pump(process.stderr, stderr),
+                process.wait(),
+            ),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        await _kill_process_group(process)
+        return _timeout_error(timeout, stdout, stderr)
+    except OperationCancelled:
+        await _kill_process_group(process)
+        return _cancelled_error(stdout, stderr)
+    except asyncio.CancelledError:
+        await _kill_process_group(process)
+        raise
+    return _format_output(stdout, stderr, process.returncode)
+
+
+async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    # Commands run in their own session; kill the whole group so children
+    # holding the pipes open (``sleep`` under ``sh -c``) go too.
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    # SIGKILL is already sent, so a second cancel may interrupt the reap.
+    try:
+        await asyncio.wait_for(process.wait(), timeout=PROCESS_KILL_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+
 async def _run_shell_command(
     command: str,
     timeout: int = 60,
     working_dir: Optional[str] = None,
 ) -> str:
+    if shell_session.enabled:
+        stdout = OutputCapture("stdout")
+        stderr = OutputCapture("stderr")
+        try:
+            code = await shell_session.run(
+                command,
+                stdout,
+                stderr,
+                timeout,
+                _resolve_cwd(working_dir) if working_dir else None,
+            )
+        except ShellTimeout:
+            return _timeout_error(timeout, stdout, stderr) + "\n(shell session was restarted)"
+        except OperationCancelled:
+            return _cancelled_error(stdout, stderr) + "\n(shell session was restarted)"
+        return _format_output(stdout, stderr, code)
+
+    cwd = _resolve_cwd(working_dir)
+    cached, fingerprint = command_cache.lookup(command, cwd)
+    if cached is not None:
+        return f"{cached}\n(cached)"
+
     process = await asyncio.create_subprocess_shell(
         command,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
-        cwd=_resolve_cwd(working_dir),
+        cwd=cwd,
+        start_new_session=True,
     )
-
-    try:
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-    except asyncio.TimeoutError:
-        try:
-            process.kill()
-        except ProcessLookupError:
-            pass
-        return f"Error: Command timed out after {timeout} seconds"
-
-    output = []
-    if stdout:
-        output.append(stdout.decode().strip())
-    if stderr:
-        output.append(f"stderr: {stderr.decode().strip()}")
-    if process.returncode != 0:
-        output.append(f"Exit code: {process.returncode}")
-    result = "\n".join(output) if output else "Command completed with no output"
-    return _truncate_output(result)
+    result = await _collect_process_output(process, timeout)
+    if fingerprint is not None:
+        command_cache.put(command, cwd, fingerprint, result)
+    return result
 
 
 async def _run_exec_command(
@@ -107,26 +214,9 @@ async def _run_exec_command(
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
         cwd=_resolve_cwd(working_dir),
+        start_new_session=True,
     )
-
-    try:
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-    except asyncio.TimeoutError:
-        try:
-            process.kill()
-        except ProcessLookupError:
-            pass
-        return f"Error: Command timed out after {timeout} seconds"
-
-    output = []
-    if stdout:
-        output.append(stdout.decode().strip())
-    if stderr:
-        output.append(f"stderr: {stderr.decode().strip()}")
-    if process.returncode != 0:
-        output.append(f"Exit code: {process.returncode}")
-    result = "\n".join(output) if output else "Command completed with no output"
-    return _truncate_output(result)
+    return await _collect_process_output(process, timeout)
 
 
 async def write_test(
@@ -151,8 +241,9 @@ async def write_test(
             return f"Test written to: {test_path}"
 
         if framework == "pytest":
+            # Only the file just written; the full suite belongs to run_impacted_tests.
             result = await _run_exec_command(
-                ["pytest", "--cov=.", "--cov-report=term-missing", "-q"],
+                ["pytest", "--cov=.", "--cov-report=term-missing", "-q", str(test_file)],
                 timeout=120,
                 working_dir=project_root,
             )
@@ -165,7 +256,7 @@ async def write_test(
         else:
             return f"Test written to: {test_path}"
 
-        return f"Test: {test_path}\n\n{_truncate_output(result, max_len=3000)}"
+        return f"Test: {test_path}\n\n{result}"
     except Exception as e:
         return f"Error: {type(e).__name__}: {str(e)}"
 
@@ -177,18 +268,154 @@ async def execute_command(
     working_dir: Optional[str] = None,
 ) -> str:
     try:
-        cwd = _resolve_cwd(working_dir)
         if background:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.DEVNULL,
-                cwd=cwd,
-                start_new_session=True,
-            )
-            return f"Command started in background with PID {process.pid}"
+            return await job_start(command, working_dir)
+
+        return await _run_shell_command(command, timeout=timeout, working_dir=working_dir)
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+async def job_start(command: str, working_dir: Optional[str] = None) -> str:
+    try:
+        cwd = _resolve_cwd(working_dir)
+        if not Path(cwd).is_dir():
+            return f"Error: Directory not found: {cwd}"
+        job = await job_manager.start(command, cwd)
+        return (
+            f"Started job {job.id} (PID {job.process.pid}). "
+            f"Use job_tail/job_wait/job_kill with job_id={job.id}."
+        )
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+def _job_or_error(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return None, f"Error: Unknown job: {job_id}"
+    return job, None
+
+
+async def job_status(job_id: Optional[str] = None) -> str:
+    if job_id:
+        job, error = _job_or_error(job_id)
+        return error or job.describe()
+    jobs = job_manager.jobs()
+    if not jobs:
+        return "No background jobs"
+    return "\n".join(job.describe() for job in jobs)
+
+
+async def job_tail(job_id: str, lines: int = 50) -> str:
+    job, error = _job_or_error(job_id)
+    if error:
+        return error
+    output = job_manager.tail(job, max(1, min(int(lines), 500)))
+    body = "\n".join(output) if output else "(no output yet)"
+    return f"{job.describe()}\n{_truncate_output(body, max_len=8000)}"
+
+
+async def job_wait(job_id: str, timeout: int = 60) -> str:
+    job, error = _job_or_error(job_id)
+    if error:
+        return error
+    finished = await job_manager.wait(job, max(0, min(int(timeout), 600)))
+    note = "" if finished else f"Still running after {timeout}s.\n"
+    tail = "\n".join(job_manager.tail(job, 30))
+    return f"{note}{job.describe()}\n{_truncate_output(tail, max_len=5000)}"
+
+
+async def job_kill(job_id: str) -> str:
+    job, error = _job_or_error(job_id)
+    if error:
+        return error
+    if not job.running:
+        return f"Job {job.id} already exited ({job.returncode})"
+    await job_manager.kill(job)
+    return f"Success: Killed job {job.id} ({job.describe()})"
+
+
+def _git_service_or_error(working_dir: Optional[str]):
+    service = get_git_service(_resolve_cwd(working_dir))
+    if service is None:
+        return None, "Error: Not a git repository"
+    return service, None
+
+
+def _format_git_status(status) -> str:
+    branch = status.branch or "(detached HEAD)"
+    lines = [f"On branch {branch}"]
+    if status.upstream:
+        lines[0] += f" (upstream {status.upstream}, ahead {status.ahead}, behind {status.behind})"
+    staged = [e for e in status.entries if e.index != "."]
+    unstaged = [e for e in status.entries if e.worktree != "."]
+    if staged:
+        lines.append(f"Staged ({len(staged)}):")
+        lines.extend(
+            f"  {e.index} {e.path}" + (f" <- {e.orig_path}" if e.orig_path else "")
+            for e in staged
+        )
+    if unstaged:
+        lines.append(f"Unstaged ({len(unstaged)}):")
+        lines.extend(f"  {e.worktree} {e.path}" for e in unstaged)
+    if status.conflicted:
+        lines.append(f"Conflicted ({len(status.conflicted)}): " + ", ".join(status.conflicted))
+    if status.untracked:
+        shown = status.untracked[:50]
+        more = f" ... (+{len(status.untracked) - 50})" if len(status.untracked) > 50 else ""
+        lines.append(f"Untracked ({len(status.untracked)}): " + ", ".join(shown) + more)
+    if len(lines) == 1:
+        lines.append("Working tree clean")
+    return "\n".join(lines)
+
+
+async def git_status(working_dir: Optional[str] = None) -> str:
+    try:
+        service, error = _git_service_or_error(working_dir)
+        if error:
+            return error
+        return _format_git_status(await asyncio.to_thread(service.status))
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
 
-        return await _run_shell_command(command, timeout=timeout, working_dir=cwd)
+
+async def git_diff(
+    staged: bool = False,
+    path: Optional[str] = None,
+    stat: bool = False,
+    working_dir: Optional[str] = None,
+) -> str:
+    try:
+        service, error = _git_service_or_error(working_dir)
+        if error:
+            return error
+        diff = await asyncio.to_thread(service.diff, staged, path, stat)
+        if not diff.strip():
+            return "No staged changes" if staged else "No unstaged changes"
+        return _truncate_output(diff, max_len=20000)
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+async def git_log(
+    max_count: int = 20,
+    revision: str = "HEAD",
+    working_dir: Optional[str] = None,
+) -> str:
+    try:
+        service, error = _git_service_or_error(working_dir)
+        if error:
+            return error
+        count = max(1, min(int(max_count), 200))
+        commits = await asyncio.to_thread(service.log, count, revision or "HEAD")
+        if not commits:
+            return f"No commits found for {revision}"
+        return "\n".join(
+            f"{c.sha[:10]} {time.strftime('%Y-%m-%d', time.localtime(c.timestamp))} "
+            f"{c.author}: {c.subject}"
+            for c in commits
+        )
     except Exception as e:
         return f"Error: {type(e).__name__}: {str(e)}"
 
@@ -208,6 +435,89 @@ async def run_tests(command: str, working_dir: Optional[str] = None) -> str:
         return f"Error: {type(e).__name__}: {str(e)}"
 
 
+async def _git_output(root: str, *args: str) -> Optional[bytes]:
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        cwd=root,
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        return None
+    return stdout
+
+
+async def _changed_files(root: str) -> list[str]:
+    # Porcelain paths are relative to the repository top level, not to root.
+    toplevel = await _git_output(root, "rev-parse", "--show-toplevel")
+    raw = await _git_output(root, "status", "--porcelain=v2", "-z", "-uall")
+    if not toplevel or raw is None:
+        return []
+    top = toplevel.decode(errors="replace").strip()
+    status = parse_status_v2(raw)
+    paths = [entry.path for entry in status.entries]
+    # A rename's old path counts too: its importers now point at nothing.
+    paths += [entry.orig_path for entry in status.entries if entry.orig_path]
+    paths += status.untracked + status.conflicted
+    return [os.path.join(top, path) for path in dict.fromkeys(paths)]
+
+
+async def run_impacted_tests(
+    changed_files: Optional[list[str]] = None,
+    working_dir: Optional[str] = None,
+    workers: int = 0,
+    timeout: int = TEST_RUN_TIMEOUT,
+) -> str:
+    try:
+        root = _resolve_cwd(working_dir)
+        changed = changed_files or await _changed_files(root)
+        if not changed:
+            return "No changed files (pass changed_files, or modify files in a git work tree)"
+
+        graph = get_import_graph(root)
+        tests, module_count = await asyncio.to_thread(graph.impacted_tests, changed)
+        header = (
+            f"Impacted: {len(tests)} test file(s) for {len(changed)} changed file(s) "
+            f"(import graph of {module_count} modules)"
+        )
+        if not tests:
+            return f"{header}\nNo impacted tests found."
+
+        shard_count = max(1, min(int(workers) or (os.cpu_count() or 2), len(tests), 16))
+        shards = shard_files(tests, Path(root), shard_count)
+        python = os.environ.get("PYTHON", "python")
+        report = TestReport()
+        problems: list[str] = []
+
+        with tempfile.TemporaryDirectory(prefix="opendev-tests-") as tmp:
+
+            async def run_shard(number: int, files: list[str]) -> None:
+                xml_path = os.path.join(tmp, f"shard-{number}.xml")
+                output = await _run_exec_command(
+                    [
+                        python, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                        "-o", "junit_family=xunit1", f"--junitxml={xml_path}", *files,
+                    ],
+                    timeout=timeout,
+                    working_dir=root,
+                )
+                # Collection errors or a missing pytest leave no XML behind.
+                if not parse_junit(xml_path, report):
+                    problems.append(f"shard {number}: {output[-1500:]}")
+
+            start = time.perf_counter()
+            await asyncio.gather(*(run_shard(i, files) for i, files in enumerate(shards, 1)))
+            elapsed = time.perf_counter() - start
+
+        lines = [header, format_report(report, elapsed, len(shards))]
+        if problems:
+            lines.append("Runner problems:\n" + "\n".join(problems))
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
 def _mask_env_value(key: str, value: str) -> str:
     sensitive = ["KEY", "TOKEN", "SECRET", "PASSWORD", "PASS", "PRIVATE", "AUTH"]
     if any(flag in key.upper() for flag in sensitive):
@@ -362,6 +672,33 @@ EXEC_TOOLS = [
         },
         "handler": run_tests,
     },
+    {
+        "name": "run_impacted_tests",
+        "description": "Run only the Python tests affected by changed files (import graph), sharded across cores. Returns a compact pass/fail summary with failure locations. Defaults to files changed in git.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "changed_files": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Changed file paths (default: git status)",
+                },
+                "working_dir": {"type": "string", "description": "Project root"},
+                "workers": {
+                    "type": "integer",
+                    "description": "Parallel pytest shards (default: CPU count)",
+                    "minimum": 0,
+                    "maximum": 16,
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "Per-shard timeout in seconds",
+                    "minimum": 1,
+                },
+            },
+        },
+        "handler": run_impacted_tests,
+    },
     {
         "name": "format_code",
         "description": "Format file or directory with common formatters.",
@@ -412,9 +749,122 @@ EXEC_TOOLS = [
         },
         "handler": get_env_variables,
     },
+    {
+        "name": "job_start",
+        "description": "Start a long-running command (dev server, watcher, build) as a background job. Output goes to a rotated log; returns a job_id.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "command": {"type": "string", "description": "Shell command to run"},
+                "working_dir": {"type": "string", "description": "Working directory"},
+            },
+            "required": ["command"],
+        },
+        "handler": job_start,
+    },
+    {
+        "name": "job_status",
+        "description": "Show state, runtime and exit code of one background job, or list all jobs.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id (omit to list all)"},
+            },
+        },
+        "handler": job_status,
+    },
+    {
+        "name": "job_tail",
+        "description": "Show the last lines of a background job's output.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id"},
+                "lines": {
+                    "type": "integer",
+                    "description": "Number of lines (default 50)",
+                    "minimum": 1,
+                    "maximum": 500,
+                },
+            },
+            "required": ["job_id"],
+        },
+        "handler": job_tail,
+    },
+    {
+        "name": "job_wait",
+        "description": "Wait for a background job to exit (up to timeout seconds), then show its status and output tail.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id"},
+                "timeout": {
+                    "type": "integer",
+                    "description": "Seconds to wait (default 60)",
+                    "minimum": 0,
+                    "maximum": 600,
+                },
+            },
+            "required": ["job_id"],
+        },
+        "handler": job_wait,
+    },
+    {
+        "name": "job_kill",
+        "description": "Stop a background job (SIGTERM, then SIGKILL) including its child processes.",
+        "parameters": {
+            "type": "object",
+            "properties": {"job_id": {"type": "string", "description": "Job id"}},
+            "required": ["job_id"],
+        },
+        "handler": job_kill,
+    },
+    {
+        "name": "git_status",
+        "description": "Structured git status: branch, upstream ahead/behind, staged, unstaged, untracked and conflicted files. Cached until the repo changes.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "working_dir": {"type": "string", "description": "Path inside the repository"},
+            },
+        },
+        "handler": git_status,
+    },
+    {
+        "name": "git_diff",
+        "description": "Show the working tree diff (or staged diff). Cached until the repo changes.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "staged": {"type": "boolean", "description": "Diff the index against HEAD"},
+                "path": {"type": "string", "description": "Limit to a file or directory"},
+                "stat": {"type": "boolean", "description": "Only show a diffstat"},
+                "working_dir": {"type": "string", "description": "Path inside the repository"},
+            },
+        },
+        "handler": git_diff,
+    },
+    {
+        "name": "git_log",
+        "description": "List recent commits (sha, date, author, subject) from a revision.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "max_count": {
+                    "type": "integer",
+                    "description": "Number of commits (default 20)",
+                    "minimum": 1,
+                    "maximum": 200,
+                },
+                "revision": {"type": "string", "description": "Branch, tag or sha (default HEAD)"},
+                "working_dir": {"type": "string", "description": "Path inside the repository"},
+            },
+        },
+        "handler": git_log,
+    },
     {
         "name": "git_action",
-        "description": "Execute git commands: status, diff, log, branch, etc.",
+        "description": "Execute other git commands (branch, commit, checkout, etc.). Prefer git_status/git_diff/git_log for reading.",
         "parameters": {
             "type": "object",
             "properties": {
@@ -1,32 +1,93 @@
 import asyncio
 import os
+import re
 from pathlib import Path
 from typing import Optional
+from app.core.runtime_config import (
+    CHARS_PER_TOKEN,
+    FILE_BATCH_MAX_TOTAL_CHARS,
+    FILE_BATCH_MAX_WORKERS,
+    FILE_BATCH_MIN_FILE_CHARS,
+    FILE_READ_MAX_TOKENS,
+)
+from app.utils.atomic_io import atomic_write_text
+from app.utils.checkpoints import checkpoint_journal
+from app.utils.file_cache import file_cache
+from app.utils.line_index import line_index_cache, slice_lines
+from app.utils.result_store import read_result
+from app.utils.tree_cache import tree_cache
 from app.utils.session_stats import session_tracker
 
 
+UNCHANGED_PREFIX = "Unchanged since turn"
+_NOT_UNDOABLE = " (directory too large to checkpoint; /undo cannot restore it)"
+
+
 async def read_file(
-    filepath: str, start_line: Optional[int] = None, end_line: Optional[int] = None
+    filepath: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    max_tokens: Optional[int] = None,
 ) -> str:
     try:
-        return await asyncio.to_thread(_read_file_sync, filepath, start_line, end_line)
+        return await asyncio.to_thread(
+            _read_file_sync, filepath, start_line, end_line, max_tokens
+        )
     except Exception as e:
         return f"Error: {type(e).__name__}: {str(e)}"
 
 
 def _read_file_sync(
-    filepath: str, start_line: Optional[int], end_line: Optional[int]
+    filepath: str,
+    start_line: Optional[int],
+    end_line: Optional[int],
+    max_tokens: Optional[int] = None,
+) -> str:
+    budget = max_tokens if max_tokens else FILE_READ_MAX_TOKENS
+    return _read_file_page(
+        filepath, start_line, end_line, budget * CHARS_PER_TOKEN, skip_unchanged=True
+    )
+
+
+def _read_file_page(
+    filepath: str,
+    start_line: Optional[int],
+    end_line: Optional[int],
+    max_chars: int,
+    skip_unchanged: bool = False,
 ) -> str:
     path = Path(filepath).expanduser()
     if not path.exists():
         return f"Error: File not found: {filepath}"
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        lines = f.readlines()
-    if start_line is not None:
-        start_idx = max(0, start_line - 1)
-        end_idx = min(len(lines), end_line or len(lines))
-        return "".join(lines[start_idx:end_idx])
-    return "".join(lines)
+    if path.is_dir():
+        return f"Error: Path is a directory: {filepath}"
+    if skip_unchanged:
+        turn = file_cache.delivered_turn(path, start_line, end_line)
+        if turn is not None:
+            return (
+                f"{UNCHANGED_PREFIX} {turn}: {filepath} was read in full then and has "
+                "not changed; use that earlier result."
+            )
+
+    if file_cache.is_cacheable(path):
+        chunk = slice_lines(file_cache.read_text(path), start_line, end_line, max_chars)
+    else:
+        chunk = line_index_cache.read_range(path, start_line, end_line, max_chars)
+    text = chunk.text
+    if chunk.clipped_line is not None:
+        text += (
+            f"\n... (line {chunk.clipped_line} is longer than the read budget and was cut "
+            f"after {max_chars} characters; read_file with a larger max_tokens shows the rest)"
+        )
+    if chunk.next_line is None:
+        if chunk.clipped_line is None:
+            file_cache.mark_delivered(path, start_line, end_line)
+        return text
+    return (
+        text
+        + f"\n... (truncated: showing lines {chunk.first_line}-{chunk.last_line} "
+        f"of {chunk.total_lines}. Continue with start_line={chunk.next_line})"
+    )
 
 
 async def write_file(filepath: str, content: str) -> str:
@@ -44,11 +105,12 @@ def _write_file_sync(filepath: str, content: str) -> str:
     lines_added = content.count("\n") + 1
     lines_removed = 0
     if path.exists():
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            lines_removed = f.read().count("\n") + 1
+        lines_removed = file_cache.read_text(path).count("\n") + 1
 
+    checkpoint_journal.record(path)
     with open(path, "w", encoding="utf-8") as f:
         f.write(content)
+    file_cache.store(path, content)
 
     session_tracker.record_code_changes(lines_added, lines_removed)
     return f"Success: Written to {filepath}"
@@ -67,8 +129,10 @@ def _edit_file_sync(filepath: str, search_block: str, replace_block: str) -> str
     path = Path(filepath).expanduser()
     if not path.exists():
         return f"Error: File not found: {filepath}"
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
+    cached = file_cache.read(path)
+    if cached.lossy:
+        return f"Error: File is not valid UTF-8 text: {filepath}"
+    content = cached.text
 
     # Normalizing line endings can help with matching
     if search_block not in content:
@@ -80,8 +144,10 @@ def _edit_file_sync(filepath: str, search_block: str, replace_block: str) -> str
     lines_removed = search_block.count("\n") + 1
 
     new_content = content.replace(search_block, replace_block, 1)
+    checkpoint_journal.record(path)
     with open(path, "w", encoding="utf-8") as f:
         f.write(new_content)
+    file_cache.store(path, new_content)
 
     session_tracker.record_code_changes(lines_added, lines_removed)
     return f"Success: Edited {filepath}"
@@ -104,16 +170,17 @@ def _delete_file_sync(filepath: str) -> str:
     # Estimate changes
     lines_removed = 0
     if path.is_file():
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            lines_removed = f.read().count("\n") + 1
+        lines_removed = file_cache.read_text(path).count("\n") + 1
 
+    undoable = checkpoint_journal.record(path)
+    file_cache.invalidate(path)
     if path.is_dir():
         shutil.rmtree(path)
     else:
         path.unlink()
 
     session_tracker.record_code_changes(0, lines_removed)
-    return f"Success: Deleted {filepath}"
+    return f"Success: Deleted {filepath}" + ("" if undoable else _NOT_UNDOABLE)
 
 
 async def list_directory(path: str) -> str:
@@ -161,50 +228,30 @@ def _find_files_sync(pattern: str, directory: str) -> str:
     return "\n".join(results) if results else "No files found matching pattern"
 
 
-async def get_file_tree(path: str = ".") -> str:
+async def get_file_tree(
+    path: str = ".", max_depth: int = 3, max_entries_per_dir: int = 40
+) -> str:
     try:
-        return await asyncio.to_thread(_get_file_tree_sync, path)
+        return await asyncio.to_thread(
+            _get_file_tree_sync, path, max_depth, max_entries_per_dir
+        )
     except Exception as e:
         return f"Error: {type(e).__name__}: {str(e)}"
 
 
-def _get_file_tree_sync(path: str) -> str:
-    import os
-
+def _get_file_tree_sync(
+    path: str, max_depth: int = 3, max_entries_per_dir: int = 40
+) -> str:
     dir_path = Path(path).expanduser()
     if not dir_path.exists():
         return f"Error: Directory not found: {path}"
 
-    tree = []
-    skip_dirs = [
-        ".git",
-        "node_modules",
-        "__pycache__",
-        ".venv",
-        "venv",
-        ".pytest_cache",
-        ".ruff_cache",
-        ".vscode",
-    ]
-
-    for root, dirs, files in os.walk(dir_path):
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-
-        rel_root = Path(root).relative_to(dir_path)
-        depth = len(rel_root.parts)
-        indent = "  " * depth
-
-        if rel_root.name:
-            tree.append(f"{indent}[{rel_root.name}/]")
-
-        file_indent = "  " * (depth + 1)
-        for f in sorted(files):
-            tree.append(f"{file_indent}{f}")
-
-        if len(tree) > 500:
-            tree.append(f"{file_indent}... (truncated)")
-            break
-
+    tree = tree_cache.render(
+        str(dir_path),
+        max_depth=max(1, min(int(max_depth), 10)),
+        max_entries=max(5, min(int(max_entries_per_dir), 500)),
+        max_lines=500,
+    )
     return "\n".join(tree) if tree else "No files found"
 
 
@@ -240,8 +287,11 @@ def _move_file_sync(source: str, destination: str) -> str:
         return f"Error: Source not found: {source}"
 
     dst.parent.mkdir(parents=True, exist_ok=True)
+    undoable = checkpoint_journal.record(src) & checkpoint_journal.record(dst)
+    file_cache.invalidate(src)
+    file_cache.invalidate(dst)
     shutil.move(str(src), str(dst))
-    return f"Success: Moved {source} -> {destination}"
+    return f"Success: Moved {source} -> {destination}" + ("" if undoable else _NOT_UNDOABLE)
 
 
 async def copy_file(source: str, destination: str) -> str:
@@ -261,6 +311,7 @@ def _copy_file_sync(source: str, destination: str) -> str:
         return f"Error: Source not found: {source}"
 
     dst.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_journal.record(dst)
     shutil.copy2(str(src), str(dst))
     return f"Success: Copied {source} -> {destination}"
 
@@ -270,6 +321,8 @@ async def read_files_batch(
     start_line: Optional[int] = None,
     end_line: Optional[int] = None,
     max_chars_per_file: int = 20000,
+    max_total_chars: int = FILE_BATCH_MAX_TOTAL_CHARS,
+    skip_unchanged: bool = True,
 ) -> str:
     try:
         return await asyncio.to_thread(
@@ -278,30 +331,125 @@ async def read_files_batch(
             start_line,
             end_line,
             max_chars_per_file,
+            max_total_chars,
+            skip_unchanged,
         )
     except Exception as e:
         return f"Error: {type(e).__name__}: {str(e)}"
 
 
+async def fetch_result(handle: str, offset: int = 0, limit: int = 20000) -> str:
+    try:
+        return await asyncio.to_thread(read_result, handle, offset, limit)
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+def _allocate_batch_budget(demands: list[int], total: int) -> list[int]:
+    """Max-min fair split of ``total`` chars; 0 means the file was cut off."""
+    alloc = [0] * len(demands)
+    remaining = total
+    pending = sorted(range(len(demands)), key=lambda i: demands[i])
+    while pending:
+        share = remaining // len(pending)
+        if demands[pending[0]] <= share:
+            idx = pending.pop(0)
+            alloc[idx] = demands[idx]
+            remaining -= demands[idx]
+            continue
+        if share >= FILE_BATCH_MIN_FILE_CHARS:
+            for idx in pending:
+                alloc[idx] = share
+            break
+        # Too many files for the budget: keep request order, cut off the rest.
+        for idx in sorted(pending):
+            grant = min(demands[idx], FILE_BATCH_MIN_FILE_CHARS)
+            if remaining < grant:
+                break
+            alloc[idx] = grant
+            remaining -= grant
+        break
+    return alloc
+
+
+def _probe_batch_file(
+    filepath: str,
+    start_line: Optional[int],
+    end_line: Optional[int],
+    skip_unchanged: bool,
+) -> tuple[int, Optional[int]]:
+    """(size, turn the unchanged range was delivered in, or None to read it)."""
+    path = Path(filepath).expanduser()
+    if skip_unchanged:
+        turn = file_cache.delivered_turn(path, start_line, end_line)
+        if turn is not None:
+            return 0, turn
+    try:
+        return max(1, path.stat().st_size), None
+    except OSError:
+        return 1, None
+
+
 def _read_files_batch_sync(
     filepaths: list[str],
     start_line: Optional[int],
     end_line: Optional[int],
     max_chars_per_file: int,
+    max_total_chars: int = FILE_BATCH_MAX_TOTAL_CHARS,
+    skip_unchanged: bool = True,
 ) -> str:
+    from concurrent.futures import ThreadPoolExecutor
+
     if not filepaths:
         return "Error: filepaths is required"
 
     max_chars = max(500, min(int(max_chars_per_file), 100000))
-    chunks: list[str] = []
+    total_chars = max(max_chars, min(int(max_total_chars), 400000))
+
+    unique: list[str] = []
+    seen: dict[str, str] = {}
+    skipped: list[str] = []
     for filepath in filepaths[:50]:
-        content = _read_file_sync(filepath, start_line, end_line)
-        if content.startswith("Error:"):
-            chunks.append(f"## {filepath}\n{content}")
+        key = str(Path(filepath).expanduser().resolve())
+        if key in seen:
+            skipped.append(f"- {filepath} (duplicate of {seen[key]})")
             continue
-        if len(content) > max_chars:
-            content = content[:max_chars] + "\n... (truncated)"
-        chunks.append(f"## {filepath}\n{content}")
+        seen[key] = filepath
+        unique.append(filepath)
+
+    workers = min(len(unique), FILE_BATCH_MAX_WORKERS, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        probes = list(
+            pool.map(
+                lambda fp: _probe_batch_file(fp, start_line, end_line, skip_unchanged),
+                unique,
+            )
+        )
+        to_read = [fp for fp, (_, turn) in zip(unique, probes) if turn is None]
+        demands = [min(size, max_chars) for size, turn in probes if turn is None]
+        allocations = dict(zip(to_read, _allocate_batch_budget(demands, total_chars)))
+        contents = dict(
+            zip(
+                to_read,
+                pool.map(
+                    lambda fp: _read_file_page(fp, start_line, end_line, allocations[fp])
+                    if allocations[fp]
+                    else None,
+                    to_read,
+                ),
+            )
+        )
+
+    chunks: list[str] = []
+    for filepath, (_, turn) in zip(unique, probes):
+        if turn is not None:
+            skipped.append(f"- {filepath} (unchanged since turn {turn})")
+        elif contents[filepath] is None:
+            skipped.append(f"- {filepath} (batch output budget exhausted)")
+        else:
+            chunks.append(f"## {filepath}\n{contents[filepath]}")
+    if skipped:
+        chunks.append("## Skipped\n" + "\n".join(skipped))
     return "\n\n".join(chunks)
 
 
@@ -331,7 +479,7 @@ def _replace_regex_sync(
     if not path.exists():
         return f"Error: File not found: {filepath}"
 
-    content = path.read_text(encoding="utf-8", errors="ignore")
+    content = file_cache.read_text(path)
     try:
         regex = re.compile(pattern, re.MULTILINE)
     except re.error as e:
@@ -346,14 +494,200 @@ def _replace_regex_sync(
     if count == 0:
         return "Error: No regex matches found"
 
+    checkpoint_journal.record(path)
     path.write_text(new_content, encoding="utf-8")
+    file_cache.store(path, new_content)
     return f"Success: Replaced {count} occurrence(s) in {filepath}"
 
 
+async def apply_edits(edits: list[dict]) -> str:
+    try:
+        return await asyncio.to_thread(_apply_edits_sync, edits)
+    except Exception as e:
+        return f"Error: {type(e).__name__}: {str(e)}"
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _parse_hunks(patch: str) -> list[tuple[int, list[str], list[str]]]:
+    hunks: list[tuple[int, list[str], list[str]]] = []
+    current: tuple[int, list[str], list[str]] | None = None
+    for line in patch.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+            continue
+        if current is None or line.startswith("\\"):
+            continue
+        tag, body = (line[0], line[1:]) if line else (" ", "")
+        if tag in " -":
+            current[1].append(body)
+        if tag in " +":
+            current[2].append(body)
+    return hunks
+
+
+def _apply_patch(content: str, patch: str) -> tuple[str | None, str | None]:
+    hunks = _parse_hunks(patch)
+    if not hunks:
+        return None, "patch contains no @@ hunks"
+
+    trailing_newline = content.endswith("\n")
+    lines = content.split("\n")
+    if trailing_newline:
+        lines.pop()
+
+    offset = 0
+    for number, (old_start, old, new) in enumerate(hunks, 1):
+        hint = max(0, old_start - 1 + offset)
+        if not old:
+            # A pure insertion's old_start names the line it goes *after*
+            # ("-5,0" inserts after line 5; "-0,0" at the top of the file).
+            at = min(max(0, old_start + offset), len(lines))
+        else:
+            candidates = [
+                i
+                for i in range(len(lines) - len(old) + 1)
+                if lines[i : i + len(old)] == old
+            ]
+            if not candidates:
+                return None, f"hunk {number} does not match the file"
+            at = min(candidates, key=lambda i: abs(i - hint))
+        lines[at : at + len(old)] = new
+        offset += len(new) - len(old)
+
+    return "\n".join(lines) + ("\n" if trailing_newline else ""), None
+
+
+def _apply_edit(content: str, edit: dict) -> tuple[str | None, str | None]:
+    if "patch" in edit:
+        return _apply_patch(content, str(edit["patch"]))
+    search_block = edit.get("search_block")
+    if not isinstance(search_block, str) or "replace_block" not in edit:
+        return None, "each edit needs search_block/replace_block or patch"
+    if search_block not in content:
+        return None, "search_block not found"
+    return content.replace(search_block, str(edit["replace_block"]), 1), None
+
+
+def _missing_parents(path: Path) -> list[Path]:
+    missing = []
+    parent = path.absolute().parent
+    while not parent.exists():
+        missing.append(parent)
+        parent = parent.parent
+    return missing
+
+
+def _apply_edits_sync(edits: list[dict]) -> str:
+    import difflib
+
+    if not edits:
+        return "Error: edits is required"
+
+    originals: dict[str, tuple[Path, str | None]] = {}
+    updated: dict[str, str] = {}
+    errors: list[str] = []
+
+    # Phase 1: apply every edit in memory; nothing touches disk on failure.
+    for number, edit in enumerate(edits, 1):
+        filepath = str(edit.get("filepath", "")).strip() if isinstance(edit, dict) else ""
+        if not filepath:
+            errors.append(f"- edit {number}: filepath is required")
+            continue
+        path = Path(filepath).expanduser()
+        key = str(path.resolve())
+        if key not in originals:
+            if path.is_file():
+                cached = file_cache.read(path)
+                if cached.lossy:
+                    errors.append(f"- edit {number}: {filepath} is not valid UTF-8 text")
+                    continue
+                originals[key] = (path, cached.text)
+            elif "patch" in edit and not path.exists():
+                originals[key] = (path, None)
+            else:
+                errors.append(f"- edit {number}: file not found: {filepath}")
+                continue
+            updated[key] = originals[key][1] or ""
+        new_content, error = _apply_edit(updated[key], edit)
+        if error:
+            errors.append(f"- edit {number} ({filepath}): {error}")
+            continue
+        updated[key] = new_content
+
+    if errors:
+        return "Error: No files changed. Edits failed validation:\n" + "\n".join(errors)
+
+    # Phase 2: swap files in via temp file + os.replace, rolling back on failure.
+    written: list[str] = []
+    created_dirs: list[Path] = []
+    try:
+        with checkpoint_journal.batch():
+            for key, (path, original) in originals.items():
+                if updated[key] == original:
+                    continue
+                if original is None:
+                    created_dirs.extend(_missing_parents(path))
+                checkpoint_journal.record(path)
+                atomic_write_text(path, updated[key])
+                written.append(key)
+    except Exception as e:
+        rollback_errors = []
+        for key in reversed(written):
+            path, original = originals[key]
+            try:
+                if original is None:
+                    path.unlink()
+                else:
+                    atomic_write_text(path, original)
+            except Exception as exc:
+                rollback_errors.append(f"{path}: {exc}")
+            file_cache.invalidate(path)
+        # Deepest first; a directory something else has written into stays.
+        for directory in sorted(set(created_dirs), key=lambda d: len(d.parts), reverse=True):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+        detail = f" Rollback failed for: {'; '.join(rollback_errors)}" if rollback_errors else ""
+        return f"Error: {type(e).__name__}: {str(e)}. All edits rolled back.{detail}"
+
+    added = removed = 0
+    diff_parts: list[str] = []
+    for key in written:
+        path, original = originals[key]
+        file_cache.store(path, updated[key])
+        diff = list(
+            difflib.unified_diff(
+                (original or "").splitlines(),
+                updated[key].splitlines(),
+                fromfile=str(path),
+                tofile=str(path),
+                lineterm="",
+            )
+        )
+        added += sum(1 for d in diff if d.startswith("+") and not d.startswith("+++"))
+        removed += sum(1 for d in diff if d.startswith("-") and not d.startswith("---"))
+        diff_parts.extend(diff)
+
+    session_tracker.record_code_changes(added, removed)
+    summary = f"Success: Applied {len(edits)} edit(s) to {len(written)} file(s) (+{added} -{removed})"
+    diff_text = "\n".join(diff_parts)
+    if len(diff_text) > 8000:
+        diff_text = diff_text[:8000] + "\n... (diff truncated)"
+    return f"{summary}\n{diff_text}" if diff_text else summary
+
+
 FILE_TOOLS = [
     {
         "name": "get_file_tree",
-        "description": "Show the project's directory structure in a tree-like format.",
+        "description": (
+            "Show the project's directory structure in a tree-like format. "
+            "Directories beyond max_depth or per-directory caps are collapsed into summaries."
+        ),
         "parameters": {
             "type": "object",
             "properties": {
@@ -361,13 +695,28 @@ FILE_TOOLS = [
                     "type": "string",
                     "description": "Starting directory (default: current)",
                 },
+                "max_depth": {
+                    "type": "integer",
+                    "description": "Directory levels to expand (default: 3)",
+                    "minimum": 1,
+                    "maximum": 10,
+                },
+                "max_entries_per_dir": {
+                    "type": "integer",
+                    "description": "Entries listed per directory before summarizing the rest (default: 40)",
+                    "minimum": 5,
+                    "maximum": 500,
+                },
             },
         },
         "handler": get_file_tree,
     },
     {
         "name": "read_file",
-        "description": "Read file content, optionally by line range. Use for understanding existing code before editing.",
+        "description": (
+            "Read file content, optionally by line range. Use for understanding existing code before editing. "
+            "Large files are paged: follow the returned start_line cursor to continue."
+        ),
         "parameters": {
             "type": "object",
             "properties": {
@@ -380,6 +729,12 @@ FILE_TOOLS = [
                     "type": "integer",
                     "description": "End line number (1-indexed)",
                 },
+                "max_tokens": {
+                    "type": "integer",
+                    "description": "Page size budget in tokens (default: 12000)",
+                    "minimum": 500,
+                    "maximum": 100000,
+                },
             },
             "required": ["filepath"],
         },
@@ -521,11 +876,47 @@ FILE_TOOLS = [
                     "minimum": 500,
                     "maximum": 100000,
                 },
+                "max_total_chars": {
+                    "type": "integer",
+                    "description": "Output budget shared fairly by all files (default: 120000)",
+                    "minimum": 500,
+                    "maximum": 400000,
+                },
+                "skip_unchanged": {
+                    "type": "boolean",
+                    "description": "Skip files already read in full and unchanged since (default: true)",
+                },
             },
             "required": ["filepaths"],
         },
         "handler": read_files_batch,
     },
+    {
+        "name": "fetch_result",
+        "description": (
+            "Page through a large tool result that was stored out of context. "
+            "Use the handle from the '[Result stored out of context ...]' stub."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "handle": {"type": "string", "description": "Result handle from the stub"},
+                "offset": {
+                    "type": "integer",
+                    "description": "Character offset to start from (default: 0)",
+                    "minimum": 0,
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Characters to return (default: 20000)",
+                    "minimum": 1,
+                    "maximum": 40000,
+                },
+            },
+            "required": ["handle"],
+        },
+        "handler": fetch_result,
+    },
     {
         "name": "replace_regex",
         "description": "Replace text by regex pattern in a file. Use after read_file/search confirmation.",
@@ -545,4 +936,38 @@ FILE_TOOLS = [
         },
         "handler": replace_regex,
     },
+    {
+        "name": "apply_edits",
+        "description": (
+            "Apply many search/replace or unified-diff edits across files in one atomic step. "
+            "All edits are validated first; if any fails, no file is changed. Prefer over repeated edit_file calls."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "edits": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "filepath": {"type": "string", "description": "Path to the file"},
+                            "search_block": {
+                                "type": "string",
+                                "description": "Exact text to find (first occurrence is replaced)",
+                            },
+                            "replace_block": {"type": "string", "description": "New text to insert"},
+                            "patch": {
+                                "type": "string",
+                                "description": "Unified diff hunks (@@ -a,b +c,d @@) instead of search/replace",
+                            },
+                        },
+                        "required": ["filepath"],
+                    },
+                    "description": "Edits applied in order; several edits may target the same file",
+                },
+            },
+            "required": ["edits"],
+        },
+        "handler": apply_edits,
+    },
 ]
@@ -3,11 +3,14 @@ import time
 import re
 from typing import Any, Callable
 
+from app.core.runtime_config import READ_ONLY_TOOLS
 from app.models import ToolDefinition
 from app.tools.file_tools import FILE_TOOLS
 from app.tools.code_tools import CODE_TOOLS
 from app.tools.exec_tools import EXEC_TOOLS
 from app.tools.agent_tools import AGENT_TOOLS
+from app.utils.command_cache import command_cache, is_read_only
+from app.utils.git_service import invalidate_git_services
 from app.utils.session_stats import session_tracker
 from app.utils.logger import log_error, log_debug
 
@@ -187,6 +190,9 @@ class ToolManager:
                 log_error(f"Tool '{name}' returned error: {result_str}")
             
             session_tracker.record_tool_call(success=success)
+            if not self._is_read_only_call(name, validated_args):
+                command_cache.invalidate()
+                invalidate_git_services()
             return result_str
         except TypeError as e:
             log_error(f"Invalid arguments for tool '{name}'", e)
@@ -196,11 +202,23 @@ class ToolManager:
             return f"Error: Invalid arguments for '{name}': {str(e)}"
         except Exception as e:
             log_error(f"Tool execution failed: {name}", e)
+            command_cache.invalidate()
+            invalidate_git_services()
             duration = time.time() - start_time
             session_tracker.record_tool_execution(duration)
             session_tracker.record_tool_call(success=False)
             return f"Error: {type(e).__name__}: {str(e)}"
 
+    @staticmethod
+    def _is_read_only_call(name: str, arguments: dict[str, Any]) -> bool:
+        if name in READ_ONLY_TOOLS:
+            return True
+        if name in ("execute_command", "run_tests"):
+            return not arguments.get("background") and is_read_only(arguments.get("command", ""))
+        if name == "git_action":
+            return is_read_only(f"git {arguments.get('action', '')}")
+        return False
+
     def has_tool(self, name: str) -> bool:
         return name in self._tools
 
@@ -16,6 +16,7 @@ from app.utils import (
     get_provider,
 )
 from app.utils.session_stats import session_tracker
+from app.utils.file_cache import file_cache
 from app.prompts import get_agent_names
 from app.tools.tool_manager import create_tool_manager
 from app.storage.storage import Storage
@@ -32,7 +33,13 @@ from app.logic.command_handler import CommandHandler
 from app.logic.turn_orchestrator import TurnOrchestrator
 from app.logic.mode_manager import ModeManager
 from app.utils.updater import check_update_available, install_or_upgrade
-from app.utils.file_search import search_files_for_query
+from app.utils.file_search import file_index, search_files_for_query
+from app.utils.file_watcher import file_watcher
+from app.utils.git_service import close_git_services
+from app.utils.job_manager import job_manager
+from app.utils.output_capture import cleanup_spill_files
+from app.utils.result_store import cleanup_results
+from app.utils.shell_session import shell_session
 from app.core.runtime_config import (
     DEFAULT_AGENT_NAME,
     CONTEXT_LIMIT_TOKENS,
@@ -52,7 +59,7 @@ class OpenDevApp(App):
         Binding("ctrl+shift+m", "cycle_mode", "Switch Mode", show=True),
     ]
 
-    def __init__(self, yolo: bool = False):
+    def __init__(self, yolo: bool = False, persistent_shell: bool = False):
         super().__init__()
         self.storage = Storage()
         self.session_id = session_tracker.session_id
@@ -76,6 +83,7 @@ class OpenDevApp(App):
         self.plan_tracker: Optional[dict[str, Any]] = None
 
         self.yolo_mode = yolo
+        shell_session.enabled = persistent_shell
         self.always_allow_session = False
         self.persistent_permissions = {}
         self.ai_settings = {}
@@ -96,6 +104,8 @@ class OpenDevApp(App):
         except Exception:
             pass
         self.persistent_permissions = load_permissions()
+        file_index.refresh_async(force=True)
+        file_watcher.start(".")
         if self.current_provider_info:
             self.http_service = HttpService(agent_name=self.active_agent)
             await self.http_service.initialize()
@@ -106,7 +116,13 @@ class OpenDevApp(App):
 
     async def on_unmount(self) -> None:
         self.is_shutting_down = True
-        self.is_streaming = False
+        self.ai_handler.cancel()
+        file_watcher.stop()
+        await shell_session.close()
+        cleanup_spill_files()
+        cleanup_results()
+        job_manager.shutdown()
+        close_git_services()
         if self.http_service:
             await self.http_service.close()
         await self.storage.shutdown()
@@ -168,7 +184,7 @@ class OpenDevApp(App):
 
     def action_cancel_request(self) -> None:
         if self.is_streaming:
-            self.is_streaming = False
+            self.ai_handler.cancel()
             self.notify("Request cancelled", severity="warning")
             return
 
@@ -176,7 +192,7 @@ class OpenDevApp(App):
 
     def action_escape_request_only(self) -> None:
         if self.is_streaming:
-            self.is_streaming = False
+            self.ai_handler.cancel()
             self.notify("Request cancelled", severity="warning")
 
     def get_status_text(self) -> str:
@@ -393,6 +409,7 @@ class OpenDevApp(App):
         try:
             summary = await self.http_service.summarize_conversation(self.messages)
             self.messages = []
+            file_cache.reset_delivered()
             context_msg = {"role": "assistant",
                            "content": f"[COMPACTED]\n{summary}"}
             self.messages.append(context_msg)
@@ -413,6 +430,7 @@ class OpenDevApp(App):
         await self.storage.delete_all_conversations()
 
         self.messages = []
+        file_cache.reset_delivered()
         self.pending_user_queue = []
         self.is_new_conversation = True
         self.conversation_id = str(uuid.uuid4())
@@ -440,6 +458,8 @@ class OpenDevApp(App):
         self.conversation_title = conversation.get("title", "Conversation")
         self.is_new_conversation = False
         self.messages = list(messages)
+        file_cache.reset_delivered()
+        await shell_session.close()
         self.pending_user_queue = []
         self.plan_tracker = None
 
@@ -533,8 +553,13 @@ def main():
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--yolo", action="store_true")
+    parser.add_argument(
+        "--persistent-shell",
+        action="store_true",
+        help="Keep one bash session per conversation for shell tools",
+    )
     args = parser.parse_args()
-    app = OpenDevApp(yolo=args.yolo)
+    app = OpenDevApp(yolo=args.yolo, persistent_shell=args.persistent_shell)
     try:
         app.run()
     finally:
@@ -138,6 +138,10 @@ class ChatScreen(BaseScreen):
         area = self.query_one("#message-area", ChatArea)
         area.add_tool_call(tool_call_id, tool_name, arguments)
 
+    def update_tool_progress(self, tool_call_id: str, line: str) -> None:
+        area = self.query_one("#message-area", ChatArea)
+        area.update_tool_progress(tool_call_id, line)
+
     def add_tool_result(
         self,
         tool_call_id: str,
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any, List, Optional
 
 from textual import on, work
+from textual.worker import get_current_worker
 from textual.app import ComposeResult
 from textual.containers import Vertical, Horizontal, VerticalScroll, Container
 from textual.widgets import (
@@ -421,6 +422,15 @@ class ToolCallMessage(Static):
                 if output_str:
                     yield Label(output_str, classes="tool-output", id="tool-output")
 
+    def update_progress(self, line: str) -> None:
+        if self.status != "running":
+            return
+        output_str = self._format_output(line)
+        try:
+            self.query_one("#tool-output", Label).update(output_str)
+        except Exception:
+            self.mount(Label(output_str, classes="tool-output", id="tool-output"))
+
     def update_result(self, result: str, duration_ms: int | None = None) -> None:
         output_str = self._format_output(result)
         self.output = output_str
@@ -531,6 +541,11 @@ class ChatArea(VerticalScroll):
         self.mount(widget)
         self._stick_to_bottom()
 
+    def update_tool_progress(self, tool_call_id: str, line: str) -> None:
+        widget = self._tool_widgets.get(tool_call_id)
+        if widget is not None:
+            widget.update_progress(line)
+
     def add_tool_result(
         self,
         tool_call_id: str,
@@ -728,7 +743,7 @@ class CustomInput(Input):
             self._handle_autocomplete_sync(val)
         else:
             self._autocomplete_timer = self.set_timer(
-                0.15, lambda: self._handle_autocomplete_worker(val)
+                0.05, lambda: self._handle_autocomplete_worker(val)
             )
 
     def _handle_autocomplete_sync(self, val: str):
@@ -740,7 +755,7 @@ class CustomInput(Input):
         except Exception:
             pass
 
-    @work(thread=True)
+    @work(thread=True, exclusive=True, group="autocomplete")
     def _handle_autocomplete_worker(self, val: str):
         if not val or (not val.startswith("/") and "@" not in val):
             self.app.call_from_thread(self._update_dropdown, [])
@@ -756,6 +771,9 @@ class CustomInput(Input):
                 include_git_branches=True,
             )
 
+        # A newer keystroke superseded this query; don't flash stale results.
+        if get_current_worker().is_cancelled:
+            return
         self.app.call_from_thread(self._update_dropdown, items[:15])
 
     def _update_dropdown(self, items: List[str]):
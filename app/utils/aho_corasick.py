@@ -0,0 +1,51 @@
+from collections import deque
+from typing import Iterator
+
+
+class AhoCorasick:
+    """Multi-literal matcher: reports every (possibly overlapping) keyword hit."""
+
+    def __init__(self, words: list[str]):
+        self.words = list(words)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+
+        for idx, word in enumerate(self.words):
+            if not word:
+                continue
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(idx)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield ``(start, word_index)`` for every keyword occurrence in ``text``."""
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for idx in self._out[state]:
+                yield pos - len(self.words[idx]) + 1, idx
+
+    def matched_words(self, text: str) -> set[int]:
+        return {idx for _, idx in self.iter_matches(text)}
@@ -0,0 +1,140 @@
+import asyncio
+import contextvars
+import threading
+from typing import AsyncIterator, Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class OperationCancelled(Exception):
+    def __init__(self, message: str = "Cancelled by user"):
+        super().__init__(message)
+
+
+class CancelToken:
+    """Set once when the user cancels a request.
+
+    Coroutines race their work against ``wait()``; code running in worker
+    threads polls ``cancelled`` (or ``check_cancelled()``) between steps.
+    """
+
+    def __init__(self):
+        self._flag = threading.Event()
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._flag.is_set()
+
+    def cancel(self) -> None:
+        if self._flag.is_set():
+            return
+        self._flag.set()
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self) -> None:
+        await self._event.wait()
+
+
+# Set by AIHandler for the duration of a request; inherited by tool tasks and
+# by the threads asyncio.to_thread starts for them.
+cancel_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar(
+    "cancel_token", default=None
+)
+
+
+def is_cancelled() -> bool:
+    token = cancel_token.get()
+    return token is not None and token.cancelled
+
+
+def check_cancelled() -> None:
+    if is_cancelled():
+        raise OperationCancelled()
+
+
+async def cancellable(
+    aw: Awaitable[T], timeout: Optional[float] = None, grace: float = 0.0
+) -> T:
+    """Await ``aw`` unless the current request is cancelled first.
+
+    On cancellation the work gets ``grace`` seconds to wind down on its own
+    (and return partial results) before it is cancelled; then
+    OperationCancelled is raised. A timeout raises asyncio.TimeoutError.
+    """
+    token = cancel_token.get()
+    if token is None:
+        return await asyncio.wait_for(aw, timeout)
+    if token.cancelled:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise OperationCancelled()
+    task = asyncio.ensure_future(aw)
+    waiter = asyncio.ensure_future(token.wait())
+    try:
+        done, _ = await asyncio.wait(
+            {task, waiter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        if task not in done and waiter in done and grace > 0:
+            done, _ = await asyncio.wait({task}, timeout=grace)
+        if task in done:
+            return task.result()
+        if waiter in done:
+            raise OperationCancelled()
+        raise asyncio.TimeoutError()
+    finally:
+        waiter.cancel()
+        if not task.done():
+            task.cancel()
+            task.add_done_callback(_discard_result)
+
+
+def _discard_result(future: asyncio.Future) -> None:
+    # Abandoned work may finish with an error nobody awaits; don't log it.
+    if not future.cancelled():
+        future.exception()
+
+
+async def iterate_cancellable(source: AsyncIterator[T]) -> AsyncIterator[T]:
+    """Yield from ``source`` until the current request is cancelled.
+
+    The pending ``__anext__`` is cancelled at once rather than after the next
+    item arrives, so a stalled HTTP stream is abandoned (and closed by its own
+    cleanup) immediately.
+    """
+    iterator = source.__aiter__()
+    token = cancel_token.get()
+    if token is None:
+        async for item in iterator:
+            yield item
+        return
+    waiter = asyncio.ensure_future(token.wait())
+    try:
+        while not token.cancelled:
+            step = asyncio.ensure_future(iterator.__anext__())
+            await asyncio.wait({step, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not step.done():
+                step.cancel()
+                await asyncio.wait({step})
+                return
+            try:
+                item = step.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        waiter.cancel()
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.core.runtime_config import (
+    CHECKPOINT_MAX_DIR_BYTES,
+    CHECKPOINT_MAX_DIR_FILES,
+    CHECKPOINT_MAX_FILE_BYTES,
+    CHECKPOINT_MAX_KEEP,
+)
+from app.utils.atomic_io import atomic_write_bytes, atomic_write_text
+from app.utils.config import get_config_dir
+from app.utils.file_cache import file_cache
+
+# Journal value for a file too large to snapshot; undo reports it instead of restoring.
+SKIPPED = ""
+
+
+def _checkpoint_dir() -> Path:
+    return get_config_dir() / "checkpoints"
+
+
+def store_blob(data: bytes) -> str:
+    """Store ``data`` once under its sha256 (zlib-compressed); returns the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _checkpoint_dir() / "blobs" / digest[:2] / digest[2:]
+    if not path.exists():
+        atomic_write_bytes(path, zlib.compress(data, 1))
+    return digest
+
+
+def _blob_path(digest: str) -> Path:
+    return _checkpoint_dir() / "blobs" / digest[:2] / digest[2:]
+
+
+def load_blob(digest: str) -> bytes:
+    return zlib.decompress(_blob_path(digest).read_bytes())
+
+
+def _file_digest(path: Path) -> Optional[str]:
+    """Content digest (no blob stored): None if absent, SKIPPED if too large."""
+    try:
+        if path.is_dir() or path.stat().st_size > CHECKPOINT_MAX_FILE_BYTES:
+            return SKIPPED
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_file(path: Path) -> Optional[str]:
+    """Pre-image digest for ``path``: None if absent, SKIPPED if too large."""
+    try:
+        if path.stat().st_size > CHECKPOINT_MAX_FILE_BYTES:
+            return SKIPPED
+        return store_blob(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _dir_files(path: Path) -> Optional[list[Path]]:
+    """Files below ``path``, or None once they exceed the checkpoint limits."""
+    files: list[Path] = []
+    total = 0
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            target = Path(dirpath) / name
+            try:
+                total += target.lstat().st_size
+            except OSError:
+                continue
+            files.append(target)
+            if len(files) > CHECKPOINT_MAX_DIR_FILES or total > CHECKPOINT_MAX_DIR_BYTES:
+                return None
+    return files
+
+
+@dataclass
+class Checkpoint:
+    id: int
+    label: str
+    created_at: float
+    # Absolute path -> pre-image digest (None: file did not exist before).
+    files: dict[str, Optional[str]] = field(default_factory=dict)
+    # Absolute path -> digest the turn left behind, filled in by seal().
+    after: dict[str, Optional[str]] = field(default_factory=dict)
+
+
+@dataclass
+class UndoResult:
+    checkpoint: Checkpoint
+    restored: list[str]
+    removed: list[str]
+    skipped: list[str]
+    # Files edited since the checkpoint was sealed; undo refused unless forced.
+    conflicts: list[str] = field(default_factory=list)
+
+
+class CheckpointJournal:
+    """Per-project stack of turn checkpoints holding file pre-images."""
+
+    def __init__(self, project_path: str = "."):
+        self.project_path = str(Path(project_path).expanduser().resolve())
+        self._checkpoints: list[Checkpoint] = []
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
+
+    @property
+    def _journal_path(self) -> Path:
+        key = hashlib.sha1(self.project_path.encode("utf-8")).hexdigest()[:16]
+        return _checkpoint_dir() / f"{key}.json"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = json.loads(self._journal_path.read_text(encoding="utf-8"))
+            self._checkpoints = [Checkpoint(**item) for item in data.get("checkpoints", [])]
+        except (OSError, ValueError, TypeError):
+            self._checkpoints = []
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Write the journal once for all records made inside the block."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._save()
+
+    def _save(self) -> None:
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
+        payload = {
+            "project": self.project_path,
+            "checkpoints": [asdict(cp) for cp in self._checkpoints],
+        }
+        try:
+            atomic_write_text(self._journal_path, json.dumps(payload))
+        except OSError:
+            pass
+
+    def begin(self, label: str) -> Checkpoint:
+        with self._lock:
+            self._load()
+            current = self._checkpoints[-1] if self._checkpoints else None
+            if current is not None and not current.files:
+                current.label = label
+                current.created_at = time.time()
+            else:
+                if current is not None and not current.after:
+                    self._seal(current)
+                next_id = current.id + 1 if current else 1
+                current = Checkpoint(next_id, label, time.time())
+                self._checkpoints.append(current)
+                dropped = self._checkpoints[:-CHECKPOINT_MAX_KEEP]
+                del self._checkpoints[:-CHECKPOINT_MAX_KEEP]
+                if dropped:
+                    self._save()
+                    self._collect_garbage(dropped)
+            self._save()
+            return current
+
+    def seal(self) -> None:
+        """Record what the current checkpoint's files look like now (end of turn)."""
+        with self._lock:
+            self._load()
+            if self._checkpoints and self._checkpoints[-1].files:
+                self._seal(self._checkpoints[-1])
+                self._save()
+
+    @staticmethod
+    def _seal(checkpoint: Checkpoint) -> None:
+        checkpoint.after = {p: _file_digest(Path(p)) for p in checkpoint.files}
+
+    def _collect_garbage(self, dropped: list[Checkpoint]) -> None:
+        # Blobs are shared by every project's journal, so only pre-images of dropped checkpoints that no journal still
+        # references are deleted.
+        candidates = {d for cp in dropped for d in cp.files.values() if d}
+        if not candidates:
+            return
+        live: set[str] = set()
+        for journal in _checkpoint_dir().glob("*.json"):
+            try:
+                data = json.loads(journal.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                # Can't tell what an unreadable journal needs; keep everything.
+                return
+            for item in data.get("checkpoints", []):
+                live.update(d for d in (item.get("files") or {}).values() if d)
+        for digest in candidates - live:
+            try:
+                _blob_path(digest).unlink()
+            except OSError:
+                pass
+
+    def record(self, path: Path) -> bool:
+        """Snapshot ``path`` (every file below it, for directories) before a mutation.
+
+        Returns False if ``path`` is a directory over the checkpoint limits; it
+        is then recorded as not restorable instead of being copied.
+        """
+        path = path.expanduser().resolve()
+        targets = _dir_files(path) if path.is_dir() else [path]
+        with self._lock:
+            current = self._current()
+            if targets is None:
+                current.files.setdefault(str(path), SKIPPED)
+                current.after = {}
+                self._save()
+                return False
+            pending = [t for t in targets if str(t) not in current.files]
+            for target in pending:
+                current.files[str(target)] = snapshot_file(target)
+            # The turn is changing files again; its seal is no longer accurate.
+            if pending or current.after:
+                current.after = {}
+                self._save()
+            return True
+
+    def record_digest(self, path: Path, digest: Optional[str]) -> None:
+        """Record a pre-image already stored by another process (codemod workers)."""
+        with self._lock:
+            current = self._current()
+            current.files.setdefault(str(path.expanduser().resolve()), digest)
+            current.after = {}
+            self._save()
+
+    def _current(self) -> Checkpoint:
+        self._load()
+        if not self._checkpoints:
+            return self.begin("(auto)")
+        return self._checkpoints[-1]
+
+    def history(self) -> list[Checkpoint]:
+        with self._lock:
+            self._load()
+            return list(self._checkpoints)
+
+    def undo(self, force: bool = False) -> Optional[UndoResult]:
+        """Restore the newest checkpoint that recorded changes and drop it.
+
+        Files edited since the checkpoint was sealed are not overwritten: the
+        result lists them as conflicts and nothing changes unless ``force``.
+        """
+        with self._lock:
+            self._load()
+            while self._checkpoints and not self._checkpoints[-1].files:
+                self._checkpoints.pop()
+            if not self._checkpoints:
+                self._save()
+                return None
+            checkpoint = self._checkpoints[-1]
+            conflicts = [
+                path_str
+                for path_str, expected in sorted(checkpoint.after.items())
+                if expected != SKIPPED and _file_digest(Path(path_str)) != expected
+            ]
+            if conflicts and not force:
+                return UndoResult(checkpoint, [], [], [], conflicts)
+            self._checkpoints.pop()
+            result = UndoResult(checkpoint, [], [], [], conflicts)
+            for path_str, digest in sorted(checkpoint.files.items()):
+                path = Path(path_str)
+                if digest == SKIPPED:
+                    result.skipped.append(path_str)
+                    continue
+                if digest is None:
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                        result.removed.append(path_str)
+                    elif path.exists():
+                        path.unlink()
+                        result.removed.append(path_str)
+                else:
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                    atomic_write_bytes(path, load_blob(digest))
+                    result.restored.append(path_str)
+                file_cache.invalidate(path)
+            self._save()
+            self._collect_garbage([checkpoint])
+            return result
+
+
+checkpoint_journal = CheckpointJournal()
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import shlex
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.runtime_config import COMMAND_CACHE_TREE_TTL_SECONDS
+from app.utils.file_watcher import change_bus, file_watcher
+from app.utils.git_service import get_git_service
+
+# Anything that could redirect, chain, substitute or glob keeps the command uncached.
+_SHELL_META = set(";|&<>`$(){}[]*?~!\n\\")
+
+_PATH_COMMANDS = {"cat", "head", "tail", "wc", "stat", "file", "ls"}
+_TREE_COMMANDS = {"tree", "find", "grep", "rg", "du"}
+_CONSTANT_COMMANDS = {"pwd", "uname", "which"}
+# Binaries whose version query is known to be side-effect free, with the
+# arguments that mean "print the version" for that program specifically
+# (elsewhere ``-V`` may mean verbose and ``version`` may be a make target).
+_VERSION_ARGS: dict[str, set[str]] = {
+    "python": {"--version", "-V"},
+    "python3": {"--version", "-V"},
+    "node": {"--version", "-v"},
+    "npm": {"--version", "-v"},
+    "pnpm": {"--version", "-v"},
+    "yarn": {"--version", "-v"},
+    "deno": {"--version", "-V"},
+    "bun": {"--version"},
+    "pip": {"--version", "-V"},
+    "pip3": {"--version", "-V"},
+    "uv": {"--version", "-V"},
+    "ruff": {"--version", "-V"},
+    "black": {"--version"},
+    "pytest": {"--version"},
+    "go": {"version"},
+    "cargo": {"--version", "-V"},
+    "rustc": {"--version", "-V"},
+    "gcc": {"--version"},
+    "clang": {"--version"},
+    "make": {"--version"},
+    "cmake": {"--version"},
+    "java": {"-version", "--version"},
+    "ruby": {"--version", "-v"},
+    "git": {"--version"},
+    "docker": {"--version"},
+}
+
+_GIT_READ_ONLY = {
+    "status", "diff", "log", "show", "rev-parse", "ls-files", "blame",
+    "describe", "shortlog", "branch", "tag", "remote",
+}
+# branch/tag/remote only list when given no names and only these flags.
+_GIT_LIST_FLAGS = {"-a", "-r", "-v", "-vv", "-l", "--list", "--all", "--show-current"}
+_FIND_ACTIONS = {"-delete", "-exec", "-execdir", "-ok", "-okdir", "-fprint", "-fprintf", "-fls"}
+# ls flags that print per-entry metadata or recurse, so the directory mtime isn't enough.
+_LS_DETAIL_FLAGS = set("lRstSuch")
+
+
+@dataclass
+class CommandPlan:
+    argv: list[str]
+    # "paths": stat of the referenced paths; "tree": needs the file watcher;
+    # "git": repository state; "binary": the executable itself.
+    kind: str
+    paths: list[str]
+
+
+def classify(command: str) -> Optional[CommandPlan]:
+    """Return a plan if ``command`` is a known side-effect-free invocation."""
+    if not command.strip() or any(ch in _SHELL_META for ch in command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or "=" in argv[0]:
+        return None
+    prog, args = os.path.basename(argv[0]), argv[1:]
+    operands = [a for a in args if not a.startswith("-")]
+
+    if len(args) == 1 and args[0] in _VERSION_ARGS.get(prog, ()) and argv[0] == prog:
+        return CommandPlan(argv, "binary", [])
+    if prog == "git":
+        if not args or args[0] not in _GIT_READ_ONLY:
+            return None
+        sub_args = args[1:]
+        if args[0] in {"branch", "tag", "remote"}:
+            if any(a not in _GIT_LIST_FLAGS for a in sub_args):
+                return None
+        if any(a.startswith("--output") for a in sub_args):
+            return None
+        return CommandPlan(argv, "git", [])
+    if prog in _CONSTANT_COMMANDS:
+        return CommandPlan(argv, "binary", [])
+    if prog == "tail" and any(a in {"-f", "-F", "--follow"} or a.startswith("--follow") for a in args):
+        return None
+    if prog == "find" and any(a in _FIND_ACTIONS for a in args):
+        return None
+    if prog in _TREE_COMMANDS:
+        return CommandPlan(argv, "tree", [])
+    if prog == "ls":
+        flags = "".join(a.lstrip("-") for a in args if a.startswith("-") and not a.startswith("--"))
+        if set(flags) & _LS_DETAIL_FLAGS or any(a.startswith("--") for a in args):
+            return CommandPlan(argv, "tree", [])
+        return CommandPlan(argv, "paths", operands or ["."])
+    if prog in _PATH_COMMANDS and operands:
+        return CommandPlan(argv, "paths", operands)
+    return None
+
+
+def is_read_only(command: str) -> bool:
+    return classify(command) is not None
+
+
+def _stat_sig(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class CommandResultCache:
+    """LRU of read-only command output, validated by an input fingerprint.
+
+    Mutating tool calls and file-watcher events clear it wholesale; results
+    that only the watcher vouches for also expire after a short TTL.
+    """
+
+    MAX_ENTRIES = 128
+    MAX_RESULT_CHARS = 64 * 1024
+
+    def __init__(self):
+        # key -> (fingerprint, result, expiry on the monotonic clock or None)
+        self._entries: OrderedDict[tuple, tuple[tuple, str, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        change_bus.subscribe(self._on_files_changed)
+
+    def _on_files_changed(self, paths) -> None:
+        self.invalidate()
+
+    def _key(self, command: str, cwd: str) -> tuple:
+        path_env = hashlib.sha1(os.environ.get("PATH", "").encode()).hexdigest()
+        return command.strip(), cwd, path_env
+
+    def _fingerprint(self, plan: CommandPlan, cwd: str) -> Optional[tuple]:
+        if plan.kind == "paths":
+            return tuple(_stat_sig(os.path.join(cwd, p)) for p in plan.paths)
+        if plan.kind == "tree":
+            return () if file_watcher.running else None
+        if plan.kind == "git":
+            service = get_git_service(cwd)
+            return service.state_key() if service else None
+        exe = shutil.which(plan.argv[0])
+        return (exe, _stat_sig(exe) if exe else None)
+
+    def lookup(self, command: str, cwd: str) -> tuple[Optional[str], Optional[tuple]]:
+        """(cached result or None, fingerprint to store with a fresh result or None).
+
+        The fingerprint is taken before the command runs, so a change racing
+        with it can only cause a miss, never a stale hit.
+        """
+        plan = classify(command)
+        if plan is None:
+            return None, None
+        fingerprint = self._fingerprint(plan, cwd)
+        if fingerprint is None:
+            return None, None
+        key = self._key(command, cwd)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and time.monotonic() >= entry[2]:
+                del self._entries[key]
+                entry = None
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                return entry[1], fingerprint
+        return None, fingerprint
+
+    def put(self, command: str, cwd: str, fingerprint: tuple, result: str) -> None:
+        if len(result) > self.MAX_RESULT_CHARS or result.startswith("Error:"):
+            return
+        plan = classify(command)
+        expires = (
+            time.monotonic() + COMMAND_CACHE_TREE_TTL_SECONDS
+            if plan is not None and plan.kind == "tree"
+            else None
+        )
+        key = self._key(command, cwd)
+        with self._lock:
+            self._entries[key] = (fingerprint, result, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+command_cache = CommandResultCache()
@@ -0,0 +1,162 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.core.runtime_config import FILE_CACHE_MAX_BYTES, FILE_CACHE_MAX_ENTRY_BYTES
+from app.utils.session_stats import session_tracker
+
+
+@dataclass
+class CachedFile:
+    text: str
+    # True when the bytes were not valid UTF-8 and undecodable bytes were dropped.
+    lossy: bool
+    signature: tuple[int, int, int]
+
+
+def _signature(st: os.stat_result) -> tuple[int, int, int]:
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _cache_key(path: Path) -> str:
+    return str(path.expanduser().resolve())
+
+
+def _decode(data: bytes) -> tuple[str, bool]:
+    try:
+        text, lossy = data.decode("utf-8"), False
+    except UnicodeDecodeError:
+        text, lossy = data.decode("utf-8", errors="ignore"), True
+    return text.replace("\r\n", "\n"), lossy
+
+
+class FileContentCache:
+    """Session-wide LRU of decoded file contents, validated by stat signature."""
+
+    def __init__(
+        self,
+        max_bytes: int = FILE_CACHE_MAX_BYTES,
+        max_entry_bytes: int = FILE_CACHE_MAX_ENTRY_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: OrderedDict[str, CachedFile] = OrderedDict()
+        self._total_bytes = 0
+        # Range -> (stat signature, turn it was delivered in).
+        self._delivered: dict[tuple[str, Optional[int], Optional[int]], tuple] = {}
+        self.turn = 0
+        self._lock = threading.Lock()
+
+    def is_cacheable(self, path: Path) -> bool:
+        try:
+            return path.stat().st_size <= self.max_entry_bytes
+        except OSError:
+            return False
+
+    def read(self, path: Path) -> CachedFile:
+        key = _cache_key(path)
+        st = os.stat(key)
+        signature = _signature(st)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                session_tracker.record_file_cache(hit=True)
+                return entry
+
+        with open(key, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        text, lossy = _decode(data)
+        entry = CachedFile(text, lossy, _signature(st))
+        session_tracker.record_file_cache(hit=False)
+        if len(data) <= self.max_entry_bytes:
+            self._put(key, entry)
+        return entry
+
+    def read_text(self, path: Path) -> str:
+        return self.read(path).text
+
+    def store(self, path: Path, text: str) -> None:
+        """Write-through after a tool rewrote ``path`` with ``text``."""
+        key = _cache_key(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.invalidate(path)
+            return
+        if st.st_size > self.max_entry_bytes:
+            self.invalidate(path)
+            return
+        self._put(key, CachedFile(text.replace("\r\n", "\n"), False, _signature(st)))
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Drop ``path`` (and anything below it, for directories) or everything."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+            key = _cache_key(path)
+            prefix = key.rstrip(os.sep) + os.sep
+            for cached_key in [
+                k for k in self._entries if k == key or k.startswith(prefix)
+            ]:
+                self._drop(cached_key)
+
+    def mark_delivered(
+        self, path: Path, start_line: Optional[int], end_line: Optional[int]
+    ) -> None:
+        """Remember that this exact range was returned in full to the model."""
+        try:
+            signature = _signature(os.stat(_cache_key(path)))
+        except OSError:
+            return
+        with self._lock:
+            self._delivered[(_cache_key(path), start_line, end_line)] = (signature, self.turn)
+
+    def delivered_turn(
+        self, path: Path, start_line: Optional[int], end_line: Optional[int]
+    ) -> Optional[int]:
+        """Turn in which this range was last delivered, if the file is unchanged since."""
+        with self._lock:
+            delivered = self._delivered.get((_cache_key(path), start_line, end_line))
+        if delivered is None:
+            return None
+        try:
+            unchanged = _signature(os.stat(_cache_key(path))) == delivered[0]
+        except OSError:
+            return None
+        return delivered[1] if unchanged else None
+
+    def is_delivered_unchanged(
+        self, path: Path, start_line: Optional[int], end_line: Optional[int]
+    ) -> bool:
+        return self.delivered_turn(path, start_line, end_line) is not None
+
+    def begin_turn(self) -> None:
+        self.turn += 1
+
+    def reset_delivered(self) -> None:
+        """Forget delivered ranges once the conversation context is replaced."""
+        with self._lock:
+            self._delivered.clear()
+
+    def _put(self, key: str, entry: CachedFile) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._total_bytes += entry.signature[1]
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.signature[1]
+
+
+file_cache = FileContentCache()
@@ -1,4 +1,14 @@
+import heapq
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, Optional
+
+from app.utils.cancellation import check_cancelled
 
 SKIP_DIRS = {
     ".git",
@@ -11,6 +21,263 @@ SKIP_DIRS = {
 }
 
 
+@lru_cache(maxsize=64)
+def _compile_glob(pattern: str) -> re.Pattern:
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+def glob_matches(rel_path: str, pattern: str) -> bool:
+    """Match a root-relative posix path; patterns without "/" match the basename."""
+    if "/" not in pattern:
+        rel_path = rel_path.rsplit("/", 1)[-1]
+    return _compile_glob(pattern).match(rel_path) is not None
+
+
+def walk_files(
+    root: str | Path = ".",
+    pattern: Optional[str] = None,
+    skip_dirs: set[str] = SKIP_DIRS,
+) -> Iterator[Path]:
+    """Yield files under ``root`` (pruning ``skip_dirs``), optionally glob-filtered."""
+    root_path = Path(root).expanduser()
+    if root_path.is_file():
+        yield root_path
+        return
+    for dirpath, dirs, files in os.walk(root_path):
+        # Runs in tool threads; stop between directories once the request is cancelled.
+        check_cancelled()
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs)
+        rel_dir = os.path.relpath(dirpath, root_path).replace(os.sep, "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        for name in sorted(files):
+            if pattern and not glob_matches(prefix + name, pattern):
+                continue
+            yield Path(dirpath) / name
+
+
+_BOUNDARY_CHARS = "/_-. "
+
+
+def _is_boundary(text: str, pos: int) -> bool:
+    return pos == 0 or text[pos - 1] in _BOUNDARY_CHARS
+
+
+def fuzzy_score(query: str, candidate: str) -> Optional[int]:
+    """fzf-style score for ``query`` as a subsequence of ``candidate`` (both lowercase)."""
+    if not query:
+        return 0
+    base_start = candidate.rstrip("/").rfind("/") + 1
+
+    def score_from(start: int) -> Optional[int]:
+        score = 0
+        pos = start
+        prev = -2
+        for ch in query:
+            found = candidate.find(ch, pos)
+            if found < 0:
+                return None
+            if found != prev + 1 and not _is_boundary(candidate, found):
+                # Prefer a word-boundary occurrence shortly ahead (h|ttp_|s|er|v|ice).
+                ahead = candidate.find(ch, found + 1, found + 8)
+                while ahead >= 0 and not _is_boundary(candidate, ahead):
+                    ahead = candidate.find(ch, ahead + 1, found + 8)
+                if ahead >= 0:
+                    found = ahead
+            score += 16
+            if _is_boundary(candidate, found):
+                score += 10
+            if found == prev + 1:
+                score += 12
+            elif prev >= 0:
+                score -= min(found - prev - 1, 10)
+            if found >= base_start:
+                score += 4
+            prev = found
+            pos = found + 1
+        return score
+
+    scores = [s for s in (score_from(base_start), score_from(0)) if s is not None]
+    if not scores:
+        return None
+    return max(scores) - len(candidate) // 8
+
+
+class FuzzyFileIndex:
+    """In-memory project path index for @-mention completion."""
+
+    REFRESH_INTERVAL = 2.0
+    # Every regex hit is scored; the cap only bounds pathological one-letter
+    # queries in huge trees and is far above any result limit.
+    MAX_CANDIDATES = 20_000
+
+    def __init__(self, root: str = "."):
+        self.root = root
+        self._paths: list[str] = []
+        # Lowercased paths and basenames, one per line, in _paths order.
+        self._path_haystack = ""
+        self._base_haystack = ""
+        self._path_offsets: list[int] = []
+        self._base_offsets: list[int] = []
+        self._dir_mtimes: dict[str, int] = {}
+        self._dir_entries: dict[str, list[str]] = {}
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def refresh_async(self, force: bool = False) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            if not force and time.monotonic() - self._last_refresh < self.REFRESH_INTERVAL:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            paths: list[str] = []
+            seen_dirs: set[str] = set()
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                seen_dirs.add(rel)
+                for entry in self._scan_dir(rel):
+                    paths.append(entry)
+                    if entry.endswith("/"):
+                        stack.append(entry)
+            for stale in set(self._dir_entries) - seen_dirs:
+                self._dir_entries.pop(stale, None)
+                self._dir_mtimes.pop(stale, None)
+
+            # Shallow, short paths first so early-stopped scans keep the likeliest hits.
+            paths.sort(key=lambda p: (p.count("/") - p.endswith("/"), len(p), p))
+            lowered = [p.lower() for p in paths]
+            bases = [p[p.rstrip("/").rfind("/") + 1 :] for p in lowered]
+            path_haystack, path_offsets = _join_lines(lowered)
+            base_haystack, base_offsets = _join_lines(bases)
+            with self._lock:
+                self._paths = paths
+                self._path_haystack, self._path_offsets = path_haystack, path_offsets
+                self._base_haystack, self._base_offsets = base_haystack, base_offsets
+                self._ready = True
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._last_refresh = time.monotonic()
+
+    def _scan_dir(self, rel: str) -> list[str]:
+        """Entries of ``rel`` as root-relative paths; rescanned only if its mtime moved."""
+        full = os.path.join(self.root, rel) if rel else self.root
+        try:
+            mtime_ns = os.stat(full).st_mtime_ns
+        except OSError:
+            return []
+        if self._dir_mtimes.get(rel) == mtime_ns:
+            return self._dir_entries.get(rel, [])
+        entries: list[str] = []
+        try:
+            with os.scandir(full) as it:
+                for entry in it:
+                    if entry.name in SKIP_DIRS or entry.name.startswith("."):
+                        continue
+                    try:
+                        # Symlinked dirs aren't descended (like os.walk), so link cycles can't loop.
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append(f"{rel}{entry.name}" + ("/" if is_dir else ""))
+        except OSError:
+            return []
+        self._dir_mtimes[rel] = mtime_ns
+        self._dir_entries[rel] = entries
+        return entries
+
+    def invalidate(self) -> None:
+        self._dir_mtimes.clear()
+        self.refresh_async(force=True)
+
+    def search(self, query: str, limit: int = 20) -> list[str]:
+        self.refresh_async()
+        query = query.lower()
+        with self._lock:
+            paths = self._paths
+            path_haystack, path_offsets = self._path_haystack, self._path_offsets
+            base_haystack, base_offsets = self._base_haystack, self._base_offsets
+        if not query:
+            return paths[:limit]
+
+        # "a[^\nb]*b[^\nc]*c": each gap stops at the first next char, so no backtracking.
+        pattern = re.compile(
+            re.escape(query[0])
+            + "".join(f"[^\\n{re.escape(ch)}]*{re.escape(ch)}" for ch in query[1:])
+        )
+        candidates = dict.fromkeys(
+            _matching_lines(pattern, base_haystack, base_offsets, self.MAX_CANDIDATES)
+        )
+        candidates.update(
+            dict.fromkeys(
+                _matching_lines(pattern, path_haystack, path_offsets, self.MAX_CANDIDATES)
+            )
+        )
+        scored = []
+        for idx in candidates:
+            score = fuzzy_score(query, paths[idx].lower())
+            if score is not None:
+                scored.append((-score, idx))
+        return [paths[idx] for _, idx in heapq.nsmallest(limit, scored)]
+
+
+def _join_lines(lines: list[str]) -> tuple[str, list[int]]:
+    offsets = []
+    offset = 0
+    for line in lines:
+        offsets.append(offset)
+        offset += len(line) + 1
+    return "\n".join(lines), offsets
+
+
+def _matching_lines(
+    pattern: re.Pattern, haystack: str, offsets: list[int], cap: int
+) -> list[int]:
+    """Indices of lines containing ``pattern``, scanning at most until ``cap`` hits."""
+    found: list[int] = []
+    pos = 0
+    while len(found) < cap:
+        match = pattern.search(haystack, pos)
+        if match is None:
+            break
+        idx = bisect_right(offsets, match.start()) - 1
+        found.append(idx)
+        pos = offsets[idx + 1] if idx + 1 < len(offsets) else len(haystack)
+    return found
+
+
+file_index = FuzzyFileIndex()
+
+
 def search_files_for_query(
     query: str = "",
     limit: int = 20,
@@ -21,40 +288,52 @@ def search_files_for_query(
 
     try:
         root = Path(".")
-        search_path = root
-        search_name = query.lower()
-
-        if "/" in query:
-            p_query = Path(query)
-            if query.endswith("/"):
-                search_path = p_query
-                search_name = ""
-            else:
-                search_path = p_query.parent
-                search_name = p_query.name.lower()
-
-        if search_path.exists() and search_path.is_dir():
-            for item in search_path.iterdir():
-                if item.name in SKIP_DIRS or item.name.startswith("."):
-                    continue
-                if search_name and search_name not in item.name.lower():
-                    continue
-                full_str = str(item)
-                if full_str.startswith("./"):
-                    full_str = full_str[2:]
-                items.append(full_str + ("/" if item.is_dir() else ""))
-                if len(items) >= safe_limit:
-                    break
+        if file_index.ready:
+            items = file_index.search(query, safe_limit)
+        else:
+            file_index.refresh_async()
+            items = _search_top_level(query, safe_limit)
 
         if include_git_branches and len(query) > 1 and len(items) < safe_limit:
-            git_heads = root / ".git" / "refs" / "heads"
-            if git_heads.exists():
-                for branch in git_heads.iterdir():
-                    if branch.is_file() and query.lower() in branch.name.lower():
-                        items.append(f"branch:{branch.name}")
-                        if len(items) >= safe_limit:
-                            break
+            from app.utils.git_service import get_git_service
+
+            service = get_git_service(str(root))
+            for branch in service.refs.branches() if service else []:
+                if query.lower() in branch.lower():
+                    items.append(f"branch:{branch}")
+                    if len(items) >= safe_limit:
+                        break
     except Exception:
         return []
 
     return items[:safe_limit]
+
+
+def _search_top_level(query: str, safe_limit: int) -> list[str]:
+    """Single-directory substring match used until the index has been built."""
+    items: list[str] = []
+    search_path = Path(".")
+    search_name = query.lower()
+
+    if "/" in query:
+        p_query = Path(query)
+        if query.endswith("/"):
+            search_path = p_query
+            search_name = ""
+        else:
+            search_path = p_query.parent
+            search_name = p_query.name.lower()
+
+    if search_path.exists() and search_path.is_dir():
+        for item in search_path.iterdir():
+            if item.name in SKIP_DIRS or item.name.startswith("."):
+                continue
+            if search_name and search_name not in item.name.lower():
+                continue
+            full_str = str(item)
+            if full_str.startswith("./"):
+                full_str = full_str[2:]
+            items.append(full_str + ("/" if item.is_dir() else ""))
+            if len(items) >= safe_limit:
+                break
+    return items
@@ -0,0 +1,267 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import weakref
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.core.runtime_config import (
+    WATCHER_DEBOUNCE_SECONDS,
+    WATCHER_MAX_WATCHES,
+    WATCHER_POLL_INTERVAL,
+)
+from app.utils.file_cache import file_cache
+from app.utils.file_search import file_index
+from app.utils.line_index import line_index_cache
+from app.utils.logger import log_debug, log_error
+from app.utils.tree_cache import TREE_SKIP_DIRS, tree_cache
+
+# Subscribers receive absolute paths, or None when "anything may have changed"
+# (inotify queue overflow, watcher restart).
+ChangeCallback = Callable[[Optional[frozenset[str]]], None]
+
+
+class FileChangeBus:
+    """Collects raw change events and fans them out to subscribers, debounced."""
+
+    def __init__(self, debounce: float = WATCHER_DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self._subscribers: list = []
+        self._pending: set[str] = set()
+        self._pending_all = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: ChangeCallback) -> None:
+        # Bound methods are held weakly so short-lived owners (PromptBuilder) don't leak.
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else None
+        with self._lock:
+            self._subscribers.append(ref or (lambda: callback))
+
+    def publish(self, paths: Optional[set[str]]) -> None:
+        with self._lock:
+            if paths is None:
+                self._pending_all = True
+            else:
+                self._pending.update(paths)
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            changed = None if self._pending_all else frozenset(self._pending)
+            self._pending = set()
+            self._pending_all = False
+            self._timer = None
+            callbacks = [ref() for ref in self._subscribers]
+            self._subscribers = [
+                ref for ref, cb in zip(self._subscribers, callbacks) if cb is not None
+            ]
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(changed)
+            except Exception as e:
+                log_error("File change subscriber failed", e)
+
+
+class _InotifyBackend:
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: str, bus: FileChangeBus):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.bus = bus
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wd_paths: dict[int, str] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self, path: str) -> None:
+        if len(self._wd_paths) >= WATCHER_MAX_WATCHES:
+            raise OSError(28, "inotify watch budget exhausted")
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            # ENOSPC: the system-wide watch limit is hit; polling is the only option.
+            if err == 28:
+                raise OSError(err, "inotify watch limit reached")
+            return
+        self._wd_paths[wd] = path
+
+    def _watch_tree(self, top: str) -> None:
+        for dirpath, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in TREE_SKIP_DIRS]
+            self._add_watch(dirpath)
+
+    def run(self, stop: threading.Event) -> None:
+        try:
+            while not stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._dispatch(data)
+        finally:
+            os.close(self._fd)
+
+    def _dispatch(self, data: bytes) -> None:
+        changed: set[str] = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, name_len = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(data[offset : offset + name_len].rstrip(b"\0"))
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                self.bus.publish(None)
+                continue
+            if mask & self.IN_IGNORED:
+                self._wd_paths.pop(wd, None)
+                continue
+            base = self._wd_paths.get(wd)
+            if base is None:
+                continue
+            path = os.path.join(base, name) if name else base
+            changed.add(path)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                if name not in TREE_SKIP_DIRS:
+                    try:
+                        self._watch_tree(path)
+                    except OSError:
+                        self.bus.publish(None)
+        if changed:
+            self.bus.publish(changed)
+
+
+class _PollingBackend:
+    """Fallback: periodic mtime/size scan of the tree, publishing the diff."""
+
+    def __init__(self, root: str, bus: FileChangeBus, interval: float = WATCHER_POLL_INTERVAL):
+        self.root = root
+        self.bus = bus
+        self.interval = interval
+        self._state = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        state: dict[str, tuple[int, int]] = {}
+        for dirpath, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in TREE_SKIP_DIRS]
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            current = self._scan()
+            previous = self._state
+            changed = {p for p, sig in current.items() if previous.get(p) != sig}
+            changed.update(p for p in previous if p not in current)
+            self._state = current
+            if changed:
+                self.bus.publish(changed)
+
+
+class FileWatcher:
+    """Watches the workspace (inotify, else polling) and feeds ``change_bus``."""
+
+    def __init__(self, bus: FileChangeBus):
+        self.bus = bus
+        self.backend_name: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, root: str = ".") -> None:
+        if self.running:
+            return
+        root = str(Path(root).expanduser().resolve())
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(root,), name="file-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, root: str) -> None:
+        try:
+            backend = _InotifyBackend(root, self.bus)
+            self.backend_name = "inotify"
+        except (OSError, AttributeError) as e:
+            log_debug(f"inotify unavailable ({e}); polling {root}")
+            backend = _PollingBackend(root, self.bus)
+            self.backend_name = "polling"
+        try:
+            backend.run(self._stop)
+        except Exception as e:
+            log_error("File watcher stopped", e)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+change_bus = FileChangeBus()
+file_watcher = FileWatcher(change_bus)
+
+
+def _invalidate_caches(paths: Optional[frozenset[str]]) -> None:
+    if paths is None:
+        file_cache.invalidate()
+        line_index_cache.invalidate()
+        tree_cache.invalidate()
+        file_index.invalidate()
+        return
+    for path in paths:
+        file_cache.invalidate(Path(path))
+        line_index_cache.invalidate(path)
+        tree_cache.invalidate(path)
+    file_index.refresh_async(force=True)
+
+
+change_bus.subscribe(_invalidate_caches)
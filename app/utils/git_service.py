@@ -0,0 +1,398 @@
+import heapq
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from app.utils.file_watcher import change_bus, file_watcher
+
+
+def find_repository(root: str = ".") -> Optional[tuple[Path, Path]]:
+    """(work tree, git dir) for ``root`` or a parent; follows ``.git`` files."""
+    current = Path(root).expanduser().resolve()
+    for candidate in [current, *current.parents]:
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            try:
+                line = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                target = Path(line[len("gitdir:"):].strip())
+                if not target.is_absolute():
+                    target = (candidate / target).resolve()
+                return candidate, target
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    # Linked worktrees keep refs/ and packed-refs in the main repository's git dir.
+    try:
+        rel = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    return (git_dir / rel).resolve()
+
+
+class RefReader:
+    """Reads HEAD and branch refs from loose files and packed-refs, without git."""
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = git_dir
+        self.common_dir = _common_dir(git_dir)
+        self._packed: dict[str, str] = {}
+        self._packed_sig: Optional[tuple[int, int]] = None
+
+    def _packed_refs(self) -> dict[str, str]:
+        path = self.common_dir / "packed-refs"
+        try:
+            st = path.stat()
+        except OSError:
+            self._packed, self._packed_sig = {}, None
+            return self._packed
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig != self._packed_sig:
+            refs: dict[str, str] = {}
+            for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+                if not line or line[0] in "#^":
+                    continue
+                sha, _, name = line.partition(" ")
+                refs[name.strip()] = sha
+            self._packed, self._packed_sig = refs, sig
+        return self._packed
+
+    def resolve(self, ref: str, depth: int = 0) -> Optional[str]:
+        if depth > 5:
+            return None
+        base = self.git_dir if ref == "HEAD" else self.common_dir
+        try:
+            value = (base / ref).read_text(encoding="utf-8").strip()
+        except (OSError, ValueError):
+            return self._packed_refs().get(ref)
+        if value.startswith("ref:"):
+            return self.resolve(value[4:].strip(), depth + 1)
+        return value or None
+
+    def resolve_name(self, name: str) -> Optional[str]:
+        """Resolve a short or full ref name (HEAD, main, v1.0, origin/main)."""
+        if _looks_like_sha(name):
+            return name
+        for ref in (name, f"refs/heads/{name}", f"refs/tags/{name}", f"refs/remotes/{name}"):
+            sha = self.resolve(ref)
+            if sha:
+                return sha
+        return None
+
+    def head(self) -> tuple[Optional[str], Optional[str]]:
+        """(symbolic ref or None when detached, commit sha or None when unborn)."""
+        try:
+            value = (self.git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return None, None
+        if value.startswith("ref:"):
+            ref = value[4:].strip()
+            return ref, self.resolve(ref)
+        return None, value
+
+    def branches(self) -> list[str]:
+        names = {
+            ref[len("refs/heads/"):]
+            for ref in self._packed_refs()
+            if ref.startswith("refs/heads/")
+        }
+        heads = self.common_dir / "refs" / "heads"
+        for dirpath, _, files in os.walk(heads):
+            for name in files:
+                rel = os.path.relpath(os.path.join(dirpath, name), heads)
+                names.add(rel.replace(os.sep, "/"))
+        return sorted(names)
+
+
+class CatFileBatch:
+    """A long-lived ``git cat-file --batch`` process for object reads."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+    def read(self, obj: str) -> Optional[tuple[str, bytes]]:
+        with self._lock:
+            process = self._ensure()
+            process.stdin.write(obj.encode() + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline().decode().split()
+            if len(header) != 3:
+                return None  # "<obj> missing"
+            _, kind, size = header
+            data = process.stdout.read(int(size))
+            process.stdout.read(1)  # trailing LF
+            return kind, data
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.stdin.close()
+                self._process.wait(timeout=2)
+            self._process = None
+
+
+@dataclass
+class Commit:
+    sha: str
+    parents: list[str]
+    author: str
+    timestamp: int
+    subject: str
+
+
+def parse_commit(sha: str, data: bytes) -> Commit:
+    header, _, message = data.decode("utf-8", errors="replace").partition("\n\n")
+    parents: list[str] = []
+    author = ""
+    timestamp = 0
+    for line in header.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "parent":
+            parents.append(value)
+        elif key == "author":
+            author = value.rsplit(" ", 2)[0].split(" <")[0]
+        elif key == "committer":
+            try:
+                timestamp = int(value.rsplit(" ", 2)[1])
+            except (IndexError, ValueError):
+                pass
+    subject = message.strip().splitlines()[0] if message.strip() else ""
+    return Commit(sha, parents, author, timestamp, subject)
+
+
+@dataclass
+class StatusEntry:
+    path: str
+    index: str
+    worktree: str
+    orig_path: Optional[str] = None
+
+
+@dataclass
+class GitStatus:
+    branch: Optional[str] = None
+    upstream: Optional[str] = None
+    ahead: int = 0
+    behind: int = 0
+    entries: list[StatusEntry] = field(default_factory=list)
+    untracked: list[str] = field(default_factory=list)
+    conflicted: list[str] = field(default_factory=list)
+
+
+def parse_status_v2(raw: bytes) -> GitStatus:
+    """Parse ``git status --porcelain=v2 -z --branch`` output."""
+    status = GitStatus()
+    records = raw.decode("utf-8", errors="replace").split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        if record.startswith("# branch.head "):
+            head = record[len("# branch.head "):]
+            status.branch = None if head == "(detached)" else head
+        elif record.startswith("# branch.upstream "):
+            status.upstream = record[len("# branch.upstream "):]
+        elif record.startswith("# branch.ab "):
+            ahead, behind = record[len("# branch.ab "):].split()
+            status.ahead, status.behind = int(ahead), -int(behind)
+        elif record.startswith("1 "):
+            parts = record.split(" ", 8)
+            status.entries.append(StatusEntry(parts[8], parts[1][0], parts[1][1]))
+        elif record.startswith("2 "):
+            parts = record.split(" ", 9)
+            # Renames carry the original path as the next NUL-separated record.
+            orig = records[i] if i < len(records) else None
+            i += 1
+            status.entries.append(StatusEntry(parts[9], parts[1][0], parts[1][1], orig))
+        elif record.startswith("u "):
+            status.conflicted.append(record.split(" ", 10)[10])
+        elif record.startswith("? "):
+            status.untracked.append(record[2:])
+    return status
+
+
+class GitService:
+    """Per-repository git access with results cached on repository state.
+
+    The cache key is HEAD, the index signature and a work-tree generation that
+    the file watcher bumps (after its debounce) and mutating tool calls bump
+    synchronously via ``invalidate_git_services``; without a running watcher
+    work-tree results are recomputed every call.
+    """
+
+    def __init__(self, repo_root: Path, git_dir: Path):
+        self.repo_root = repo_root
+        self.git_dir = git_dir
+        self.refs = RefReader(git_dir)
+        self.cat_file = CatFileBatch(self.repo_root)
+        self._generation = 0
+        self._cache: dict[tuple, tuple[tuple, object]] = {}
+        self._lock = threading.Lock()
+        change_bus.subscribe(self._on_files_changed)
+
+    def _on_files_changed(self, paths) -> None:
+        self._generation += 1
+
+    def invalidate(self) -> None:
+        self._generation += 1
+
+    def state_key(self) -> Optional[tuple]:
+        if not file_watcher.running:
+            return None
+        ref, sha = self.refs.head()
+        try:
+            st = (self.git_dir / "index").stat()
+            index_sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            index_sig = None
+        return ref, sha, index_sig, self._generation
+
+    def _cached(self, key: tuple, compute):
+        state = self.state_key()
+        if state is not None:
+            with self._lock:
+                hit = self._cache.get(key)
+            if hit is not None and hit[0] == state:
+                return hit[1]
+        value = compute()
+        if state is not None:
+            with self._lock:
+                self._cache[key] = (state, value)
+        return value
+
+    def _git(self, *args: str, timeout: int = 30) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["git", *args],
+            cwd=self.repo_root,
+            capture_output=True,
+            timeout=timeout,
+        )
+
+    def status(self) -> GitStatus:
+        def compute() -> GitStatus:
+            result = self._git("status", "--porcelain=v2", "-z", "--branch")
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.decode(errors="replace").strip())
+            return parse_status_v2(result.stdout)
+
+        return self._cached(("status",), compute)
+
+    def diff(self, staged: bool = False, path: Optional[str] = None, stat: bool = False) -> str:
+        def compute() -> str:
+            args = ["diff", "--no-color", "--no-ext-diff"]
+            if staged:
+                args.append("--cached")
+            if stat:
+                args.append("--stat")
+            if path:
+                args += ["--", path]
+            result = self._git(*args)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.decode(errors="replace").strip())
+            return result.stdout.decode("utf-8", errors="replace")
+
+        return self._cached(("diff", staged, path, stat), compute)
+
+    def log(self, max_count: int = 20, start: str = "HEAD") -> list[Commit]:
+        """Commits reachable from ``start``, newest committer date first."""
+
+        def compute() -> list[Commit]:
+            sha = self._resolve_revision(start)
+            if sha is None:
+                return []
+            commits: list[Commit] = []
+            seen = {sha}
+            heap: list[tuple[int, str, Commit]] = []
+            first = self._read_commit(sha)
+            if first is not None:
+                heapq.heappush(heap, (-first.timestamp, sha, first))
+            while heap and len(commits) < max_count:
+                _, _, commit = heapq.heappop(heap)
+                commits.append(commit)
+                for parent in commit.parents:
+                    if parent in seen:
+                        continue
+                    seen.add(parent)
+                    parsed = self._read_commit(parent)
+                    if parsed is not None:
+                        heapq.heappush(heap, (-parsed.timestamp, parent, parsed))
+            return commits
+
+        return self._cached(("log", max_count, start), compute)
+
+    def _resolve_revision(self, name: str) -> Optional[str]:
+        sha = self.refs.resolve_name(name)
+        if sha is not None or not name or name.startswith("-"):
+            return sha
+        # Abbreviated SHAs and expressions (HEAD~3, main^2, v1.0^{commit}) need git.
+        result = self._git("rev-parse", "--verify", "--quiet", f"{name}^{{commit}}")
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode(errors="replace").strip() or None
+
+    def _read_commit(self, sha: str) -> Optional[Commit]:
+        obj = self.cat_file.read(sha)
+        if obj is None or obj[0] != "commit":
+            return None
+        return parse_commit(sha, obj[1])
+
+    def close(self) -> None:
+        self.cat_file.close()
+
+
+def _looks_like_sha(value: str) -> bool:
+    return len(value) == 40 and all(c in "0123456789abcdef" for c in value)
+
+
+_services: dict[str, GitService] = {}
+_services_lock = threading.Lock()
+
+
+def get_git_service(root: str = ".") -> Optional[GitService]:
+    repo = find_repository(root)
+    if repo is None:
+        return None
+    key = str(repo[0])
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = GitService(*repo)
+    return service
+
+
+def invalidate_git_services() -> None:
+    """Drop cached work-tree results now (the watcher only catches up after its debounce)."""
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        service.invalidate()
+
+
+def close_git_services() -> None:
+    with _services_lock:
+        for service in _services.values():
+            service.close()
+        _services.clear()
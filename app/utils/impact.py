@@ -0,0 +1,234 @@
+import ast
+import os
+import threading
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.utils.file_search import walk_files
+
+
+def is_test_file(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _module_names(rel_path: str) -> list[str]:
+    parts = rel_path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts:
+        return []
+    names = [".".join(parts)]
+    # src/ layout: "src/pkg/mod.py" is imported as "pkg.mod".
+    if parts[0] in {"src", "lib"} and len(parts) > 1:
+        names.append(".".join(parts[1:]))
+    return names
+
+
+def _parse_imports(path: Path, rel_path: str) -> list[str]:
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return []
+    package = rel_path[:-3].split("/")[:-1]
+    if rel_path.endswith("__init__.py"):
+        package = rel_path.split("/")[:-1]
+    found: list[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[: len(package) - node.level + 1] if node.level > 1 else package
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module or ""
+            if not prefix:
+                continue
+            found.append(prefix)
+            found.extend(f"{prefix}.{alias.name}" for alias in node.names if alias.name != "*")
+    return found
+
+
+class ImportGraph:
+    """Project-local Python import graph, re-parsing only files whose mtime moved."""
+
+    def __init__(self, root: str):
+        self.root = Path(root).expanduser().resolve()
+        self._parsed: dict[str, tuple[int, list[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _scan(self) -> tuple[dict[str, str], dict[str, list[str]]]:
+        modules: dict[str, str] = {}
+        imports: dict[str, list[str]] = {}
+        seen: set[str] = set()
+        for path in walk_files(self.root, "*.py"):
+            rel = path.relative_to(self.root).as_posix()
+            seen.add(rel)
+            for name in _module_names(rel):
+                modules.setdefault(name, rel)
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            cached = self._parsed.get(rel)
+            if cached is None or cached[0] != mtime_ns:
+                cached = (mtime_ns, _parse_imports(path, rel))
+                self._parsed[rel] = cached
+            imports[rel] = cached[1]
+        for stale in set(self._parsed) - seen:
+            del self._parsed[stale]
+        return modules, imports
+
+    def reverse_edges(self) -> tuple[dict[str, set[str]], int]:
+        """Map each project file to the files importing it; also returns file count."""
+        with self._lock:
+            modules, imports = self._scan()
+        importers: dict[str, set[str]] = {}
+        for rel, names in imports.items():
+            for name in names:
+                # "import a.b.c" also runs a/__init__ and a/b/__init__.
+                parts = name.split(".")
+                for depth in range(len(parts), 0, -1):
+                    target = modules.get(".".join(parts[:depth]))
+                    if target and target != rel:
+                        importers.setdefault(target, set()).add(rel)
+        return importers, len(imports)
+
+    def impacted_tests(self, changed: list[str]) -> tuple[list[str], int]:
+        """Test files that (transitively) import any changed file."""
+        importers, file_count = self.reverse_edges()
+        all_files = set(self._parsed)
+        start: set[str] = set()
+        tests: set[str] = set()
+        for item in changed:
+            path = Path(item)
+            if not path.is_absolute():
+                path = self.root / path
+            try:
+                rel = path.resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                continue
+            if os.path.basename(rel) == "conftest.py":
+                scope = os.path.dirname(rel)
+                tests.update(
+                    f for f in all_files
+                    if is_test_file(f) and (not scope or f.startswith(scope + "/"))
+                )
+                continue
+            start.add(rel)
+
+        queue = deque(start)
+        visited = set(start)
+        while queue:
+            current = queue.popleft()
+            if is_test_file(current) and current in all_files:
+                tests.add(current)
+            for importer in importers.get(current, ()):
+                if importer not in visited:
+                    visited.add(importer)
+                    queue.append(importer)
+        return sorted(tests), file_count
+
+
+_graphs: dict[str, ImportGraph] = {}
+
+
+def get_import_graph(root: str) -> ImportGraph:
+    key = str(Path(root).expanduser().resolve())
+    graph = _graphs.get(key)
+    if graph is None:
+        graph = _graphs[key] = ImportGraph(key)
+    return graph
+
+
+def shard_files(files: list[str], root: Path, shards: int) -> list[list[str]]:
+    """Greedy longest-first split by file size (a stand-in for test duration)."""
+    def size(rel: str) -> int:
+        try:
+            return (root / rel).stat().st_size
+        except OSError:
+            return 0
+
+    bins: list[tuple[int, list[str]]] = [(0, []) for _ in range(max(1, shards))]
+    for rel in sorted(files, key=size, reverse=True):
+        idx = min(range(len(bins)), key=lambda i: bins[i][0])
+        load, members = bins[idx]
+        members.append(rel)
+        bins[idx] = (load + size(rel), members)
+    return [members for _, members in bins if members]
+
+
+@dataclass
+class TestFailure:
+    nodeid: str
+    location: str
+    message: str
+
+
+@dataclass
+class TestReport:
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    failures: list[TestFailure] = field(default_factory=list)
+    durations: list[tuple[float, str]] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.passed + self.failed + self.errors + self.skipped
+
+
+def parse_junit(xml_path: str, report: TestReport) -> bool:
+    """Fold one pytest ``--junitxml`` (xunit1) file into ``report``."""
+    try:
+        tree = ET.parse(xml_path)
+    except (OSError, ET.ParseError):
+        return False
+    for case in tree.iter("testcase"):
+        classname = case.get("classname", "")
+        name = case.get("name", "")
+        file = case.get("file") or classname.replace(".", "/") + ".py"
+        nodeid = f"{file}::{name}"
+        report.durations.append((float(case.get("time", 0) or 0), nodeid))
+        problem = case.find("failure")
+        kind = "failed"
+        if problem is None:
+            problem = case.find("error")
+            kind = "errors"
+        if problem is None:
+            if case.find("skipped") is not None:
+                report.skipped += 1
+            else:
+                report.passed += 1
+            continue
+        setattr(report, kind, getattr(report, kind) + 1)
+        line = case.get("line")
+        location = f"{file}:{int(line) + 1}" if line and line.isdigit() else file
+        message = (problem.get("message") or problem.text or "").strip().splitlines()
+        report.failures.append(
+            TestFailure(nodeid, location, message[0][:200] if message else kind)
+        )
+    return True
+
+
+def format_report(report: TestReport, elapsed: float, shards: int, max_failures: int = 10) -> str:
+    status = "FAILED" if report.failed or report.errors else "PASSED"
+    lines = [
+        f"{status}: {report.passed} passed, {report.failed} failed, "
+        f"{report.errors} errors, {report.skipped} skipped in {elapsed:.1f}s "
+        f"({shards} shard{'s' if shards != 1 else ''})"
+    ]
+    for failure in report.failures[:max_failures]:
+        lines.append(f"- {failure.location} {failure.nodeid.split('::', 1)[-1]}: {failure.message}")
+    if len(report.failures) > max_failures:
+        lines.append(f"- ... {len(report.failures) - max_failures} more")
+    slowest = sorted(report.durations, reverse=True)[:3]
+    if slowest and slowest[0][0] >= 0.5:
+        lines.append(
+            "Slowest: " + ", ".join(f"{nodeid} {secs:.2f}s" for secs, nodeid in slowest)
+        )
+    return "\n".join(lines)
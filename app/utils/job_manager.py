@@ -0,0 +1,182 @@
+import asyncio
+import atexit
+import contextvars
+import os
+import shutil
+import signal
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.core.runtime_config import JOB_LOG_BACKUPS, JOB_LOG_MAX_BYTES, JOB_MAX_RUNNING
+
+
+@dataclass
+class Job:
+    id: str
+    command: str
+    cwd: str
+    log_path: Path
+    process: asyncio.subprocess.Process
+    started_at: float = field(default_factory=time.time)
+    ended_at: Optional[float] = None
+    returncode: Optional[int] = None
+    bytes_logged: int = 0
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def running(self) -> bool:
+        return self.returncode is None
+
+    def describe(self) -> str:
+        end = self.ended_at or time.time()
+        state = "running" if self.running else f"exited ({self.returncode})"
+        return (
+            f"[{self.id}] {state}, pid {self.process.pid}, {end - self.started_at:.1f}s, "
+            f"{self.bytes_logged:,} bytes logged: {self.command}"
+        )
+
+
+def _tail_lines(path: Path, count: int) -> list[str]:
+    """Last ``count`` lines of ``path``, reading backwards in blocks."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b""
+            while pos > 0 and data.count(b"\n") <= count:
+                step = min(64 * 1024, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+    except OSError:
+        return []
+    return data.decode("utf-8", errors="replace").splitlines()[-count:]
+
+
+class JobManager:
+    """Registry of background shell jobs with rotated per-job log files."""
+
+    def __init__(self):
+        self._jobs: dict[str, Job] = {}
+        self._next_id = 1
+        self._log_dir: Optional[Path] = None
+        self._exit_listeners: list[Callable[[Job], None]] = []
+
+    def add_exit_listener(self, callback: Callable[[Job], None]) -> None:
+        """Call ``callback(job)`` whenever a job exits (builds may have written files)."""
+        self._exit_listeners.append(callback)
+
+    def _job_log_dir(self) -> Path:
+        if self._log_dir is None:
+            self._log_dir = Path(tempfile.mkdtemp(prefix="opendev-jobs-"))
+        return self._log_dir
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(str(job_id).strip().lstrip("#"))
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    async def start(self, command: str, cwd: str) -> Job:
+        running = sum(1 for job in self._jobs.values() if job.running)
+        if running >= JOB_MAX_RUNNING:
+            raise RuntimeError(
+                f"{running} jobs already running (limit {JOB_MAX_RUNNING}); kill one first"
+            )
+        job_id = str(self._next_id)
+        self._next_id += 1
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        job = Job(job_id, command, cwd, self._job_log_dir() / f"job-{job_id}.log", process)
+        self._jobs[job_id] = job
+        # Fresh context: the pump outlives the tool call that started it.
+        asyncio.get_running_loop().create_task(
+            self._pump(job), context=contextvars.Context()
+        )
+        return job
+
+    async def _pump(self, job: Job) -> None:
+        log = open(job.log_path, "wb")
+        size = 0
+        try:
+            while True:
+                chunk = await job.process.stdout.read(65536)
+                if not chunk:
+                    break
+                if size + len(chunk) > JOB_LOG_MAX_BYTES:
+                    log.close()
+                    self._rotate(job.log_path)
+                    log = open(job.log_path, "wb")
+                    size = 0
+                log.write(chunk)
+                log.flush()
+                size += len(chunk)
+                job.bytes_logged += len(chunk)
+        finally:
+            log.close()
+            job.returncode = await job.process.wait()
+            job.ended_at = time.time()
+            job.done.set()
+            for callback in list(self._exit_listeners):
+                try:
+                    callback(job)
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _rotate(path: Path) -> None:
+        for n in range(JOB_LOG_BACKUPS, 0, -1):
+            src = path if n == 1 else path.with_name(f"{path.name}.{n - 1}")
+            if src.exists():
+                os.replace(src, path.with_name(f"{path.name}.{n}"))
+
+    def tail(self, job: Job, count: int) -> list[str]:
+        lines = _tail_lines(job.log_path, count)
+        if len(lines) < count:
+            rotated = job.log_path.with_name(f"{job.log_path.name}.1")
+            lines = _tail_lines(rotated, count - len(lines)) + lines
+        return lines
+
+    async def wait(self, job: Job, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def kill(self, job: Job, grace: float = 3.0) -> None:
+        if not job.running:
+            return
+        self._signal(job, signal.SIGTERM)
+        if not await self.wait(job, grace):
+            self._signal(job, signal.SIGKILL)
+            await self.wait(job, grace)
+
+    @staticmethod
+    def _signal(job: Job, sig: int) -> None:
+        try:
+            os.killpg(job.process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def shutdown(self) -> None:
+        """Kill every running job's process group and remove the log directory."""
+        for job in self._jobs.values():
+            if job.running:
+                self._signal(job, signal.SIGKILL)
+        if self._log_dir is not None:
+            shutil.rmtree(self._log_dir, ignore_errors=True)
+            self._log_dir = None
+
+
+job_manager = JobManager()
+atexit.register(job_manager.shutdown)
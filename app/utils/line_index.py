@@ -0,0 +1,189 @@
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+from typing import Optional
+
+LINE_INDEX_STRIDE = 64
+SCAN_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+@dataclass
+class LineIndex:
+    mtime_ns: int
+    size: int
+    total_lines: int
+    # Byte offset of every LINE_INDEX_STRIDE-th line start (line 0, 64, 128, ...).
+    checkpoints: array
+
+
+@dataclass
+class LineRange:
+    text: str
+    first_line: int
+    last_line: int
+    total_lines: int
+    next_line: Optional[int] = None
+    # A single line longer than the budget is returned cut short; this is its number.
+    clipped_line: Optional[int] = None
+
+
+def _build_index(mm: mmap.mmap, size: int, mtime_ns: int) -> LineIndex:
+    checkpoints = array("Q", [0])
+    newlines = 0
+    pos = 0
+    while pos < size:
+        chunk = mm[pos : pos + SCAN_CHUNK_BYTES]
+        parts = chunk.split(b"\n")
+        # Offsets (relative to chunk) just past each newline, computed in C.
+        ends = list(accumulate(map((1).__add__, map(len, parts[:-1]))))
+        first = (-newlines - 1) % LINE_INDEX_STRIDE
+        checkpoints.extend(pos + end for end in ends[first::LINE_INDEX_STRIDE])
+        newlines += len(ends)
+        pos += len(chunk)
+
+    total_lines = newlines
+    if size and mm[size - 1 : size] != b"\n":
+        total_lines += 1
+    if checkpoints and checkpoints[-1] >= size and len(checkpoints) > 1:
+        checkpoints.pop()
+    return LineIndex(mtime_ns, size, total_lines, checkpoints)
+
+
+def _skip_lines(mm: mmap.mmap, offset: int, count: int, size: int) -> int:
+    for _ in range(count):
+        nl = mm.find(b"\n", offset, size)
+        if nl < 0:
+            return size
+        offset = nl + 1
+    return offset
+
+
+def slice_lines(
+    text: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> LineRange:
+    """Same paging contract as ``LineIndexCache.read_range`` for in-memory text."""
+    lines = text.split("\n")
+    total = len(lines) - 1 if lines[-1] == "" else len(lines)
+    first = max(1, start_line or 1)
+    last = total if end_line is None else min(total, end_line)
+    if first > last:
+        return LineRange("", first, first - 1, total)
+
+    out: list[str] = []
+    used = 0
+    next_line = None
+    clipped_line = None
+    for line_no in range(first, last + 1):
+        line = lines[line_no - 1]
+        if line_no < len(lines):
+            line += "\n"
+        if max_chars is not None and used + len(line) > max_chars:
+            if not out:
+                out.append(line[:max_chars])
+                clipped_line = line_no
+                line_no += 1
+            if line_no <= total:
+                next_line = line_no
+            break
+        out.append(line)
+        used += len(line)
+    shown_last = (next_line - 1) if next_line else last
+    return LineRange("".join(out), first, shown_last, total, next_line, clipped_line)
+
+
+class LineIndexCache:
+    MAX_ENTRIES = 64
+
+    def __init__(self):
+        self._entries: OrderedDict[str, LineIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, st: os.stat_result) -> Optional[LineIndex]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: str, entry: LineIndex) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(Path(path).expanduser().resolve()), None)
+
+    def read_range(
+        self,
+        path: Path,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> LineRange:
+        key = str(path.resolve())
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size == 0:
+                return LineRange("", 0, 0, 0)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                index = self._get(key, st)
+                if index is None:
+                    index = _build_index(mm, size, st.st_mtime_ns)
+                    self._put(key, index)
+
+                first = max(1, start_line or 1)
+                last = index.total_lines if end_line is None else end_line
+                last = min(index.total_lines, last)
+                if first > last:
+                    return LineRange("", first, first - 1, index.total_lines)
+
+                start_off = self._offset_of(mm, index, first - 1, size)
+                end_off = self._offset_of(mm, index, last, size)
+
+                next_line = None
+                clipped_line = None
+                if max_chars is not None and end_off - start_off > max_chars:
+                    cut = mm.rfind(b"\n", start_off, start_off + max_chars)
+                    if cut < 0:
+                        # A single line longer than the budget: return it clipped.
+                        cut = start_off + max_chars - 1
+                        last = clipped_line = first
+                    else:
+                        last = first + mm[start_off:cut].count(b"\n")
+                    end_off = cut + 1
+                    if last < index.total_lines:
+                        next_line = last + 1
+
+                data = mm[start_off:end_off]
+
+        text = data.decode("utf-8", errors="ignore").replace("\r\n", "\n")
+        return LineRange(text, first, last, index.total_lines, next_line, clipped_line)
+
+    @staticmethod
+    def _offset_of(mm: mmap.mmap, index: LineIndex, line_idx: int, size: int) -> int:
+        """Byte offset of the start of 0-based line ``line_idx``."""
+        slot = min(line_idx // LINE_INDEX_STRIDE, len(index.checkpoints) - 1)
+        offset = index.checkpoints[slot]
+        return _skip_lines(mm, offset, line_idx - slot * LINE_INDEX_STRIDE, size)
+
+
+line_index_cache = LineIndexCache()
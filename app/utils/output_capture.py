@@ -0,0 +1,111 @@
+import codecs
+import contextvars
+import os
+import tempfile
+from typing import Callable, Optional
+
+from app.core.runtime_config import EXEC_OUTPUT_HEAD_CHARS, EXEC_OUTPUT_TAIL_CHARS
+
+# Set by the tool orchestrator around each tool call; receives the latest output line.
+progress_listener: contextvars.ContextVar[Optional[Callable[[str], None]]] = (
+    contextvars.ContextVar("progress_listener", default=None)
+)
+
+_spill_files: list[str] = []
+
+
+def report_progress(text: str) -> None:
+    listener = progress_listener.get()
+    if listener is None:
+        return
+    for line in reversed(text.replace("\r", "\n").split("\n")):
+        if line.strip():
+            listener(line.strip())
+            return
+
+
+class OutputCapture:
+    """Bounded capture of a process stream: fixed head, rolling tail, spill file.
+
+    Until the stream outgrows ``head_chars + tail_chars`` everything is kept in
+    memory; after that only the head and tail are, and the complete text goes to
+    a temp file the model can page through with read_file.
+    """
+
+    def __init__(
+        self,
+        label: str = "output",
+        head_chars: int = EXEC_OUTPUT_HEAD_CHARS,
+        tail_chars: int = EXEC_OUTPUT_TAIL_CHARS,
+    ):
+        self.label = label
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.total_chars = 0
+        self.total_lines = 0
+        self.spill_path: Optional[str] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._head = ""
+        self._tail = ""
+        self._spill = None
+
+    def feed(self, data: bytes) -> None:
+        self._feed_text(self._decoder.decode(data))
+
+    def _feed_text(self, text: str) -> None:
+        if not text:
+            return
+        self.total_chars += len(text)
+        self.total_lines += text.count("\n")
+        report_progress(text)
+        if self._spill is not None:
+            self._spill.write(text)
+            self._tail = (self._tail + text)[-self.tail_chars :]
+            return
+
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered <= self.head_chars + self.tail_chars:
+            return
+        full = "".join(self._buffer)
+        self._buffer = []
+        self._head = full[: self.head_chars]
+        self._tail = full[-self.tail_chars :]
+        fd, self.spill_path = tempfile.mkstemp(prefix=f"opendev-{self.label}-", suffix=".log")
+        _spill_files.append(self.spill_path)
+        self._spill = os.fdopen(fd, "w", encoding="utf-8", newline="")
+        self._spill.write(full)
+
+    def close(self) -> None:
+        self._feed_text(self._decoder.decode(b"", final=True))
+        if self._spill is not None and not self._spill.closed:
+            self._spill.close()
+
+    def render(self) -> str:
+        self.close()
+        if self.spill_path is None:
+            return "".join(self._buffer)
+        # Cut at line boundaries when one is close by.
+        head, tail = self._head, self._tail
+        cut = head.rfind("\n")
+        if cut > len(head) // 2:
+            head = head[:cut]
+        cut = tail.find("\n")
+        if 0 <= cut < len(tail) // 2:
+            tail = tail[cut + 1 :]
+        omitted = self.total_chars - len(head) - len(tail)
+        return (
+            f"{head}\n\n... ({omitted:,} chars omitted; full {self.label} "
+            f"({self.total_lines:,} lines) saved to {self.spill_path}, "
+            f"page through it with read_file) ...\n\n{tail}"
+        )
+
+
+def cleanup_spill_files() -> None:
+    while _spill_files:
+        try:
+            os.unlink(_spill_files.pop())
+        except OSError:
+            pass
@@ -0,0 +1,298 @@
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.core.runtime_config import (
+    CHARS_PER_TOKEN,
+    OUTPUT_COMPRESS_MIN_CHARS,
+    OUTPUT_FAILURE_CONTEXT_LINES,
+    OUTPUT_MAX_TRACEBACK_LINES,
+)
+from app.utils.job_manager import job_manager
+
+Stage = Callable[[str], str]
+
+# Commands whose output is a test/build/install log; anything else run through
+# execute_command (cat, sed -n, diff, grep) may be file content and is only
+# stripped of escape sequences.
+_LOG_COMMANDS = frozenset({
+    "pytest", "py.test", "tox", "nox", "jest", "vitest", "mocha", "ava", "tsc",
+    "mvn", "gradle", "gradlew", "ctest", "phpunit", "rspec",
+})
+_LOG_SUBCOMMANDS = {
+    "go": {"test", "build", "vet"},
+    "cargo": {"test", "build", "check", "clippy", "nextest"},
+    "npm": {"test", "t", "install", "i", "ci", "run"},
+    "pnpm": {"test", "install", "i", "run"},
+    "yarn": {"test", "install", "run"},
+    "make": {"test", "check", "build", "all"},
+    "pip": {"install"},
+    "pip3": {"install"},
+    "uv": {"pip", "sync", "run"},
+    "dotnet": {"test", "build"},
+}
+_PYTHON_LOG_MODULES = {"pytest", "unittest", "pip", "tox", "nox"}
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]")
+_DIGITS_RE = re.compile(r"\d+")
+
+# Lines that carry the signal in test/build logs.
+_FAILURE_RE = re.compile(
+    r"Traceback \(most recent call last\)|^E\s|^FAILED\b|^ERROR\b|\bERROR:|\berror(\[\w+\])?:"
+    r"|\bFAIL\b|AssertionError|\bException\b|\bpanicked at\b|npm ERR!|^\s*at .+:\d+:\d+\)?$"
+    r"|^Exit code: |^stderr: ",
+    re.IGNORECASE,
+)
+# Evidence that the command failed; without it failure extraction leaves the text alone.
+_FAILED_RUN_RE = re.compile(
+    r"^Traceback \(most recent call last\)|^Exit code: [1-9]|\b\d+ (failed|errors?)\b|^FAILED\b",
+    re.MULTILINE,
+)
+_PASS_LINE_RE = re.compile(r"\bPASSED\b|\.\.\. ok$|^\s*✓ |^ok \d+ ")
+# Summary/footer lines that are always kept.
+_KEEP_RE = re.compile(
+    r"^=+ .* =+$|^-+ .* -+$|^_{3,} .* _{3,}$|\b\d+ (passed|failed|errors?)\b|^Exit code: "
+    r"|chars omitted; full |^Successfully installed|^Tests? (run|result)",
+    re.IGNORECASE,
+)
+# Package-manager chatter with no diagnostic value.
+_NOISE_RE = re.compile(
+    r"^\s*(Requirement already satisfied|Collecting |Downloading |Using cached |Obtaining "
+    r"|Installing collected packages|Preparing metadata|Building wheel|Created wheel"
+    r"|Stored in directory|Getting requirements|Attempting uninstall|Found existing installation"
+    r"|Uninstalling |Successfully uninstalled|npm (http|timing|sill|verb) )"
+    r"|^\s*[━─█▏▎▍▌▋▊▉ ]+\s*[\d.]+\s*/\s*[\d.]+\s*[kMG]?B\b",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def strip_ansi(text: str) -> str:
+    """Drop escape sequences and carriage-return redraws (progress bars)."""
+    text = _ANSI_RE.sub("", text)
+    if "\r" not in text:
+        return text
+    lines = []
+    for line in text.split("\n"):
+        if "\r" in line:
+            parts = [p for p in line.rstrip("\r").split("\r") if p]
+            line = parts[-1] if parts else ""
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def drop_noise(text: str) -> str:
+    lines = text.split("\n")
+    kept = [line for line in lines if not _NOISE_RE.search(line)]
+    dropped = len(lines) - len(kept)
+    if not dropped:
+        return text
+    kept.append(f"[{dropped} package manager progress lines omitted]")
+    return "\n".join(kept)
+
+
+def collapse_repeats(text: str) -> str:
+    """Fold runs of repeated lines (or long runs differing only in numbers)."""
+    lines = text.split("\n")
+    out: list[str] = []
+    i = 0
+    while i < len(lines):
+        j = i + 1
+        while j < len(lines) and lines[j] == lines[i]:
+            j += 1
+        if j - i < 3:
+            shape = _DIGITS_RE.sub("#", lines[i])
+            j = i + 1
+            while j < len(lines) and _DIGITS_RE.sub("#", lines[j]) == shape:
+                j += 1
+            if j - i < 10:
+                j = i + 1
+        run = j - i
+        if run >= 3 and not lines[i].strip():
+            out.append("")
+        elif run >= 3:
+            out.append(lines[i])
+            out.append(f"[... {run - 2} similar lines ...]")
+            out.append(lines[j - 1])
+        else:
+            out.extend(lines[i:j])
+        i = j
+    return "\n".join(out)
+
+
+def collapse_progress_dots(text: str) -> str:
+    """Shorten pytest/unittest progress rows (``....F..s....  [ 40%]``)."""
+    def shorten(match: re.Match) -> str:
+        marks = match.group(1)
+        notable = "".join(ch for ch in marks if ch != ".")
+        summary = f"{len(marks)} results"
+        if notable:
+            summary += f", non-pass: {notable}"
+        return f"[{summary}]{match.group(2)}"
+
+    return re.sub(r"^([.FEsxX]{20,})(\s*\[\s*\d+%\])?$", shorten, text, flags=re.MULTILINE)
+
+
+def extract_failures(text: str) -> str:
+    """Keep failures, tracebacks and summaries (with context); elide the passing bulk."""
+    if len(text) < OUTPUT_COMPRESS_MIN_CHARS:
+        return text
+    if not _FAILED_RUN_RE.search(text):
+        return _drop_passing(text)
+    lines = text.split("\n")
+    keep = [False] * len(lines)
+    context = OUTPUT_FAILURE_CONTEXT_LINES
+    found_failure = False
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("Traceback (most recent call last)"):
+            # Whole traceback up to the exception line, capped in the middle.
+            end = i + 1
+            while end < len(lines) and (lines[end].startswith((" ", "\t")) or not lines[end]):
+                end += 1
+            end = min(end + 1, len(lines))
+            block = list(range(i, end))
+            if len(block) > OUTPUT_MAX_TRACEBACK_LINES:
+                half = OUTPUT_MAX_TRACEBACK_LINES // 2
+                block = block[:half] + block[-half:]
+            for k in block:
+                keep[k] = True
+            found_failure = True
+            i = end
+            continue
+        if _FAILURE_RE.search(line):
+            found_failure = True
+            for k in range(max(0, i - context), min(len(lines), i + context + 1)):
+                keep[k] = True
+        elif _KEEP_RE.search(line):
+            keep[i] = True
+        i += 1
+    if not found_failure:
+        return text
+    for k in range(min(3, len(lines))):
+        keep[k] = True
+    for k in range(max(0, len(lines) - 3), len(lines)):
+        keep[k] = True
+
+    out: list[str] = []
+    skipped = 0
+    for line, kept in zip(lines, keep):
+        if kept:
+            if skipped:
+                out.append(f"[... {skipped} lines omitted ...]")
+                skipped = 0
+            out.append(line)
+        else:
+            skipped += 1
+    if skipped:
+        out.append(f"[... {skipped} lines omitted ...]")
+    return "\n".join(out)
+
+
+def _drop_passing(text: str) -> str:
+    # A green verbose test run: the per-test PASSED lines add nothing to the summary.
+    if not re.search(r"\b\d+ passed\b|^OK\b|^Ran \d+ tests?", text, re.MULTILINE):
+        return text
+    lines = text.split("\n")
+    kept = [line for line in lines if not _PASS_LINE_RE.search(line)]
+    dropped = len(lines) - len(kept)
+    if dropped < 5:
+        return text
+    kept.append(f"[{dropped} passing test lines omitted]")
+    return "\n".join(kept)
+
+
+@dataclass
+class CompressionResult:
+    text: str
+    original_tokens: int
+    # (stage name, tokens saved by that stage), in pipeline order.
+    savings: list[tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return sum(saved for _, saved in self.savings)
+
+
+_SHELL_STAGES: list[Stage] = [strip_ansi, drop_noise, collapse_progress_dots, collapse_repeats]
+_TEST_STAGES: list[Stage] = [*_SHELL_STAGES, extract_failures]
+
+# Tool name -> stages. Tools that return file contents or structured data are
+# deliberately absent: their output must reach the model verbatim.
+COMPRESSORS: dict[str, list[Stage]] = {
+    "execute_command": [strip_ansi],
+    "run_tests": _TEST_STAGES,
+    "write_test": _TEST_STAGES,
+    "install_package": _TEST_STAGES,
+    "format_code": _TEST_STAGES,
+    "git_action": [strip_ansi],
+    "job_tail": [strip_ansi],
+    "job_wait": [strip_ansi],
+}
+# Tools that get _TEST_STAGES when the command they ran is a test/build log.
+_COMMAND_TOOLS = frozenset({"execute_command", "job_tail", "job_wait"})
+
+
+def is_log_command(command: str) -> bool:
+    """True if ``command`` runs tests, a build or a package install."""
+    for segment in re.split(r"&&|\|\||;|\|", command):
+        try:
+            argv = shlex.split(segment)
+        except ValueError:
+            argv = segment.split()
+        while argv and re.match(r"^\w+=", argv[0]):
+            argv = argv[1:]
+        if not argv:
+            continue
+        prog = argv[0].rsplit("/", 1)[-1]
+        if prog in ("npx", "pnpx", "bunx") and len(argv) > 1:
+            argv = argv[1:]
+            prog = argv[0]
+        if prog in _LOG_COMMANDS:
+            return True
+        if argv[1:2] and argv[1] in _LOG_SUBCOMMANDS.get(prog, ()):
+            return True
+        if re.fullmatch(r"python(\d(\.\d+)?)?", prog) and argv[1:2] == ["-m"]:
+            if argv[2:3] and argv[2] in _PYTHON_LOG_MODULES:
+                return True
+    return False
+
+
+def _stages_for(tool_name: str, arguments: Optional[dict[str, Any]]) -> Optional[list[Stage]]:
+    if tool_name in _COMMAND_TOOLS and isinstance(arguments, dict):
+        command = arguments.get("command")
+        if command is None and arguments.get("job_id") is not None:
+            job = job_manager.get(str(arguments["job_id"]))
+            command = job.command if job else None
+        if command and is_log_command(str(command)):
+            return _TEST_STAGES
+    return COMPRESSORS.get(tool_name)
+
+
+def register_compressor(tool_name: str, stages: list[Stage]) -> None:
+    COMPRESSORS[tool_name] = list(stages)
+
+
+def compress_tool_output(
+    tool_name: str, text: str, arguments: Optional[dict[str, Any]] = None
+) -> CompressionResult:
+    original = estimate_tokens(text)
+    result = CompressionResult(text, original)
+    stages = _stages_for(tool_name, arguments)
+    if not stages or not text:
+        return result
+    current_tokens = original
+    for stage in stages:
+        try:
+            compressed = stage(result.text)
+        except Exception:
+            continue
+        tokens = estimate_tokens(compressed)
+        if tokens < current_tokens:
+            result.savings.append((stage.__name__, current_tokens - tokens))
+            result.text, current_tokens = compressed, tokens
+    return result
@@ -0,0 +1,119 @@
+import atexit
+import hashlib
+import re
+import shutil
+import tempfile
+import threading
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from app.core.runtime_config import (
+    RESULT_FETCH_MAX_CHARS,
+    RESULT_OFFLOAD_MIN_CHARS,
+    RESULT_PREVIEW_HEAD_CHARS,
+    RESULT_PREVIEW_TAIL_CHARS,
+)
+from app.utils.atomic_io import atomic_write_bytes
+
+# Paging through a stored result must never produce another stub; file reads
+# already fit the token budget the model asked for.
+EXEMPT_TOOLS = {"fetch_result", "read_file", "read_files_batch"}
+STUB_PREFIX = "[Result stored out of context"
+
+_SECTION_RE = re.compile(r"^## (.+)$", re.MULTILINE)
+_HANDLE_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Results live only as long as the session that produced them.
+_result_dir: Optional[Path] = None
+_dir_lock = threading.Lock()
+
+
+def _results_dir() -> Path:
+    global _result_dir
+    with _dir_lock:
+        if _result_dir is None:
+            _result_dir = Path(tempfile.mkdtemp(prefix="opendev-results-"))
+        return _result_dir
+
+
+def cleanup_results() -> None:
+    global _result_dir
+    with _dir_lock:
+        if _result_dir is not None:
+            shutil.rmtree(_result_dir, ignore_errors=True)
+            _result_dir = None
+    _load_text.cache_clear()
+
+
+def _store(text: str) -> str:
+    data = text.encode("utf-8")
+    handle = hashlib.sha256(data).hexdigest()
+    path = _results_dir() / handle
+    if not path.exists():
+        atomic_write_bytes(path, zlib.compress(data, 1))
+    return handle
+
+
+def _summary(tool_name: str, text: str) -> str:
+    parts = [f"{tool_name} output"]
+    sections = _SECTION_RE.findall(text)
+    if sections:
+        shown = ", ".join(sections[:20])
+        more = f" (+{len(sections) - 20} more)" if len(sections) > 20 else ""
+        parts.append(f"sections: {shown}{more}")
+    exit_code = re.search(r"^Exit code: (-?\d+)$", text, re.MULTILINE)
+    if exit_code:
+        parts.append(f"exit code {exit_code.group(1)}")
+    return "; ".join(parts)
+
+
+def offload_result(tool_name: str, text: str) -> str:
+    """Store an oversized result out of band and return a stub that points at it."""
+    if tool_name in EXEMPT_TOOLS or len(text) < RESULT_OFFLOAD_MIN_CHARS:
+        return text
+    handle = _store(text)
+    head = text[:RESULT_PREVIEW_HEAD_CHARS]
+    tail = text[-RESULT_PREVIEW_TAIL_CHARS:]
+    return (
+        f"{STUB_PREFIX}: handle={handle}, {len(text):,} chars, "
+        f"{text.count(chr(10)) + 1:,} lines]\n"
+        f"Summary: {_summary(tool_name, text)}\n"
+        f"--- head ---\n{head}\n"
+        f"--- tail ---\n{tail}\n"
+        f"[Use fetch_result(handle, offset, limit) to page through the rest; "
+        f"offset and limit are in characters]"
+    )
+
+
+@lru_cache(maxsize=4)
+def _load_text(handle: str) -> str:
+    return zlib.decompress((_results_dir() / handle).read_bytes()).decode(
+        "utf-8", errors="replace"
+    )
+
+
+def read_result(handle: str, offset: int = 0, limit: int = 20_000) -> str:
+    handle = handle.strip()
+    if not _HANDLE_RE.match(handle):
+        return f"Error: Invalid result handle: {handle}"
+    try:
+        text = _load_text(handle)
+    except FileNotFoundError:
+        return (
+            f"Error: No stored result for handle {handle} "
+            "(stored results are kept only for the session that produced them)"
+        )
+    offset = max(0, offset)
+    limit = max(1, min(limit, RESULT_FETCH_MAX_CHARS))
+    if offset >= len(text):
+        return f"Error: offset {offset} is past the end of the result ({len(text)} chars)"
+    end = min(len(text), offset + limit)
+    cursor = (
+        f"next offset: {end}" if end < len(text) else "end of result"
+    )
+    return f"[chars {offset}-{end} of {len(text)}; {cursor}]\n{text[offset:end]}"
+
+
+atexit.register(cleanup_results)
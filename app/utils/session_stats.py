@@ -57,6 +57,15 @@ class SessionStats:
     api_time: float = 0.0
     tool_time: float = 0.0
 
+    file_cache_hits: int = 0
+    file_cache_misses: int = 0
+
+    tool_output_tokens_in: int = 0
+    tool_output_tokens_saved: int = 0
+    compression_by_stage: Dict[str, int] = field(default_factory=dict)
+    context_dedup_tokens_saved: int = 0
+    tool_memo_hits: int = 0
+
     def get_total_stats(self) -> dict:
         total_input = 0
         total_output = 0
@@ -94,6 +103,24 @@ class SessionStats:
     def record_tool_execution(self, duration: float):
         self.tool_time += duration
 
+    def record_file_cache(self, hit: bool):
+        if hit:
+            self.file_cache_hits += 1
+        else:
+            self.file_cache_misses += 1
+
+    def record_output_compression(self, original_tokens: int, savings: List[tuple]):
+        self.tool_output_tokens_in += original_tokens
+        for stage, saved in savings:
+            self.tool_output_tokens_saved += saved
+            self.compression_by_stage[stage] = self.compression_by_stage.get(stage, 0) + saved
+
+    def record_context_dedup(self, saved_tokens: int):
+        self.context_dedup_tokens_saved += saved_tokens
+
+    def record_tool_memo_hit(self):
+        self.tool_memo_hits += 1
+
     def record_code_changes(self, added: int, removed: int):
         self.lines_added += added
         self.lines_removed += removed
@@ -140,7 +167,15 @@ class SessionStats:
         tool_percent = (self.tool_time / agent_active * 100) if agent_active > 0 else 0
         
         summary_text.append(f"  » API Time:               {self.format_duration(self.api_time)} ({api_percent:.1f}%)\n")
-        summary_text.append(f"  » Tool Time:              {self.format_duration(self.tool_time)} ({tool_percent:.1f}%)\n\n")
+        summary_text.append(f"  » Tool Time:              {self.format_duration(self.tool_time)} ({tool_percent:.1f}%)\n")
+
+        cache_lookups = self.file_cache_hits + self.file_cache_misses
+        cache_rate = (self.file_cache_hits / cache_lookups * 100) if cache_lookups > 0 else 0
+        summary_text.append(f"File Cache:                 {self.file_cache_hits} hits / {self.file_cache_misses} misses ({cache_rate:.1f}%)\n")
+        saved_rate = (self.tool_output_tokens_saved / self.tool_output_tokens_in * 100) if self.tool_output_tokens_in > 0 else 0
+        summary_text.append(f"Output Compression:         {self.tool_output_tokens_saved:,} tokens saved ({saved_rate:.1f}%)\n")
+        summary_text.append(f"Context Dedup:              {self.context_dedup_tokens_saved:,} input tokens saved\n")
+        summary_text.append(f"Repeat Tool Calls:          {self.tool_memo_hits} answered from this turn's results\n\n")
         
         summary_text.append("Model Usage\n", style="bold cyan")
         
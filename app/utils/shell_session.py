@@ -0,0 +1,135 @@
+import asyncio
+import os
+import shlex
+import signal
+import uuid
+from typing import Optional
+
+from app.utils.cancellation import OperationCancelled, cancellable
+from app.utils.output_capture import OutputCapture
+
+
+class ShellTimeout(Exception):
+    pass
+
+
+class PersistentShell:
+    """One long-lived bash per conversation; commands are framed by sentinels.
+
+    Each command runs through ``eval`` so syntax errors can't desynchronise the
+    framing, and stdin is /dev/null so nothing reads the control pipe. ``cd``,
+    ``export`` and ``source .venv/bin/activate`` persist between calls.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        if not self.alive:
+            self._process = await asyncio.create_subprocess_exec(
+                "bash",
+                "--noprofile",
+                "--norc",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=os.getcwd(),
+                start_new_session=True,
+            )
+        return self._process
+
+    async def run(
+        self,
+        command: str,
+        stdout: OutputCapture,
+        stderr: OutputCapture,
+        timeout: int = 60,
+        working_dir: Optional[str] = None,
+    ) -> int:
+        """Run ``command``, streaming into the captures; returns the exit code."""
+        async with self._lock:
+            process = await self._ensure_started()
+            marker = f"__OPENDEV_{uuid.uuid4().hex}__"
+            cd = f"cd -- {shlex.quote(working_dir)} && " if working_dir else ""
+            script = (
+                f"{cd}{{ eval {shlex.quote(command)}\n}} < /dev/null\n"
+                f"printf '\\n{marker}%d\\n' \"$?\"\n"
+                f"printf '\\n{marker}\\n' >&2\n"
+            )
+            try:
+                process.stdin.write(script.encode())
+                await process.stdin.drain()
+                code, _ = await cancellable(
+                    asyncio.gather(
+                        self._read_until(process.stdout, marker, stdout),
+                        self._read_until(process.stderr, marker, stderr),
+                    ),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                await self.close()
+                raise ShellTimeout()
+            except (OperationCancelled, asyncio.CancelledError):
+                # The framing is lost mid-command; the shell restarts on next use.
+                await self.close()
+                raise
+            except (BrokenPipeError, ConnectionResetError):
+                await self.close()
+                return -1
+
+            if code is None:
+                # The command ended the shell (e.g. ``exit``); restart on next call.
+                await process.wait()
+                code = process.returncode
+                self._process = None
+            return code
+
+    @staticmethod
+    async def _read_until(
+        stream: asyncio.StreamReader, marker: str, capture: OutputCapture
+    ) -> Optional[int]:
+        # Read in chunks (no line-length limit); hold back enough bytes that a
+        # marker split across reads is never fed to the capture.
+        token = f"\n{marker}".encode()
+        buf = b""
+        while True:
+            idx = buf.find(token)
+            if idx >= 0:
+                capture.feed(buf[:idx])
+                rest = buf[idx + len(token) :]
+                while b"\n" not in rest:
+                    chunk = await stream.read(64)
+                    if not chunk:
+                        break
+                    rest += chunk
+                status = rest.split(b"\n", 1)[0].strip()
+                return int(status) if status else 0
+            capture.feed(buf[: -len(token)])
+            buf = buf[-len(token) :]
+            chunk = await stream.read(65536)
+            if not chunk:
+                capture.feed(buf)
+                return None
+            buf += chunk
+
+    async def close(self) -> None:
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            await asyncio.wait_for(process.wait(), timeout=2)
+        except asyncio.TimeoutError:
+            pass
+
+
+shell_session = PersistentShell()
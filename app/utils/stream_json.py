@@ -0,0 +1,262 @@
+import json
+import re
+from typing import Any, Optional
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+# Longest top-level string value kept for progress display (file paths, names).
+_CAPTURE_LIMIT = 1024
+
+_JSON_KINDS = {
+    "string": "string",
+    "object": "object",
+    "array": "array",
+    "integer": "number",
+    "number": "number",
+    "boolean": "boolean",
+}
+
+
+def _scalar_kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if value is None:
+        return "null"
+    return "number"
+
+
+class ArgumentsError(ValueError):
+    pass
+
+
+class StreamingJSONParser:
+    """Incremental scanner for one streamed JSON object (tool-call arguments).
+
+    Fragments are kept in a list and joined once; the scanner tracks nesting,
+    strings and top-level fields as they arrive so callers can show progress
+    (``fields``, ``streaming_key``/``streaming_chars``), notice syntax errors
+    and schema mismatches early, and know when the object has closed.
+    """
+
+    def __init__(self, schema: Optional[dict] = None):
+        params = schema or {}
+        self._properties: dict = params.get("properties", {}) if isinstance(params, dict) else {}
+        self._required: list = params.get("required", []) if isinstance(params, dict) else []
+        self._parts: list[str] = []
+        self._offset = 0
+        self._stack: list[str] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_role = ""
+        self._capture: list[str] = []
+        self._capture_len = 0
+        self._expect = "key"
+        self._scalar: list[str] = []
+        self._key: Optional[str] = None
+        self._last_field_end = 0
+        self._cursor = 0
+        self.complete = False
+        self.error: Optional[str] = None
+        self.schema_error: Optional[str] = None
+        self.fields: dict[str, Any] = {}
+        self.streaming_key: Optional[str] = None
+        self.streaming_chars = 0
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self._parts.append(chunk)
+        base, self._offset = self._offset, self._offset + len(chunk)
+        if self.error:
+            return
+        i, n = 0, len(chunk)
+        while i < n and not self.error:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    self._take(chunk[i])
+                    i += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, i)
+                end = match.start() if match else n
+                self._take(chunk[i:end])
+                i = end
+                if match is None:
+                    break
+                if chunk[i] == "\\":
+                    self._escape = True
+                    self._take("\\")
+                else:
+                    self._in_string = False
+                    self._end_string(base + i + 1)
+                i += 1
+                continue
+            c = chunk[i]
+            self._cursor = base + i
+            i += 1
+            if c in " \t\r\n":
+                if self._expect == "scalar" and len(self._stack) == 1:
+                    self._end_scalar(base + i - 1)
+                continue
+            self._structural(c, base + i)
+
+    def _fail(self, message: str) -> None:
+        self.error = f"{message} at char {self._cursor}"
+
+    def _take(self, text: str) -> None:
+        if self._string_role == "nested" or not text:
+            return
+        if self._string_role == "value":
+            self.streaming_chars += len(text)
+        if self._capture_len < _CAPTURE_LIMIT:
+            self._capture.append(text)
+        self._capture_len += len(text)
+
+    def _begin_string(self, role: str) -> None:
+        self._in_string = True
+        self._string_role = role
+        self._capture = []
+        self._capture_len = 0
+        if role == "value":
+            self.streaming_key = self._key
+            self.streaming_chars = 0
+
+    def _end_string(self, pos: int) -> None:
+        role = self._string_role
+        if role == "nested":
+            return
+        value: Optional[str] = None
+        if self._capture_len <= _CAPTURE_LIMIT:
+            try:
+                value = json.loads('"' + "".join(self._capture) + '"')
+            except ValueError:
+                self._fail("invalid string escape")
+                return
+        if role == "key":
+            self._key = value if value is not None else "".join(self._capture)
+            self._expect = "colon"
+            if self._properties and self._key not in self._properties and not self.schema_error:
+                self.schema_error = f"unknown argument '{self._key}'"
+        else:
+            self.streaming_key = None
+            self._finish_value("string", value, pos)
+
+    def _end_scalar(self, pos: int) -> None:
+        raw = "".join(self._scalar)
+        self._scalar = []
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            self._fail(f"invalid value {raw[:20]!r}")
+            return
+        self._finish_value(_scalar_kind(value), value, pos)
+
+    def _finish_value(self, kind: str, value: Any, pos: int) -> None:
+        key = self._key
+        self._expect = "comma"
+        self._last_field_end = pos
+        if key is None:
+            return
+        if kind in ("string", "number", "boolean", "null") and value is not None:
+            self.fields[key] = value
+        expected = _JSON_KINDS.get(self._properties.get(key, {}).get("type", ""))
+        if expected and kind != expected and kind != "null" and not self.schema_error:
+            self.schema_error = f"'{key}' must be {self._properties[key]['type']}, got {kind}"
+
+    def _structural(self, c: str, pos: int) -> None:
+        if not self._started:
+            if c != "{":
+                self._fail("arguments must be a JSON object")
+                return
+            self._started = True
+            self._stack.append("{")
+            self._last_field_end = pos
+            return
+        if self.complete:
+            self._fail("unexpected data after the object")
+            return
+        depth = len(self._stack)
+        if depth > 1:
+            if c == '"':
+                self._begin_string("nested")
+            elif c in "{[":
+                self._stack.append(c)
+            elif c in "}]":
+                if (self._stack.pop() == "{") != (c == "}"):
+                    self._fail(f"mismatched {c!r}")
+                elif len(self._stack) == 1:
+                    self._finish_value("object" if c == "}" else "array", None, pos)
+            return
+
+        expect = self._expect
+        if expect == "scalar":
+            if c in ",}":
+                self._end_scalar(pos - 1)
+                if self.error:
+                    return
+                expect = self._expect
+            else:
+                self._scalar.append(c)
+                return
+        if expect in ("key", "key_required") and c == '"':
+            self._begin_string("key")
+        elif expect == "key" and c == "}":
+            self._close(pos)
+        elif expect == "colon" and c == ":":
+            self._expect = "value"
+        elif expect == "value":
+            if c == '"':
+                self._begin_string("value")
+            elif c in "{[":
+                self._stack.append(c)
+            elif c in "}]":
+                self._fail(f"unexpected {c!r}")
+            else:
+                self._expect = "scalar"
+                self._scalar = [c]
+        elif expect == "comma" and c == ",":
+            self._expect = "key_required"
+        elif expect == "comma" and c == "}":
+            self._close(pos)
+        else:
+            self._fail(f"unexpected {c!r}")
+
+    def _close(self, pos: int) -> None:
+        self._stack.pop()
+        self._last_field_end = pos
+        self.complete = True
+
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def result(self) -> dict:
+        """Parsed arguments; repairs structural truncation, raises ArgumentsError otherwise."""
+        text = self.text()
+        if not text.strip():
+            return {}
+        if self.error:
+            raise ArgumentsError(f"invalid JSON: {self.error}")
+        if self.complete:
+            try:
+                return json.loads(text)
+            except ValueError as e:
+                raise ArgumentsError(f"invalid JSON: {e}") from e
+        if self._in_string or self._expect == "scalar" or len(self._stack) > 1:
+            where = f"inside '{self._key}'" if self._key else "mid-value"
+            raise ArgumentsError(
+                f"truncated {where} after {self._offset:,} chars"
+            )
+        # Cut off between fields: keep every complete field and close the object.
+        repaired = text[: self._last_field_end].rstrip().rstrip(",") + "}"
+        try:
+            args = json.loads(repaired)
+        except ValueError as e:
+            raise ArgumentsError(f"truncated and not repairable: {e}") from e
+        missing = [key for key in self._required if key not in args]
+        if missing:
+            raise ArgumentsError(
+                f"truncated before required {', '.join(missing)}"
+            )
+        return args
@@ -0,0 +1,166 @@
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from app.utils.file_search import SKIP_DIRS
+
+TREE_SKIP_DIRS = SKIP_DIRS | {".pytest_cache", ".ruff_cache", ".vscode"}
+
+
+@dataclass
+class DirSnapshot:
+    mtime_ns: int
+    dirs: list[str]
+    files: list[tuple[str, int]]
+
+
+@dataclass
+class DirSummary:
+    files: int = 0
+    bytes: int = 0
+    exts: Counter = field(default_factory=Counter)
+
+    def add(self, other: "DirSummary") -> None:
+        self.files += other.files
+        self.bytes += other.bytes
+        self.exts.update(other.exts)
+
+    def describe(self) -> str:
+        parts = [f"{self.files:,} file{'' if self.files == 1 else 's'}", format_size(self.bytes)]
+        if self.exts:
+            top = self.exts.most_common(2)
+            if top[0][1] * 2 >= self.files:
+                parts.append(f"mostly {top[0][0]}")
+            else:
+                parts.append(", ".join(ext for ext, _ in top))
+        return ", ".join(parts)
+
+
+def format_size(num: int) -> str:
+    size = float(num)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _ext(name: str) -> str:
+    suffix = os.path.splitext(name)[1]
+    return suffix.lower() if suffix else "(no ext)"
+
+
+class DirectoryTreeCache:
+    """Per-directory scandir snapshots, revalidated lazily by directory mtime."""
+
+    def __init__(self):
+        self._snapshots: dict[str, DirSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, path: str) -> Optional[DirSnapshot]:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._snapshots.get(path)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+
+        dirs: list[str] = []
+        files: list[tuple[str, int]] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in TREE_SKIP_DIRS:
+                                dirs.append(entry.name)
+                        else:
+                            files.append((entry.name, entry.stat(follow_symlinks=False).st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        snap = DirSnapshot(mtime_ns, sorted(dirs), sorted(files))
+        with self._lock:
+            self._snapshots[path] = snap
+        return snap
+
+    def summarize(self, path: str) -> DirSummary:
+        summary = DirSummary()
+        snap = self.snapshot(path)
+        if snap is None:
+            return summary
+        summary.files = len(snap.files)
+        summary.bytes = sum(size for _, size in snap.files)
+        summary.exts.update(_ext(name) for name, _ in snap.files)
+        for name in snap.dirs:
+            summary.add(self.summarize(os.path.join(path, name)))
+        return summary
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._snapshots.clear()
+                return
+            target = str(Path(path).expanduser().resolve())
+            for key in [target, os.path.dirname(target)]:
+                self._snapshots.pop(key, None)
+
+    def render(
+        self, root: str, max_depth: int, max_entries: int, max_lines: int
+    ) -> list[str]:
+        root = str(Path(root).expanduser().resolve())
+        # Shrink depth until the overview fits, rather than cutting it off mid-walk.
+        for depth in range(max(1, max_depth), 0, -1):
+            lines: list[str] = []
+            self._render_dir(root, 1, depth, max_entries, lines)
+            if len(lines) <= max_lines or depth == 1:
+                break
+        if len(lines) > max_lines:
+            lines = lines[:max_lines] + ["  ... (truncated)"]
+        return lines
+
+    def _render_dir(
+        self, path: str, depth: int, max_depth: int, max_entries: int, lines: list[str]
+    ) -> None:
+        snap = self.snapshot(path)
+        if snap is None:
+            return
+        indent = "  " * depth
+        shown = 0
+        for name in snap.dirs:
+            child = os.path.join(path, name)
+            if shown >= max_entries:
+                break
+            shown += 1
+            if depth >= max_depth:
+                lines.append(f"{indent}[{name}/] ({self.summarize(child).describe()})")
+                continue
+            lines.append(f"{indent}[{name}/]")
+            self._render_dir(child, depth + 1, max_depth, max_entries, lines)
+
+        for name, _ in snap.files:
+            if shown >= max_entries:
+                break
+            shown += 1
+            lines.append(f"{indent}{name}")
+
+        hidden_dirs = snap.dirs[max_entries:]
+        hidden_files = snap.files[max(0, max_entries - len(snap.dirs)) :]
+        if hidden_dirs or hidden_files:
+            rest = DirSummary()
+            for name in hidden_dirs:
+                rest.add(self.summarize(os.path.join(path, name)))
+            rest.files += len(hidden_files)
+            rest.bytes += sum(size for _, size in hidden_files)
+            rest.exts.update(_ext(name) for name, _ in hidden_files)
+            more = f"{len(hidden_dirs)} dirs, " if hidden_dirs else ""
+            lines.append(f"{indent}... (+{more}{rest.describe()})")
+
+
+tree_cache = DirectoryTreeCache()
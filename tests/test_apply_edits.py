@@ -0,0 +1,41 @@
+from unittest import mock
+
+from app.tools import file_tools
+from app.tools.file_tools import _apply_edits_sync, _apply_patch
+
+LINES = "".join(f"l{i}\n" for i in range(1, 8))
+
+
+def test_pure_insertion_goes_after_old_start():
+    content, error = _apply_patch(LINES, "@@ -5,0 +6,1 @@\n+NEW\n")
+    assert error is None
+    assert content.splitlines() == ["l1", "l2", "l3", "l4", "l5", "NEW", "l6", "l7"]
+
+
+def test_pure_insertion_at_top_of_file():
+    content, error = _apply_patch(LINES, "@@ -0,0 +1,1 @@\n+NEW\n")
+    assert error is None
+    assert content.splitlines()[:2] == ["NEW", "l1"]
+
+
+def test_rollback_removes_created_directories(tmp_path):
+    existing = tmp_path / "a.txt"
+    existing.write_text("old\n")
+    new_file = tmp_path / "new" / "deep" / "b.txt"
+    edits = [
+        {"filepath": str(new_file), "patch": "@@ -0,0 +1,1 @@\n+hello\n"},
+        {"filepath": str(existing), "search_block": "old", "replace_block": "new"},
+    ]
+    real_write = file_tools.atomic_write_text
+
+    def failing_write(path, text):
+        if path.name == "a.txt":
+            raise OSError("disk full")
+        real_write(path, text)
+
+    with mock.patch.object(file_tools, "atomic_write_text", failing_write):
+        result = _apply_edits_sync(edits)
+
+    assert "rolled back" in result
+    assert not (tmp_path / "new").exists()
+    assert existing.read_text() == "old\n"
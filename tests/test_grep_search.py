@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from app.tools import code_tools
+from app.tools.code_tools import grep_search
+
+
+@pytest.mark.parametrize("use_rg", [True, False])
+@pytest.mark.parametrize("pattern", ["[bad", "(unclosed"])
+def test_invalid_regex_is_an_error(tmp_path, monkeypatch, use_rg, pattern):
+    if use_rg and code_tools.shutil.which("rg") is None:
+        pytest.skip("ripgrep not installed")
+    if not use_rg:
+        monkeypatch.setattr(code_tools.shutil, "which", lambda name: None)
+    (tmp_path / "a.py").write_text("x = 1\n")
+
+    result = asyncio.run(grep_search(pattern, str(tmp_path)))
+
+    assert result.startswith("Error:")
+
+
+def test_no_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(code_tools.shutil, "which", lambda name: None)
+    (tmp_path / "a.py").write_text("x = 1\n")
+
+    assert asyncio.run(grep_search("zzz", str(tmp_path))) == "No matches found"